@@ -1,7 +1,9 @@
-import json
 import logging
-from prompts.email_cover_prompt import EMAIL_COVER_SCHEMA, EMAIL_COVER_TEMPLATE
-from utils.prompt_runner import run_json_prompt
+from prompts.email_cover_prompt import EMAIL_COVER_SCHEMA, EMAIL_COVER_TEMPLATE, EMAIL_COVER_SCHEMA_TEXT
+from prompts.job_info_prompt import JOB_INFO_SCHEMA
+from utils.prompt_compaction import compact_inputs
+from utils.prompt_runner import run_json_prompt, stream_json_prompt
+from utils.resume_service import resume_prompt_text
 
 
 
@@ -17,32 +19,57 @@ class EmailGeneratorAgent:
         # Set the language model for the agent
         self.llm = llm
 
-    def run(self, resume: str, job_info: dict) -> dict:
+    def run(self, resume, job_info: dict) -> dict:
         """
         Evaluate the fit of a resume to a job description.
 
         Args:
-            resume (str): The text of the resume.
+            resume (ResumeProfile): The compiled resume; a plain resume dict also works.
             job_info (dict): A dictionary containing information about the job.
 
         Returns:
             dict: A dictionary containing the fit score and skills matched/missing.
 
         """
-        print("Running FitEvaluatorAgent...")
+        logging.info("Running EmailGeneratorAgent...")
 
        
 
-        prompt_inputs = {
-            "resume": resume,
-            "job_info": json.dumps(job_info, indent=2),
-            "schema": json.dumps(EMAIL_COVER_SCHEMA, indent=2)
-        }
+        prompt_inputs, _ = compact_inputs("email_gen", {
+            "resume": resume_prompt_text(resume),
+            "job_info": job_info,
+            "schema": EMAIL_COVER_SCHEMA_TEXT
+        }, schemas={"job_info": JOB_INFO_SCHEMA}, trim=("job_info", "resume"))
 
         try:
             result = run_json_prompt(self.llm, EMAIL_COVER_TEMPLATE, prompt_inputs, EMAIL_COVER_SCHEMA)
             # print(result)
             return result
         except Exception as e:
-            print(f"Error during email and cover letter generation: {e}")
+            logging.error(f"Error during email and cover letter generation: {e}")
+            raise
+
+    def run_stream(self, resume, job_info: dict, on_field) -> dict:
+        """
+        Same as run(), but streams the completion and calls on_field(path, value)
+        for each field of EMAIL_COVER_SCHEMA as soon as it is complete.
+
+        Args:
+            resume (ResumeProfile): The compiled resume; a plain resume dict also works.
+            job_info (dict): A dictionary containing information about the job.
+            on_field (callable): Receives (path, value), e.g. (("cold email", "subject"), "...").
+
+        Returns:
+            dict: The complete result, as returned by run().
+        """
+        prompt_inputs, _ = compact_inputs("email_gen", {
+            "resume": resume_prompt_text(resume),
+            "job_info": job_info,
+            "schema": EMAIL_COVER_SCHEMA_TEXT
+        }, schemas={"job_info": JOB_INFO_SCHEMA}, trim=("job_info", "resume"))
+
+        try:
+            return stream_json_prompt(self.llm, EMAIL_COVER_TEMPLATE, prompt_inputs, EMAIL_COVER_SCHEMA, on_field)
+        except Exception as e:
+            logging.error(f"Error during email and cover letter generation: {e}")
             raise
@@ -0,0 +1,78 @@
+import logging
+from prompts.fit_email_prompt import FIT_EMAIL_PROMPT_TEMPLATE, FIT_EMAIL_SCHEMA, FIT_EMAIL_SCHEMA_TEXT
+from prompts.fit_evaluator_prompt import FIT_EVALUATOR_SCHEMA
+from prompts.email_cover_prompt import EMAIL_COVER_SCHEMA
+from prompts.job_info_prompt import JOB_INFO_SCHEMA
+from utils.prompt_compaction import compact_inputs
+from utils.prompt_runner import run_json_prompt, stream_json_prompt
+from utils.resume_service import resume_prompt_text
+
+
+def split_fit_email(result: dict) -> tuple:
+    """Splits a fused response into the FitEvaluatorAgent and EmailGeneratorAgent results."""
+    fit_eval = {k: result[k] for k in FIT_EVALUATOR_SCHEMA if k in result}
+    email_gen = {k: result[k] for k in EMAIL_COVER_SCHEMA if k in result}
+    return fit_eval, email_gen
+
+
+class FitEmailAgent:
+    def __init__(self, llm):
+        """
+        Evaluates the fit and writes the application messages in a single request.
+
+        The resume and job info are sent once instead of once per agent; the
+        result splits into the same dicts FitEvaluatorAgent and
+        EmailGeneratorAgent return.
+
+        Args:
+            llm (BaseLLM): A language model instance used by the agent.
+        """
+        self.llm = llm
+
+    def _prompt_inputs(self, resume, job_info: dict) -> dict:
+        prompt_inputs, _ = compact_inputs("fit_email", {
+            "resume": resume_prompt_text(resume),
+            "job_info": job_info,
+            "schema": FIT_EMAIL_SCHEMA_TEXT
+        }, schemas={"job_info": JOB_INFO_SCHEMA}, trim=("job_info", "resume"))
+        return prompt_inputs
+
+    def run(self, resume, job_info: dict) -> tuple:
+        """
+        Evaluate the fit and generate the email, cover letter and LinkedIn messages.
+
+        Args:
+            resume (ResumeProfile): The compiled resume; a plain resume dict also works.
+            job_info (dict): A dictionary containing information about the job.
+
+        Returns:
+            tuple: (fit_eval, email_gen) dicts, as FitEvaluatorAgent and EmailGeneratorAgent return them.
+        """
+        logging.info("Running FitEmailAgent...")
+        try:
+            result = run_json_prompt(self.llm, FIT_EMAIL_PROMPT_TEMPLATE, self._prompt_inputs(resume, job_info), FIT_EMAIL_SCHEMA)
+            return split_fit_email(result)
+        except Exception as e:
+            logging.error(f"Error during fused fit evaluation and email generation: {e}")
+            raise
+
+    def run_stream(self, resume, job_info: dict, on_field) -> tuple:
+        """
+        Same as run(), but streams the completion and calls on_field(path, value)
+        for each field as soon as it is complete; fit_score arrives first.
+
+        Args:
+            resume (ResumeProfile): The compiled resume; a plain resume dict also works.
+            job_info (dict): A dictionary containing information about the job.
+            on_field (callable): Receives (path, value), e.g. (("fit_score",), 7.5).
+
+        Returns:
+            tuple: (fit_eval, email_gen), as returned by run().
+        """
+        try:
+            result = stream_json_prompt(self.llm, FIT_EMAIL_PROMPT_TEMPLATE, self._prompt_inputs(resume, job_info),
+                                        FIT_EMAIL_SCHEMA, on_field)
+            return split_fit_email(result)
+        except Exception as e:
+            logging.error(f"Error during fused fit evaluation and email generation: {e}")
+            raise
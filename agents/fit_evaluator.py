@@ -1,7 +1,9 @@
-import json
 import logging
-from prompts.fit_evaluator_prompt import FIT_EVALUATOR_PROMPT_TEMPLATE, FIT_EVALUATOR_SCHEMA
-from utils.prompt_runner import run_json_prompt
+from prompts.fit_evaluator_prompt import FIT_EVALUATOR_PROMPT_TEMPLATE, FIT_EVALUATOR_SCHEMA, FIT_EVALUATOR_SCHEMA_TEXT
+from prompts.job_info_prompt import JOB_INFO_SCHEMA
+from utils.prompt_compaction import compact_inputs
+from utils.prompt_runner import run_json_prompt, stream_json_prompt
+from utils.resume_service import resume_prompt_text
 
 class FitEvaluatorAgent:
     def __init__(self, llm):
@@ -16,29 +18,54 @@ class FitEvaluatorAgent:
         """
         self.llm = llm
 
-    def run(self, resume: str, job_info: dict) -> dict:
+    def run(self, resume, job_info: dict) -> dict:
         """
         Evaluate the fit of a resume to a job description.
 
         Args:
-            resume (str): The text of the resume.
+            resume (ResumeProfile): The compiled resume; a plain resume dict also works.
             job_info (dict): A dictionary containing information about the job.
 
         Returns:
             dict: A dictionary containing the fit score and skills matched/missing.
 
         """
-        print("Running FitEvaluatorAgent...")
+        logging.info("Running FitEvaluatorAgent...")
 
-        prompt_inputs = {
-            "resume": resume,
-            "job_info": json.dumps(job_info, indent=2),
-            "schema": json.dumps(FIT_EVALUATOR_SCHEMA, indent=2)
-        }
+        prompt_inputs, _ = compact_inputs("fit_eval", {
+            "resume": resume_prompt_text(resume),
+            "job_info": job_info,
+            "schema": FIT_EVALUATOR_SCHEMA_TEXT
+        }, schemas={"job_info": JOB_INFO_SCHEMA}, trim=("job_info", "resume"))
 
         try:
             result = run_json_prompt(self.llm, FIT_EVALUATOR_PROMPT_TEMPLATE, prompt_inputs, FIT_EVALUATOR_SCHEMA)
             return result
         except Exception as e:
-            print(f"Error during fit evaluation: {e}")
+            logging.error(f"Error during fit evaluation: {e}")
+            raise
+
+    def run_stream(self, resume, job_info: dict, on_field) -> dict:
+        """
+        Same as run(), but streams the completion and calls on_field(path, value)
+        for each field of FIT_EVALUATOR_SCHEMA as soon as it is complete.
+
+        Args:
+            resume (ResumeProfile): The compiled resume; a plain resume dict also works.
+            job_info (dict): A dictionary containing information about the job.
+            on_field (callable): Receives (path, value), e.g. (("fit_score",), 7.5).
+
+        Returns:
+            dict: The complete result, as returned by run().
+        """
+        prompt_inputs, _ = compact_inputs("fit_eval", {
+            "resume": resume_prompt_text(resume),
+            "job_info": job_info,
+            "schema": FIT_EVALUATOR_SCHEMA_TEXT
+        }, schemas={"job_info": JOB_INFO_SCHEMA}, trim=("job_info", "resume"))
+
+        try:
+            return stream_json_prompt(self.llm, FIT_EVALUATOR_PROMPT_TEMPLATE, prompt_inputs, FIT_EVALUATOR_SCHEMA, on_field)
+        except Exception as e:
+            logging.error(f"Error during fit evaluation: {e}")
             raise
@@ -1,77 +1,96 @@
-import json
 import logging
-from prompts.get_recruiter_prompt import GET_RECRUITER_SCHEMA, GET_RECRUITER_PROMPT
+from prompts.get_recruiter_prompt import GET_RECRUITER_SCHEMA, GET_RECRUITER_PROMPT, GET_RECRUITER_SCHEMA_TEXT
+from utils.prompt_compaction import compact_inputs
 from utils.prompt_runner import run_json_prompt
+from utils.company_cache import company_key, recruiter_urls
+from utils.logger import record_cache_hit, span
+from config import RECRUITER_MAX_RESULTS
+from search.base import as_search_provider
+from search.linkedin import merge_profile_urls
 
+# Searched next to the model's query; each finds a different kind of contact
+RECRUITER_QUERY_TEMPLATES = (
+    'site:linkedin.com/in/ ("recruiter" OR "talent acquisition") "{company_name}" "{location}"',
+    'site:linkedin.com/in/ ("hiring manager" OR "head of") "{company_name}" "{location}"',
+)
 
 
-import requests
-from googlesearch import search # Import the search function from googlesearch-python
+def _phrase(value: str) -> str:
+    # The templates quote each value as an exact phrase; a stray quote would end it early
+    return " ".join(str(value or "").replace('"', " ").split())
 
-def google_search_top(query):
-    """
-    Performs a Google search for the given query using the googlesearch-python package
-    and returns the top 5 result URLs.
 
-    Args:
-        query (str): The search query string.
+def recruiter_queries(company_name: str, location: str) -> list:
+    """Template query variants for one company and country."""
+    values = {"company_name": _phrase(company_name), "location": _phrase(location)}
+    return [template.format(**values) for template in RECRUITER_QUERY_TEMPLATES]
+
 
-    Returns:
-        list: A list of the top 5 Google search result URLs.
-              Returns an empty list if no results are found or an error occurs.
-    """
-    try:
-        # Use the search function from googlesearch-python
-        # num_results specifies the number of results to retrieve
-        top_results = list(search(query, num_results=10))
-        return top_results
-    except Exception as e:
-        print(f"An error occurred during search: {e}")
-        return []
 class GetRecruiterAgent:
-    def __init__(self, llm):
+    def __init__(self, llm, search=None):
         """
         Constructor for GetRecruiterAgent.
 
         Args:
             llm (BaseLLM): A language model that can be used to evaluate the fit of a resume to a job description.
+            search (SearchProvider | callable): Search backend, or a function mapping a query to
+                result URLs. Defaults to create_search_provider() (cached Google, or fixtures
+                when SEARCH_PROVIDER is "fake").
 
         Returns:
             None
         """
         self.llm = llm
+        if search is None:
+            from search.factory import create_search_provider
+            search = create_search_provider()
+        self.search = as_search_provider(search)
 
-    def run(self, company_name: str, location: str) -> dict:
+    def run(self, company_name: str, location: str, refresh: bool = False) -> dict:
         """
         get_recruiter_agent: Searches for recruiter information for a given company and location.
 
         Args:
-            company_name (str): The text of the resume.
-            location (dict): A dictionary containing information about the job.
+            company_name (str): The name of the company.
+            location (str): The country of the job location.
+            refresh (bool): Ignore cached recruiter URLs for this company and search again.
 
         Returns:
-            dict: A dictionary containing the fit score and skills matched/missing.
+            list: Canonical LinkedIn profile URLs, deduplicated across the query variants and
+                cached per normalized company and country.
 
         """
-        print("Running get recruiter agent...")
-        # search_query = f'site:linkedin.com/in/ OR site:linkedin.com/pub/ (hiring manager OR recruiter) "{company_name}" "{location}"'
-        # print(f"Searching for: {search_query}")
-        # top_results = google_search_top(search_query)
-
-
-
-        
-        prompt_inputs = {
+        logging.info("Running GetRecruiterAgent...")
+        key = company_key(company_name, location)
+        if key and not refresh:
+            cached = recruiter_urls.get(key)
+            if cached is not None:
+                logging.info(f"Recruiter URL cache hit for '{key}'")
+                record_cache_hit("recruiter_urls")
+                return cached
+        prompt_inputs, _ = compact_inputs("recruiter_data", {
             "company_name": company_name,
             "location": location,
-            "schema": json.dumps(GET_RECRUITER_SCHEMA, indent=2)
-        }
+            "schema": GET_RECRUITER_SCHEMA_TEXT
+        })
 
+        template_queries = recruiter_queries(company_name, location)
         try:
+            # The template queries do not need the model, so they run on the search pool while it writes its own query
+            templates = self.search.submit_many(template_queries)
             result = run_json_prompt(self.llm, GET_RECRUITER_PROMPT, prompt_inputs,GET_RECRUITER_SCHEMA)
-            top_results = google_search_top(result.get("search_query", ""))
+            model_query = result.get("search_query", "").strip()
+            with span("search", provider=self.search.name) as search_span:
+                # The model's query ranks first in the merge
+                result_lists = [self.search.search(model_query)] if model_query not in ("", *template_queries) else []
+                result_lists += [future.result() for future in templates]
+                top_results = merge_profile_urls(result_lists, limit=RECRUITER_MAX_RESULTS)
+                search_span.set(queries=len(result_lists), results=len(top_results),
+                                raw_results=sum(len(r) for r in result_lists))
+            if key and top_results:  # An empty list usually means the search failed
+                recruiter_urls.set(key, top_results)
 
             return top_results
         except Exception as e:
-            print(f"Error during get_recruiter_agent: {e}")
+            logging.error(f"Error during get_recruiter_agent: {e}")
             raise
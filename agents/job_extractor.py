@@ -1,9 +1,9 @@
 # agents/job_extractor.py
-from bs4 import BeautifulSoup
-import requests
 import logging
-import json
-from prompts.job_info_prompt import JOB_INFO_SCHEMA, JOB_INFO_PROMPT_TEMPLATE
+from prompts.job_info_prompt import JOB_INFO_SCHEMA, JOB_INFO_PROMPT_TEMPLATE, JOB_INFO_SCHEMA_TEXT
+from utils.fetcher import fetch_job_text
+from utils.logger import span
+from utils.prompt_compaction import compact_inputs
 from utils.prompt_runner import run_json_prompt
 
 class JobInfoExtractor:
@@ -14,22 +14,26 @@ class JobInfoExtractor:
         if not url.startswith("http"):
             return url
         logging.info(f"Scraping job page: {url}")
-        try:
-            resp = requests.get(url, timeout=40)
-            resp.raise_for_status()
-            soup = BeautifulSoup(resp.text, "html.parser")
-            return soup.body.get_text(separator="\n", strip=True) if soup.body else ""
-        except Exception as e:
-            logging.error(f"Error scraping job page: {e}")
-            return ""
+        with span("scrape", url=url) as scrape_span:
+            try:
+                text = fetch_job_text(url)
+            except Exception as e:
+                logging.error(f"Error scraping job page: {e}")
+                scrape_span.set(error=str(e))
+                return ""
+            scrape_span.set(text_chars=len(text))
+            return text
 
     def run(self, url: str) -> tuple:
         job_text = self.scrape_job_page(url)
         if not job_text:
             raise ValueError("Job page could not be scraped.")
-        job_info = run_json_prompt(self.llm, JOB_INFO_PROMPT_TEMPLATE, {
+        return job_text, self.extract(job_text, url)
+
+    def extract(self, job_text: str, url: str) -> dict:
+        prompt_inputs, _ = compact_inputs("job_info", {
             "job_text": job_text,
-            "job_info_schema": json.dumps(JOB_INFO_SCHEMA),
+            "job_info_schema": JOB_INFO_SCHEMA_TEXT,
             "url": url
-        }, JOB_INFO_SCHEMA)
-        return job_text, job_info
+        }, trim=("job_text",))
+        return run_json_prompt(self.llm, JOB_INFO_PROMPT_TEMPLATE, prompt_inputs, JOB_INFO_SCHEMA)
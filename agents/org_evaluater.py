@@ -1,7 +1,9 @@
-import json
 import logging
-from prompts.org_evaluater_prompt import ORG_EVALUATER_SCHEMA, ORG_EVALUATER_PROMPT
+from prompts.org_evaluater_prompt import ORG_EVALUATER_SCHEMA, ORG_EVALUATER_PROMPT, ORG_EVALUATER_SCHEMA_TEXT
+from utils.prompt_compaction import compact_inputs
 from utils.prompt_runner import run_json_prompt
+from utils.company_cache import company_key, company_reports
+from utils.logger import record_cache_hit
 
 class OrgEvaluatorAgent:
     def __init__(self, llm):
@@ -16,29 +18,43 @@ class OrgEvaluatorAgent:
         """
         self.llm = llm
 
-    def run(self, company_name: str, location: str) -> dict:
+    def run(self, company_name: str, location: str, refresh: bool = False) -> dict:
         """
-        Evaluate the fit of a resume to a job description.
+        Research a company for the job application.
+
+        Reports are cached per normalized company and country, so later postings
+        from the same employer are answered from the cache.
 
         Args:
-            resume (str): The text of the resume.
-            job_info (dict): A dictionary containing information about the job.
+            company_name (str): The name of the company.
+            location (str): The country of the job location.
+            refresh (bool): Ignore a cached report for this company and research it again.
 
         Returns:
-            dict: A dictionary containing the fit score and skills matched/missing.
+            dict: A dictionary containing the company research report.
 
         """
-        print("Running OrgEvaluatorAgent...")
+        logging.info("Running OrgEvaluatorAgent...")
+
+        key = company_key(company_name, location)
+        if key and not refresh:
+            cached = company_reports.get(key)
+            if cached is not None:
+                logging.info(f"Company report cache hit for '{key}'")
+                record_cache_hit("company_reports")
+                return cached
 
-        prompt_inputs = {
+        prompt_inputs, _ = compact_inputs("org_eval", {
             "company_name": company_name,
             "location": location,
-            "schema": json.dumps(ORG_EVALUATER_SCHEMA, indent=2)
-        }
+            "schema": ORG_EVALUATER_SCHEMA_TEXT
+        })
 
         try:
             result = run_json_prompt(self.llm, ORG_EVALUATER_PROMPT, prompt_inputs, ORG_EVALUATER_SCHEMA)
+            if key:
+                company_reports.set(key, result)
             return result
         except Exception as e:
-            print(f"Error during fit evaluation: {e}")
+            logging.error(f"Error during company research: {e}")
             raise
@@ -0,0 +1,339 @@
+# batch_run.py
+"""
+Headless bulk runner for the job agent chain.
+
+Usage:
+    python batch_run.py jobs.jsonl --concurrency 8
+    python batch_run.py urls.txt --checkpoint urls.checkpoint.jsonl
+    python batch_run.py urls.txt --triage        # skip email/recruiter search for weak matches
+    python batch_run.py urls.txt --fused         # one request for fit evaluation and messages
+    python batch_run.py jobs.jsonl --provider fake   # offline run with deterministic responses
+    python batch_run.py urls.txt --no-dedupe     # also run postings that are already saved
+    python batch_run.py urls.txt --resumes data/resumes   # rank every resume variant per job
+    python batch_run.py jobs.jsonl --stream --output results.jsonl
+    cat jobs.jsonl | python batch_run.py - --stream > results.jsonl
+
+Input files are either JSONL (one string, or one object with a "url",
+"job_url", "job_text" or "text" field per line) or plain text with one
+job URL per line. Every finished job is appended to a checkpoint file so a
+restart skips work that is already done, and records are written to the
+record store in bulk. Postings that are already in the record store (the
+same URL, company and job id, or near-identical text) are skipped right
+after scraping and not saved again.
+
+With --stream the input (a file, or stdin for "-") is read lazily through a
+bounded queue instead of being loaded up front: a slow provider makes the
+reader wait, and each job's result is written as one JSON line as soon as it
+finishes. Streaming runs keep no checkpoint; memory stays flat for inputs of
+any size.
+"""
+import argparse
+import functools
+import hashlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from dotenv import load_dotenv
+
+from config import (
+    BATCH_CONCURRENCY, BATCH_FLUSH_EVERY, DEDUPE_ENABLED, LLM_PROVIDER, RECORD_DB_PATH, STREAM_QUEUE_SIZE,
+    TRIAGE_THRESHOLD,
+)
+from llm.factory import create_llms
+from llm.rate_limiter import limiter_stats
+from search.factory import create_search_provider
+from utils.job_fingerprint import fingerprint_job
+from utils.logger import configure_logging, start_metrics_server
+from utils.pipeline import JobPipeline
+from utils.record_store import RecordStore, build_application_record, save_application_records
+from utils.resume_service import DEFAULT_RESUME_PATH, get_resume, get_resume_variants
+from utils.stream_ingest import iter_job_entries, stream_jobs
+
+
+def job_key(job_input: str) -> str:
+    """Stable identifier of a job input, used as the checkpoint key."""
+    return hashlib.sha1(job_input.strip().encode("utf-8")).hexdigest()
+
+
+def read_job_inputs(path: str) -> list:
+    """
+    Reads job URLs or job texts from a JSONL or plain text file.
+
+    Args:
+        path (str): Path of the input file.
+
+    Returns:
+        list: The job inputs in file order, without duplicates.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        entries = iter_job_entries(f, is_jsonl=path.endswith((".jsonl", ".ndjson")))
+        return list(dict.fromkeys(job_input for _, job_input, _ in entries))
+
+
+class Checkpoint:
+    def __init__(self, path: str):
+        """
+        Append-only JSONL log of job outcomes.
+
+        Each line is {"key", "status", ...} where status is "done" (with the
+        pipeline result), "failed" (with the error) or "saved". Failed jobs are
+        retried on the next run; done-but-unsaved jobs are saved without re-running.
+
+        Args:
+            path (str): Path of the checkpoint file.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self.done = {}
+        self.saved = set()
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # A torn last line from an interrupted run
+                    if entry["status"] == "done":
+                        self.done[entry["key"]] = entry["result"]
+                    elif entry["status"] == "saved":
+                        self.saved.add(entry["key"])
+
+    def _append(self, entry: dict):
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+
+    def mark_done(self, key: str, result: dict):
+        self.done[key] = result
+        self._append({"key": key, "status": "done", "result": result})
+
+    def mark_failed(self, key: str, error: str):
+        self._append({"key": key, "status": "failed", "error": error})
+
+    def mark_saved(self, keys: list):
+        for key in keys:
+            self.saved.add(key)
+            self._append({"key": key, "status": "saved"})
+
+
+def save_results(results: list, db_path: str, dedupe: bool = DEDUPE_ENABLED):
+    """Writes pipeline results to the record store in one bulk save, skipping postings that are already saved."""
+    records = [
+        build_application_record(r["job_info"], r["fit_eval"], r["email_gen"], r["org_eval"], r["recruiter_data"],
+                                 r.get("resume_id"))
+        for r in results
+    ]
+    # Copies of one posting in the same batch all miss the store while they run; only the first is saved
+    fingerprints = None
+    if dedupe:
+        fingerprints = [fingerprint_job(r.get("job_text", ""), job_info=r["job_info"]) for r in results]
+    save_application_records(records, db_path, fingerprints)
+
+
+def flush_records(checkpoint: Checkpoint, pending: dict, db_path: str, dedupe: bool = DEDUPE_ENABLED):
+    """Saves buffered results and marks them saved in the checkpoint."""
+    if not pending:
+        return
+    save_results(list(pending.values()), db_path, dedupe)
+    checkpoint.mark_saved(list(pending))
+    pending.clear()
+
+
+def run_batch(job_inputs: list, pipeline: JobPipeline, resume, checkpoint: Checkpoint,
+              concurrency: int = BATCH_CONCURRENCY, flush_every: int = BATCH_FLUSH_EVERY,
+              db_path: str = RECORD_DB_PATH, dedupe: bool = DEDUPE_ENABLED) -> dict:
+    """
+    Runs the pipeline over many job inputs with bounded concurrency.
+
+    Args:
+        job_inputs (list): Job URLs or texts.
+        pipeline (JobPipeline): The agent chain to run for each job.
+        resume (ResumeProfile | dict): The compiled resume, or resume_id -> ResumeProfile to
+            evaluate every variant and save the best one.
+        checkpoint (Checkpoint): Progress log used to skip finished jobs.
+        concurrency (int): Number of jobs in flight at once.
+        flush_every (int): Number of finished jobs buffered before a bulk save.
+        db_path (str): Path of the record store.
+        dedupe (bool): Skip saving results whose posting is already in the record store.
+
+    Returns:
+        dict: Counts of completed, failed, skipped, triaged-out and duplicate jobs, throughput
+            and the per-provider rate limiter state.
+    """
+    keyed = [(job_key(j), j) for j in job_inputs]
+    # Jobs finished by a previous run but not yet saved go straight to the save buffer
+    pending = {k: checkpoint.done[k] for k, _ in keyed if k in checkpoint.done and k not in checkpoint.saved}
+    todo = [(k, j) for k, j in keyed if k not in checkpoint.done]
+    stats = {"total": len(keyed), "skipped": len(keyed) - len(todo), "completed": 0, "failed": 0, "triaged_out": 0,
+             "duplicates": 0}
+    logging.info(f"Batch: {len(todo)} job(s) to run, {stats['skipped']} already done, concurrency={concurrency}")
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {executor.submit(pipeline.run, job_input, resume): key for key, job_input in todo}
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                logging.error(f"Job {key[:10]} failed: {e}")
+                checkpoint.mark_failed(key, str(e))
+                stats["failed"] += 1
+                continue
+            checkpoint.mark_done(key, result)
+            if result.get("duplicate_of"):
+                checkpoint.mark_saved([key])  # Its record already exists
+                stats["duplicates"] += 1
+                continue
+            pending[key] = result
+            stats["completed"] += 1
+            if result.get("prescore") and result.get("email_gen") is None:
+                stats["triaged_out"] += 1
+            if len(pending) >= flush_every:
+                flush_records(checkpoint, pending, db_path, dedupe)
+    flush_records(checkpoint, pending, db_path, dedupe)
+
+    elapsed = time.perf_counter() - started
+    stats["elapsed_seconds"] = round(elapsed, 2)
+    stats["jobs_per_minute"] = round(stats["completed"] / elapsed * 60, 2) if elapsed > 0 else 0.0
+    stats["rate_limits"] = limiter_stats()
+    return stats
+
+
+def run_stream(lines, pipeline: JobPipeline, resume, out, concurrency: int = BATCH_CONCURRENCY,
+               queue_size: int = STREAM_QUEUE_SIZE, flush_every: int = BATCH_FLUSH_EVERY,
+               db_path: str = RECORD_DB_PATH, dedupe: bool = DEDUPE_ENABLED, save: bool = True,
+               is_jsonl: bool = None) -> dict:
+    """
+    Streams job entries through the pipeline, writing one result line per job as it completes.
+
+    Args:
+        lines (iterable): Input lines (JSONL or one URL per line), read lazily.
+        pipeline (JobPipeline): The agent chain to run for each job.
+        resume (ResumeProfile | dict): As in run_batch().
+        out (file): Text stream for the JSONL results.
+        concurrency (int): Number of jobs in flight at once.
+        queue_size (int): Entries read ahead of the workers before the reader waits.
+        flush_every (int): Number of finished jobs buffered before a bulk save.
+        db_path (str): Path of the record store.
+        dedupe (bool): Skip saving results whose posting is already in the record store.
+        save (bool): Save finished jobs to the record store as well.
+        is_jsonl (bool): Whether the lines are JSONL; None decides per line (for stdin).
+
+    Returns:
+        dict: Counts of read, completed, failed and duplicate jobs, throughput, reader wait
+            time and the per-provider rate limiter state.
+    """
+    pending = []
+    lock = threading.Lock()
+
+    def buffer_result(result):
+        with lock:
+            pending.append(result)
+            if len(pending) < flush_every:
+                return
+            batch = pending[:]
+            pending.clear()
+        save_results(batch, db_path, dedupe)
+
+    logging.info(f"Streaming jobs: concurrency={concurrency}, queue_size={queue_size}")
+    stats = stream_jobs(iter_job_entries(lines, is_jsonl), functools.partial(pipeline.run, resume=resume), out,
+                        concurrency=concurrency, queue_size=queue_size, on_result=buffer_result if save else None)
+    if pending:
+        save_results(pending, db_path, dedupe)
+    stats["rate_limits"] = limiter_stats()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the job agent chain over many job URLs or texts.")
+    parser.add_argument("input", help='JSONL or text file of job URLs / job texts ("-" reads stdin with --stream)')
+    parser.add_argument("--concurrency", type=int, default=BATCH_CONCURRENCY, help="Jobs in flight at once")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: <input>.checkpoint.jsonl)")
+    parser.add_argument("--flush-every", type=int, default=BATCH_FLUSH_EVERY, help="Finished jobs per bulk save")
+    parser.add_argument("--db", default=RECORD_DB_PATH, help="Record store path")
+    parser.add_argument("--resume", default=DEFAULT_RESUME_PATH, help="Resume JSON file")
+    parser.add_argument("--resumes", metavar="DIR",
+                        help="Directory of resume variants; each job is evaluated against all of them "
+                             "and saved with the best fit")
+    parser.add_argument("--provider", default=LLM_PROVIDER, choices=("hosted", "local", "fake"),
+                        help="LLM backend: Groq + Perplexity, a local OpenAI-compatible server, or offline fakes")
+    parser.add_argument("--fused", action="store_true", help="Evaluate fit and write messages in one LLM request")
+    parser.add_argument("--triage", nargs="?", type=float, const=TRIAGE_THRESHOLD, default=None, metavar="THRESHOLD",
+                        help=f"Skip email generation and recruiter search below this local pre-score (default {TRIAGE_THRESHOLD:g})")
+    parser.add_argument("--no-dedupe", dest="dedupe", action="store_false", default=DEDUPE_ENABLED,
+                        help="Run and save postings even when the record store already has them")
+    parser.add_argument("--stream", action="store_true",
+                        help="Read the input lazily and write one JSON result line per finished job")
+    parser.add_argument("--output", default="-", help='Result JSONL file for --stream (default "-": stdout)')
+    parser.add_argument("--queue-size", type=int, default=STREAM_QUEUE_SIZE,
+                        help="Entries read ahead of the workers in --stream mode")
+    parser.add_argument("--no-save", dest="save", action="store_false",
+                        help="With --stream, only write the result lines, not the record store")
+    args = parser.parse_args()
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.input == "-" and not args.stream:
+        parser.error('reading stdin ("-") requires --stream')
+
+    load_dotenv()
+    configure_logging()
+    start_metrics_server()  # No-op unless METRICS_PORT is set
+
+    try:
+        main_llm, research_llm = create_llms(args.provider)
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+    pipeline = JobPipeline(
+        groq_llm=main_llm,
+        perplexity_llm=research_llm,
+        triage_threshold=args.triage,
+        fused=args.fused,
+        search=create_search_provider("fake") if args.provider == "fake" else None,
+        records=RecordStore(args.db) if args.dedupe else None,
+    )
+    if args.resumes:
+        resume = get_resume_variants(args.resumes)
+        if not resume:
+            raise SystemExit(f"No resume variants (*.json) found in {args.resumes}")
+    else:
+        resume = get_resume(args.resume)
+
+    if args.stream:
+        source = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8")
+        out = sys.stdout if args.output == "-" else open(args.output, "a", encoding="utf-8")
+        try:
+            stats = run_stream(source, pipeline, resume, out, concurrency=args.concurrency,
+                               queue_size=args.queue_size, flush_every=args.flush_every, db_path=args.db,
+                               dedupe=args.dedupe, save=args.save,
+                               is_jsonl=args.input.endswith((".jsonl", ".ndjson")) or None)
+        finally:
+            for f in (source, out):
+                if f not in (sys.stdin, sys.stdout):
+                    f.close()
+        # Stats go to stderr so stdout stays pure JSONL
+        print(json.dumps(stats, indent=2), file=sys.stderr if out is sys.stdout else sys.stdout)
+        return
+
+    checkpoint = Checkpoint(args.checkpoint or f"{args.input}.checkpoint.jsonl")
+    stats = run_batch(
+        read_job_inputs(args.input),
+        pipeline,
+        resume,
+        checkpoint,
+        concurrency=args.concurrency,
+        flush_every=args.flush_every,
+        db_path=args.db,
+        dedupe=args.dedupe,
+    )
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
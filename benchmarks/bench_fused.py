@@ -0,0 +1,229 @@
+# benchmarks/bench_fused.py
+"""
+Fused FitEmailAgent request vs. separate FitEvaluatorAgent + EmailGeneratorAgent requests.
+
+Usage:
+    python -m benchmarks.bench_fused --jobs 20
+    python -m benchmarks.bench_fused --live --jobs 5 --json results.json
+
+Both paths see the same resume and job infos. The two-call path runs its
+requests concurrently, as the pipeline does. Reported per path: estimated
+prompt and completion tokens, wall time per job (p50/p95) and the share of
+jobs that failed. By default a simulated model is used; its latency grows
+with prompt and completion tokens like a hosted model. --live sends real
+Groq requests (GROQ_API_KEY). The LLM response cache is disabled.
+"""
+import os
+
+os.environ["LLM_CACHE_ENABLED"] = "0"
+
+import argparse
+import json
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+from agents.email_generator import EmailGeneratorAgent
+from agents.fit_email_agent import FitEmailAgent
+from agents.fit_evaluator import FitEvaluatorAgent
+from llm.base import BaseLLM
+from utils.prompt_compaction import estimate_tokens
+from utils.resume_service import DEFAULT_RESUME_PATH, get_resume
+
+SAMPLE_JOBS = [
+    {
+        "Job_Title": "Senior Backend Engineer", "company_name": "Acme Cloud", "location": "Berlin, Germany",
+        "location_country": "Germany", "job_id": "ACM-1042", "job_url": "https://jobs.acme.example/1042",
+        "Skills": ["Python", "FastAPI", "PostgreSQL", "Kubernetes", "AWS"],
+        "Requirements": "5+ years building Python services; REST API design; PostgreSQL; Kubernetes in production.",
+        "Responsibilities": "Design and operate the billing platform; mentor engineers; own on-call for core services.",
+        "summery": "Backend role on a billing platform team building Python microservices on AWS and Kubernetes.",
+        "Additional_Info": {"Tech_Stack": ["Python", "FastAPI", "PostgreSQL", "Kafka"], "Perks": ["Remote days"]},
+    },
+    {
+        "Job_Title": "AI Engineer (LLM Applications)", "company_name": "Nimbus Labs", "location": "Bangalore, India",
+        "location_country": "India", "job_id": "NL-77", "job_url": "https://nimbus.example/careers/77",
+        "Skills": ["Python", "LangChain", "RAG", "Vector databases", "React"],
+        "Requirements": "Experience shipping LLM features with retrieval augmented generation and embeddings; React for internal tools.",
+        "Responsibilities": "Build retrieval pipelines, evaluate prompts, ship AI features end to end.",
+        "summery": "Applied AI role building RAG products with Python and LangChain, plus light React work.",
+        "Additional_Info": {"Tech_Stack": ["OpenSearch", "AWS Bedrock", "Next.js"], "Perks": ["Learning budget"]},
+    },
+    {
+        "Job_Title": "Frontend Developer", "company_name": "Pixel & Co", "location": "Remote",
+        "location_country": "Netherlands", "job_id": "PX-9", "job_url": "https://pixel.example/jobs/9",
+        "Skills": ["Vue", "TypeScript", "CSS", "Figma"],
+        "Requirements": "Vue 3 and TypeScript; strong CSS; collaborating with designers in Figma.",
+        "Responsibilities": "Own the design system and customer dashboard.",
+        "summery": "Frontend role on a Vue and TypeScript dashboard with a design-system focus.",
+        "Additional_Info": {"Tech_Stack": ["Vue", "Vite", "Storybook"], "Perks": []},
+    },
+]
+
+# Words per simulated string field, by key
+_FIELD_WORDS = {"body": 140, "summary": 60, "subject": 10}
+
+
+class SimulatedLLM(BaseLLM):
+    def __init__(self, fail_rate: float = 0.0, time_scale: float = 1.0, seed: int = 7):
+        """
+        Answers with schema-shaped JSON after a token-proportional delay.
+
+        Latency model (seconds): 0.3 + 0.00015 per prompt token + 0.0035 per
+        completion token, times time_scale.
+
+        Args:
+            fail_rate (float): Probability that a response is malformed JSON.
+            time_scale (float): Multiplier applied to the simulated delays.
+            seed (int): Random seed, so runs are repeatable.
+        """
+        self.model = "simulated"
+        self.temperature = 0.0
+        self.max_tokens = 4000
+        self.fail_rate = fail_rate
+        self.time_scale = time_scale
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _fill(self, schema, key=""):
+        if isinstance(schema, dict):
+            return {k: self._fill(v, k) for k, v in schema.items()}
+        if isinstance(schema, list):
+            return [self._fill(schema[0], key) for _ in range(3)]
+        if schema.startswith("float"):
+            return 6.5
+        return " ".join(["lorem"] * _FIELD_WORDS.get(key, 4))
+
+    def call(self, prompt: str, response_schema: dict = None) -> str:
+        raw = json.dumps(self._fill(response_schema or {}))
+        with self._lock:
+            failed = self._random.random() < self.fail_rate
+        time.sleep((0.3 + 0.00015 * estimate_tokens(prompt) + 0.0035 * estimate_tokens(raw)) * self.time_scale)
+        return raw[: len(raw) // 2] if failed else raw
+
+
+class MeteredLLM(BaseLLM):
+    def __init__(self, llm):
+        """Counts estimated prompt and completion tokens of every call made through it."""
+        self.llm = llm
+        self.model = getattr(llm, "model", None)
+        self.temperature = getattr(llm, "temperature", None)
+        self.max_tokens = getattr(llm, "max_tokens", None)
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def call(self, prompt: str, response_schema: dict = None) -> str:
+        raw = self.llm.call(prompt, response_schema)
+        with self._lock:
+            self.requests += 1
+            self.prompt_tokens += estimate_tokens(prompt)
+            self.completion_tokens += estimate_tokens(raw)
+        return raw
+
+
+def _percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)]
+
+
+def run_path(name: str, llm, resume, jobs: list) -> dict:
+    """
+    Runs one path over all jobs and summarizes it.
+
+    Args:
+        name (str): "two_call" or "fused".
+        llm (BaseLLM): The backend model.
+        resume (ResumeProfile): The compiled resume.
+        jobs (list): Job info dicts.
+
+    Returns:
+        dict: Request, token, wall-time and failure statistics.
+    """
+    metered = MeteredLLM(llm)
+    fit_agent, email_agent = FitEvaluatorAgent(metered), EmailGeneratorAgent(metered)
+    fused_agent = FitEmailAgent(metered)
+    walls, failures = [], 0
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        for job_info in jobs:
+            started = time.perf_counter()
+            try:
+                if name == "fused":
+                    fused_agent.run(resume, job_info)
+                else:
+                    fit = pool.submit(fit_agent.run, resume, job_info)
+                    email = pool.submit(email_agent.run, resume, job_info)
+                    fit.result(), email.result()
+            except Exception:
+                failures += 1
+            walls.append(time.perf_counter() - started)
+    return {
+        "path": name,
+        "jobs": len(jobs),
+        "requests": metered.requests,
+        "prompt_tokens": metered.prompt_tokens,
+        "completion_tokens": metered.completion_tokens,
+        "total_tokens": metered.prompt_tokens + metered.completion_tokens,
+        "wall_p50_s": round(statistics.median(walls), 3),
+        "wall_p95_s": round(_percentile(walls, 95), 3),
+        "wall_total_s": round(sum(walls), 3),
+        "failure_rate": round(failures / len(jobs), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the fused fit+email request with the two-call path.")
+    parser.add_argument("--jobs", type=int, default=12, help="Number of jobs (sample jobs are cycled)")
+    parser.add_argument("--job-infos", help="JSONL file of job info dicts to use instead of the samples")
+    parser.add_argument("--resume", default=DEFAULT_RESUME_PATH, help="Resume JSON file")
+    parser.add_argument("--live", action="store_true", help="Send real requests to Groq")
+    parser.add_argument("--fail-rate", type=float, default=0.02, help="Simulated malformed-response rate")
+    parser.add_argument("--time-scale", type=float, default=0.1, help="Simulated delay multiplier")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    load_dotenv()
+    if args.job_infos:
+        with open(args.job_infos, "r", encoding="utf-8") as f:
+            samples = [json.loads(line) for line in f if line.strip()]
+    else:
+        samples = SAMPLE_JOBS
+    jobs = [samples[i % len(samples)] for i in range(args.jobs)]
+    resume = get_resume(args.resume)
+
+    results = []
+    for name in ("two_call", "fused"):
+        if args.live:
+            from llm.groq import GroqLLM
+            llm = GroqLLM(api_key=os.environ["GROQ_API_KEY"])
+        else:
+            llm = SimulatedLLM(fail_rate=args.fail_rate, time_scale=args.time_scale)
+        results.append(run_path(name, llm, resume, jobs))
+
+    two_call, fused = results
+    summary = {
+        "backend": "groq" if args.live else f"simulated (time_scale={args.time_scale}, fail_rate={args.fail_rate})",
+        "results": results,
+        "fused_vs_two_call": {
+            "total_tokens": round(fused["total_tokens"] / two_call["total_tokens"], 3),
+            "prompt_tokens": round(fused["prompt_tokens"] / two_call["prompt_tokens"], 3),
+            "wall_p50": round(fused["wall_p50_s"] / two_call["wall_p50_s"], 3),
+        },
+    }
+    print(f"{'path':<10}{'requests':>9}{'prompt':>9}{'output':>9}{'total':>9}{'p50 s':>9}{'p95 s':>9}{'failed':>8}")
+    for r in results:
+        print(f"{r['path']:<10}{r['requests']:>9}{r['prompt_tokens']:>9}{r['completion_tokens']:>9}"
+              f"{r['total_tokens']:>9}{r['wall_p50_s']:>9}{r['wall_p95_s']:>9}{r['failure_rate']:>8.1%}")
+    print(json.dumps(summary["fused_vs_two_call"]))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,560 @@
+# benchmarks/bench_pipeline.py
+"""
+End-to-end benchmark of the agent chain and the record store.
+
+Usage:
+    python -m benchmarks.bench_pipeline --jobs 20 --json results.json
+    python -m benchmarks.bench_pipeline --sizes 1000,10000 --skip-pipeline
+    python -m benchmarks.bench_pipeline --fixtures fixtures.jsonl         # replay recorded responses
+    python -m benchmarks.bench_pipeline --record fixtures.jsonl --jobs 3  # record them (hosted keys needed)
+    python -m benchmarks.bench_pipeline --compare baseline.json           # exit 1 on regressions
+
+Pipeline: runs JobPipeline.events over listing texts, as the "Parse Job"
+button does, with a model whose delays follow a per-agent lognormal
+distribution (fitted to hosted Groq/Perplexity latencies) or the delays of
+recorded responses. Reported per mode: each agent's latency, end-to-end
+wall time, the critical path through the task DAG and the scheduler
+overhead (wall time minus critical path), plus a no-op DAG microbenchmark.
+The LLM response cache is disabled and the company and search caches are cleared
+before every job, so every agent does its work.
+
+Record store: for each size, a fresh store is bulk loaded, then
+save_application_record (a new RecordStore and one append, as the UI does)
+and the queries behind display_application_records (pagination, filters,
+full-text search, country list) are timed.
+
+Results are printed as JSON; --json also writes them to a file.
+"""
+import os
+import tempfile
+
+_TMP_DIR = tempfile.mkdtemp(prefix="bench_pipeline_")
+os.environ["LLM_CACHE_ENABLED"] = "0"
+os.environ["CACHE_DB_PATH"] = os.path.join(_TMP_DIR, "cache.sqlite")
+
+import argparse
+import contextlib
+import datetime
+import hashlib
+import json
+import math
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from benchmarks.bench_fused import SAMPLE_JOBS
+from llm.base import BaseLLM
+from llm.local_llm import FakeLLM
+from prompts.email_cover_prompt import EMAIL_COVER_SCHEMA
+from prompts.fit_email_prompt import FIT_EMAIL_SCHEMA
+from prompts.fit_evaluator_prompt import FIT_EVALUATOR_SCHEMA
+from prompts.get_recruiter_prompt import GET_RECRUITER_SCHEMA
+from prompts.job_info_prompt import JOB_INFO_SCHEMA
+from prompts.org_evaluater_prompt import ORG_EVALUATER_SCHEMA
+from search.cached import search_results
+from search.fixture import fake_search_top
+from utils.company_cache import company_reports, recruiter_urls
+from utils.pipeline import JobPipeline
+from utils.record_store import RecordStore, build_application_record, save_application_records
+from utils.resume_service import DEFAULT_RESUME_PATH, get_resume
+from utils.scheduler import COMPLETED, FINISHED_KINDS, SKIPPED, DagScheduler, Task
+
+# Response schema -> scheduler task that sends it
+SCHEMA_TASKS = {
+    frozenset(JOB_INFO_SCHEMA): "job",
+    frozenset(FIT_EVALUATOR_SCHEMA): "fit_eval",
+    frozenset(EMAIL_COVER_SCHEMA): "email_gen",
+    frozenset(FIT_EMAIL_SCHEMA): "fit_email",
+    frozenset(ORG_EVALUATER_SCHEMA): "org_eval",
+    frozenset(GET_RECRUITER_SCHEMA): "recruiter_data",
+}
+
+# Lognormal (median seconds, sigma) per request, from hosted runs: Groq for
+# extraction, fit and email; Perplexity (which searches the web) for the rest
+LATENCY_PROFILE = {
+    "job": (2.8, 0.35),
+    "fit_eval": (1.9, 0.30),
+    "email_gen": (5.2, 0.30),
+    "fit_email": (6.1, 0.30),
+    "org_eval": (7.5, 0.45),
+    "recruiter_data": (2.4, 0.40),
+    "search": (0.9, 0.50),
+}
+
+MODES = {
+    "default": {},
+    "fused": {"fused": True},
+    "triage": {"triage_threshold": 4.0},
+}
+
+RECORD_QUERIES = {
+    "first_page": {},
+    "last_page": None,  # Filled in once the store size is known
+    "country": {"country": "Germany"},
+    "company": {"company": "labs"},
+    "date_range": {"date_from": None, "date_to": None},
+    "fit_applied": {"fit_min": 6.0, "fit_max": 10.0, "applied": False},
+    "search": {"search": "kubernetes platform"},
+    "combined": {"country": "India", "fit_min": 5.0, "search": "python"},
+}
+
+
+def task_of(response_schema: dict) -> str:
+    return SCHEMA_TASKS.get(frozenset(response_schema or {}), "other")
+
+
+def _percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)]
+
+
+def _summary(values: list, unit: str = "s", digits: int = 4) -> dict:
+    scale = 1000 if unit == "ms" else 1
+    if not values:
+        return {}
+    return {
+        f"p50_{unit}": round(statistics.median(values) * scale, digits),
+        f"p95_{unit}": round(_percentile(values, 95) * scale, digits),
+        f"max_{unit}": round(max(values) * scale, digits),
+        "n": len(values),
+    }
+
+
+class LatencyModel:
+    def __init__(self, profile: dict = LATENCY_PROFILE, time_scale: float = 1.0, seed: int = 0):
+        """
+        Samples request delays from per-task lognormal distributions.
+
+        Args:
+            profile (dict): Task name -> (median seconds, sigma).
+            time_scale (float): Multiplier applied to every delay.
+            seed (int): Random seed, so runs are repeatable.
+        """
+        self.profile = profile
+        self.time_scale = time_scale
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self, task: str) -> float:
+        median, sigma = self.profile.get(task, (1.0, 0.3))
+        with self._lock:
+            return self._random.lognormvariate(math.log(median), sigma) * self.time_scale
+
+
+class ProfiledFakeLLM(BaseLLM):
+    def __init__(self, latency: LatencyModel, seed: int = 0):
+        """FakeLLM responses with delays drawn from the latency model instead of a fixed mean."""
+        self.fake = FakeLLM(latency=0.0, jitter=0.0, seed=seed)
+        self.latency = latency
+        self.model = self.fake.model
+        self.temperature = self.fake.temperature
+        self.max_tokens = self.fake.max_tokens
+
+    def call(self, prompt: str, response_schema: dict = None) -> str:
+        text, _ = self.fake.respond(prompt, response_schema)
+        time.sleep(self.latency.sample(task_of(response_schema)))
+        return text
+
+
+class ReplayLLM(BaseLLM):
+    def __init__(self, fixtures_path: str, latency: LatencyModel = None, time_scale: float = 1.0):
+        """
+        Answers with responses recorded by --record.
+
+        A prompt seen while recording gets its own response; other prompts get
+        the recorded responses of the same task in turn.
+
+        Args:
+            fixtures_path (str): JSONL of {"task", "prompt_sha", "response", "latency_s"}.
+            latency (LatencyModel): Draws delays from this model instead of the recorded ones.
+            time_scale (float): Multiplier applied to recorded delays.
+        """
+        self.model = "replay"
+        self.temperature = 0.0
+        self.max_tokens = 1000
+        self.latency = latency
+        self.time_scale = time_scale
+        self.by_prompt, self.by_task = {}, {}
+        with open(fixtures_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self.by_prompt[entry["prompt_sha"]] = entry
+                    self.by_task.setdefault(entry["task"], []).append(entry)
+        self._turn = {}
+        self._lock = threading.Lock()
+
+    def call(self, prompt: str, response_schema: dict = None) -> str:
+        task = task_of(response_schema)
+        entry = self.by_prompt.get(hashlib.sha256(prompt.encode("utf-8")).hexdigest())
+        if entry is None:
+            entries = self.by_task.get(task)
+            if not entries:
+                raise KeyError(f"No recorded response for task '{task}'")
+            with self._lock:
+                turn = self._turn.get(task, 0)
+                self._turn[task] = turn + 1
+            entry = entries[turn % len(entries)]
+        delay = self.latency.sample(task) if self.latency else entry.get("latency_s", 0.0) * self.time_scale
+        time.sleep(delay)
+        return entry["response"]
+
+
+class RecordingLLM(BaseLLM):
+    def __init__(self, llm, out_path: str):
+        """Passes calls to a real model and appends each response and its latency to a fixture file."""
+        self.llm = llm
+        self.model = getattr(llm, "model", None)
+        self.temperature = getattr(llm, "temperature", None)
+        self.max_tokens = getattr(llm, "max_tokens", None)
+        self.out_path = out_path
+        self._lock = threading.Lock()
+
+    def call(self, prompt: str, response_schema: dict = None) -> str:
+        started = time.perf_counter()
+        response = self.llm.call(prompt, response_schema)
+        entry = {
+            "task": task_of(response_schema),
+            "prompt_sha": hashlib.sha256(prompt.encode("utf-8")).hexdigest(),
+            "response": response,
+            "latency_s": round(time.perf_counter() - started, 3),
+        }
+        with self._lock, open(self.out_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+        return response
+
+
+def job_listing_text(job_info: dict) -> str:
+    """Renders a sample job info as the plain listing text a user would paste."""
+    extra = job_info.get("Additional_Info", {})
+    return "\n".join([
+        f"{job_info['Job_Title']} - {job_info['company_name']}",
+        f"Location: {job_info['location']}",
+        f"Job ID: {job_info['job_id']}",
+        f"Apply: {job_info['job_url']}",
+        "",
+        job_info["summery"],
+        "",
+        "What you will do:",
+        job_info["Responsibilities"],
+        "",
+        "What we are looking for:",
+        job_info["Requirements"],
+        "Skills: " + ", ".join(job_info["Skills"]),
+        "Tech stack: " + ", ".join(extra.get("Tech_Stack", [])),
+        "Perks: " + ", ".join(extra.get("Perks", [])),
+    ])
+
+
+def critical_path(tasks: list, elapsed: dict) -> float:
+    """Longest chain of task run times through the DAG; inputs that are not tasks take no time."""
+    by_name = {t.name: t for t in tasks}
+    finish = {}
+
+    def finish_of(name):
+        if name not in finish:
+            task = by_name[name]
+            start = max((finish_of(i) for i in task.inputs if i in by_name), default=0.0)
+            finish[name] = start + elapsed.get(name, 0.0)
+        return finish[name]
+
+    return max((finish_of(name) for name in by_name), default=0.0)
+
+
+def scheduler_microbench(pipeline: JobPipeline, runs: int) -> dict:
+    """Times DagScheduler runs of the pipeline's DAG shape with no-op tasks."""
+    tasks = [Task(t.name, lambda *args, **kwargs: None, t.inputs, timeout=t.timeout) for t in pipeline.build_tasks()]
+    initial = {"job_input": "", "resume": None}
+    durations = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        for _ in DagScheduler(tasks, max_workers=4).run(initial):
+            pass
+        durations.append(time.perf_counter() - started)
+    return {"tasks": len(tasks), **_summary(durations, "ms")}
+
+
+def bench_pipeline(mode: str, main_llm, research_llm, search, resume, job_inputs: list,
+                   warm_company_cache: bool, scheduler_runs: int) -> dict:
+    """
+    Runs the agent chain over every job input in one mode and summarizes the timings.
+
+    Returns:
+        dict: Per-agent latencies, end-to-end wall time, critical path, scheduler
+            overhead and failures.
+    """
+    pipeline = JobPipeline(main_llm, research_llm, search=search, **MODES[mode])
+    tasks = pipeline.build_tasks()
+    per_task, walls, paths, overheads = {}, [], [], []
+    failures, skipped = 0, 0
+    for job_input in job_inputs:
+        if not warm_company_cache:
+            company_reports.clear()
+            recruiter_urls.clear()
+            search_results.clear()
+        elapsed = {}
+        started = time.perf_counter()
+        for event in pipeline.events(job_input, resume):
+            if event.kind == COMPLETED:
+                elapsed[event.task] = event.elapsed
+            elif event.kind == SKIPPED:
+                skipped += 1
+            elif event.kind in FINISHED_KINDS:
+                failures += 1
+        wall = time.perf_counter() - started
+        for name, seconds in elapsed.items():
+            per_task.setdefault(name, []).append(seconds)
+        path = critical_path(tasks, elapsed)
+        walls.append(wall)
+        paths.append(path)
+        overheads.append(wall - path)
+
+    return {
+        "mode": mode,
+        "jobs": len(job_inputs),
+        "failed_tasks": failures,
+        "skipped_tasks": skipped,
+        "agents": {name: _summary(values) for name, values in sorted(per_task.items())},
+        "end_to_end": _summary(walls),
+        "critical_path": _summary(paths),
+        "scheduler_overhead": _summary(overheads, "ms"),
+        "scheduler_noop_dag": scheduler_microbench(pipeline, scheduler_runs),
+    }
+
+
+def synthetic_records(count: int, seed: int = 0) -> list:
+    """Application records shaped like the agent chain's output, saved over the last year."""
+    rng = random.Random(seed)
+    words = ["scalable", "services", "team", "platform", "customers", "data", "reliable", "python",
+                          "kubernetes", "product", "design", "delivery", "ownership", "impact", "systems", "react"]
+    companies = ["Acme Cloud", "Nimbus Labs", "Pixel & Co", "Globex", "Initech", "Umbrella Analytics",
+                 "Hooli", "Vandelay Industries", "Stark Labs", "Wayne Data"]
+    countries = ["Germany", "India", "United States", "Netherlands", "United Kingdom", ""]
+    today = datetime.date.today()
+
+    def text(n):
+        return " ".join(rng.choice(words) for _ in range(n))
+
+    records = []
+    for i in range(count):
+        skills = rng.sample(["Python", "AWS", "Docker", "Kubernetes", "React", "Go", "Kafka", "SQL"], 4)
+        record = build_application_record(
+            {"Job_Title": text(3).title(), "job_id": f"J-{i}", "company_name": rng.choice(companies),
+             "location": "", "location_country": rng.choice(countries), "job_url": f"https://jobs.example.com/{i}"},
+            {"fit_score": round(rng.uniform(0, 10), 1), "matched_skills": skills[:2], "missing_skills": skills[2:],
+             "summary": text(40)},
+            {"cold email": {"subject": text(8), "body": text(110)}, "cover letter": {"body": text(220)},
+             "linkdin_networking_message_recruiter": {"body": text(45)},
+             "linkdin_networking_message_referrer": {"body": text(45)}},
+            {"company_research_report": {"company_name": "", "company_size": "1000-5000", "recent_layoffs": text(10)}},
+            [f"https://www.linkedin.com/in/recruiter-{rng.randint(1000, 9999)}"],
+        )
+        record["Date Saved"] = (today - datetime.timedelta(days=rng.randint(0, 365))).isoformat()
+        record["is_applied"] = rng.random() < 0.3
+        records.append(record)
+    return records
+
+
+def bench_record_store(size: int, repeat: int, single_saves: int) -> dict:
+    """
+    Times bulk load, UI-style single saves and the display queries on a store of `size` records.
+
+    Returns:
+        dict: Timings in seconds (bulk) and milliseconds (per operation), plus the file size.
+    """
+    path = os.path.join(_TMP_DIR, f"records_{size}.sqlite")
+    records = synthetic_records(size)
+
+    started = time.perf_counter()
+    save_application_records(records, path)
+    bulk = time.perf_counter() - started
+
+    # save_application_record: the UI opens a store and appends one record per save
+    saves = []
+    for record in synthetic_records(single_saves, seed=1):
+        started = time.perf_counter()
+        RecordStore(path).append(record)
+        saves.append(time.perf_counter() - started)
+
+    store = RecordStore(path)
+    total = store.count()
+    today = datetime.date.today()
+    queries = dict(RECORD_QUERIES)
+    queries["last_page"] = {"page": max(math.ceil(total / 20), 1)}
+    queries["date_range"] = {"date_from": (today - datetime.timedelta(days=30)).isoformat(),
+                             "date_to": today.isoformat()}
+    results = {}
+    for name, filters in queries.items():
+        durations, matched = [], 0
+        for _ in range(repeat):
+            started = time.perf_counter()
+            _, matched = store.query(**{"page": 1, "page_size": 20, **filters})
+            durations.append(time.perf_counter() - started)
+        results[name] = {**_summary(durations, "ms"), "matched": matched}
+
+    for name, fn in (("countries", store.countries), ("version", store.version), ("count", store.count)):
+        durations = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            durations.append(time.perf_counter() - started)
+        results[name] = _summary(durations, "ms")
+
+    started = time.perf_counter()
+    store.all_records()
+    load_all = time.perf_counter() - started
+
+    return {
+        "records": total,
+        "bulk_save_s": round(bulk, 3),
+        "bulk_save_records_per_s": round(size / bulk) if bulk else None,
+        "save_application_record": _summary(saves, "ms"),
+        "queries": results,
+        "load_all_s": round(load_all, 3),
+        "db_bytes": os.path.getsize(path),
+    }
+
+
+def _flatten(value, prefix="") -> dict:
+    if isinstance(value, dict):
+        flat = {}
+        for k, v in value.items():
+            flat.update(_flatten(v, f"{prefix}.{k}" if prefix else str(k)))
+        return flat
+    if isinstance(value, list):
+        flat = {}
+        for item in value:
+            key = item.get("mode", item.get("records")) if isinstance(item, dict) else None
+            if key is not None:
+                flat.update(_flatten(item, f"{prefix}[{key}]"))
+        return flat
+    return {prefix: value}
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Lists p50 timings that got slower than the baseline by more than the tolerance.
+
+    Returns:
+        list: {"metric", "baseline", "current", "ratio"} dicts, worst first.
+    """
+    current, before = _flatten(results), _flatten(baseline)
+    regressions = []
+    for metric, value in current.items():
+        old = before.get(metric)
+        is_timing = metric.rsplit(".", 1)[-1].startswith("p50_") or metric.endswith("_s")
+        if not is_timing or not isinstance(value, (int, float)) or not isinstance(old, (int, float)) or old <= 0:
+            continue
+        ratio = value / old
+        if ratio > 1 + tolerance:
+            regressions.append({"metric": metric, "baseline": old, "current": value, "ratio": round(ratio, 3)})
+    return sorted(regressions, key=lambda r: r["ratio"], reverse=True)
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the agent chain and the record store.")
+    parser.add_argument("--jobs", type=int, default=12, help="Jobs per pipeline mode (sample jobs are cycled)")
+    parser.add_argument("--modes", default="default,fused", help=f"Comma-separated pipeline modes: {', '.join(MODES)}")
+    parser.add_argument("--resume", default=DEFAULT_RESUME_PATH, help="Resume JSON file")
+    parser.add_argument("--time-scale", type=float, default=0.05, help="Multiplier applied to simulated and replayed delays")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of responses and delays")
+    parser.add_argument("--fixtures", help="Replay recorded responses from this JSONL file")
+    parser.add_argument("--fixture-latency", choices=["recorded", "profile"], default="recorded",
+                        help="Delays of replayed responses: as recorded, or drawn from the latency profile")
+    parser.add_argument("--record", help="Run hosted models and append their responses to this JSONL file")
+    parser.add_argument("--warm-company-cache", action="store_true",
+                        help="Keep company reports and recruiter URLs cached between jobs")
+    parser.add_argument("--scheduler-runs", type=int, default=200, help="No-op DAG runs for the scheduler microbenchmark")
+    parser.add_argument("--skip-pipeline", action="store_true", help="Only benchmark the record store")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="Record store sizes; empty skips the record store")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs of each record store query")
+    parser.add_argument("--single-saves", type=int, default=50, help="save_application_record calls per size")
+    parser.add_argument("--json", help="Also write the results to this file")
+    parser.add_argument("--compare", help="Baseline results file; exit 1 if a p50 timing regressed")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown against the baseline")
+    args = parser.parse_args()
+
+    latency = LatencyModel(time_scale=args.time_scale, seed=args.seed)
+    if args.record:
+        from llm.factory import create_llms
+        main_llm, research_llm = (RecordingLLM(llm, args.record) for llm in create_llms("hosted"))
+        backend, search, time_scale = f"hosted, recording to {args.record}", None, 1.0
+    elif args.fixtures:
+        profile = latency if args.fixture_latency == "profile" else None
+        main_llm = research_llm = ReplayLLM(args.fixtures, latency=profile, time_scale=args.time_scale)
+        backend, time_scale = f"replay of {args.fixtures} ({args.fixture_latency} latency)", args.time_scale
+    else:
+        main_llm, research_llm = ProfiledFakeLLM(latency, seed=args.seed), ProfiledFakeLLM(latency, seed=args.seed + 1)
+        backend, time_scale = "fake with lognormal latency profile", args.time_scale
+    if not args.record:
+        def search(query):
+            time.sleep(latency.sample("search"))
+            return fake_search_top(query)
+
+    results = {
+        "meta": {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "backend": backend,
+            "time_scale": time_scale,
+            "latency_profile": {k: {"median_s": m, "sigma": s} for k, (m, s) in LATENCY_PROFILE.items()},
+            "args": vars(args),
+        },
+        "pipeline": [],
+        "record_store": [],
+    }
+
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()] if not args.skip_pipeline else []
+    for mode in modes:
+        if mode not in MODES:
+            parser.error(f"Unknown mode '{mode}'; use {', '.join(MODES)}")
+
+    # Agents print progress; keep stdout for the JSON results
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            if modes:
+                resume = get_resume(args.resume)
+                job_inputs = [f"{job_listing_text(SAMPLE_JOBS[i % len(SAMPLE_JOBS)])}\nPosting #{i}"
+                              for i in range(args.jobs)]
+            for mode in modes:
+                print(f"Pipeline: {mode} mode, {args.jobs} job(s)...")
+                results["pipeline"].append(bench_pipeline(mode, main_llm, research_llm, search, resume, job_inputs,
+                                                          args.warm_company_cache, args.scheduler_runs))
+            for size in [int(s) for s in args.sizes.split(",") if s.strip()]:
+                print(f"Record store: {size} records...")
+                results["record_store"].append(bench_record_store(size, args.repeat, args.single_saves))
+    finally:
+        shutil.rmtree(_TMP_DIR, ignore_errors=True)
+
+    exit_code = 0
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        results["regressions"] = regressions
+        exit_code = 1 if regressions else 0
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
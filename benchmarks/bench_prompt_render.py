@@ -0,0 +1,142 @@
+# benchmarks/bench_prompt_render.py
+"""
+Prompt rendering cost: langchain's ChatPromptTemplate vs. precompiled templates.
+
+Usage:
+    python -m benchmarks.bench_prompt_render
+    python -m benchmarks.bench_prompt_render --renders 5000 --json results.json
+
+Reported:
+- import time of utils.prompt_runner and of langchain's ChatPromptTemplate, each in
+  a fresh interpreter (median of --imports runs);
+- per-call time of rendering each agent's prompt the old way
+  (ChatPromptTemplate.from_template(...).format_prompt(...).to_string()),
+  the new way (PromptTemplate.render) and of serializing its schema per call
+  vs. using the pre-serialized text.
+
+The old path is only measured when langchain_core is installed; it is no
+longer a requirement of the app.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+from prompts.email_cover_prompt import EMAIL_COVER_SCHEMA, EMAIL_COVER_TEMPLATE
+from prompts.fit_email_prompt import FIT_EMAIL_PROMPT_TEMPLATE, FIT_EMAIL_SCHEMA
+from prompts.fit_evaluator_prompt import FIT_EVALUATOR_PROMPT_TEMPLATE, FIT_EVALUATOR_SCHEMA
+from prompts.get_recruiter_prompt import GET_RECRUITER_PROMPT, GET_RECRUITER_SCHEMA
+from prompts.job_info_prompt import JOB_INFO_PROMPT_TEMPLATE, JOB_INFO_SCHEMA
+from prompts.org_evaluater_prompt import ORG_EVALUATER_PROMPT, ORG_EVALUATER_SCHEMA
+from utils.prompt_compaction import minify
+from utils.prompt_template import schema_text
+
+try:
+    from langchain_core.prompts import ChatPromptTemplate
+except ImportError:
+    ChatPromptTemplate = None
+
+_RESUME = "Backend engineer, 6 years. Python, FastAPI, PostgreSQL, Kubernetes, AWS.\n" * 20
+_JOB_INFO = minify({
+    "Job_Title": "Senior Backend Engineer", "company_name": "Acme Cloud", "location": "Berlin, Germany",
+    "Skills": ["Python", "FastAPI", "PostgreSQL", "Kubernetes", "AWS"],
+    "Requirements": "5+ years building Python services; REST API design; PostgreSQL; Kubernetes in production.",
+    "summery": "Backend role on a billing platform team building Python microservices on AWS and Kubernetes.",
+})
+_JOB_TEXT = "Senior Backend Engineer at Acme Cloud, Berlin. We build billing services in Python.\n" * 40
+
+# Agent -> (template, schema, variables other than the schema, name of the schema variable)
+CASES = {
+    "job_info": (JOB_INFO_PROMPT_TEMPLATE, JOB_INFO_SCHEMA,
+                 {"job_text": _JOB_TEXT, "url": "https://jobs.acme.example/1042"}, "job_info_schema"),
+    "fit_eval": (FIT_EVALUATOR_PROMPT_TEMPLATE, FIT_EVALUATOR_SCHEMA,
+                 {"resume": _RESUME, "job_info": _JOB_INFO}, "schema"),
+    "email_gen": (EMAIL_COVER_TEMPLATE, EMAIL_COVER_SCHEMA, {"resume": _RESUME, "job_info": _JOB_INFO}, "schema"),
+    "fit_email": (FIT_EMAIL_PROMPT_TEMPLATE, FIT_EMAIL_SCHEMA, {"resume": _RESUME, "job_info": _JOB_INFO}, "schema"),
+    "org_eval": (ORG_EVALUATER_PROMPT, ORG_EVALUATER_SCHEMA,
+                 {"company_name": "Acme Cloud", "location": "Berlin"}, "schema"),
+    "recruiter_data": (GET_RECRUITER_PROMPT, GET_RECRUITER_SCHEMA,
+                       {"company_name": "Acme Cloud", "location": "Berlin"}, "schema"),
+}
+
+
+def import_seconds(statement: str, runs: int) -> float:
+    """Median wall time of an import statement in a fresh interpreter, or None if the module is not installed."""
+    code = f"import time; t = time.perf_counter(); {statement}; print(time.perf_counter() - t)"
+    times = []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+        if result.returncode != 0:
+            return None
+        times.append(float(result.stdout.strip().splitlines()[-1]))
+    return statistics.median(times)
+
+
+def per_call_us(fn, renders: int) -> float:
+    """Median microseconds per call over five batches."""
+    batches = []
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(renders // 5):
+            fn()
+        batches.append((time.perf_counter() - start) / (renders // 5) * 1e6)
+    return statistics.median(batches)
+
+
+def bench_render(renders: int) -> list:
+    rows = []
+    for agent, (template, schema, variables, schema_var) in CASES.items():
+        text = str(template)
+        precomputed = schema_text(schema)
+        new_vars = {**variables, schema_var: precomputed}
+        row = {
+            "agent": agent,
+            "template_chars": len(text),
+            "compiled_render_us": round(per_call_us(lambda: template.render(new_vars), renders), 2),
+            "schema_dumps_us": round(per_call_us(lambda: minify(schema), renders), 2),
+            "langchain_render_us": None,
+            "identical_output": None,
+        }
+        if ChatPromptTemplate is not None:
+            def old():
+                return ChatPromptTemplate.from_template(text).format_prompt(**new_vars).to_string()
+            row["langchain_render_us"] = round(per_call_us(old, max(renders // 10, 5)), 2)
+            row["identical_output"] = old() == template.render(new_vars)
+        rows.append(row)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure prompt rendering and import cost.")
+    parser.add_argument("--renders", type=int, default=2000, help="Renders per agent for the compiled path")
+    parser.add_argument("--imports", type=int, default=5, help="Fresh-interpreter imports per module")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    summary = {
+        "import_s": {
+            "utils.prompt_runner": import_seconds("import utils.prompt_runner", args.imports),
+            # langchain_core.prompts loads its members lazily, so import the class itself
+            "langchain ChatPromptTemplate": import_seconds(
+                "from langchain_core.prompts import ChatPromptTemplate", args.imports),
+        },
+        "render": bench_render(args.renders),
+    }
+
+    for module, seconds in summary["import_s"].items():
+        print(f"import {module:<30}" + (f"{seconds * 1000:>9.1f} ms" if seconds is not None else "  not installed"))
+    print(f"{'agent':<16}{'chars':>7}{'langchain us':>14}{'compiled us':>13}{'dumps us':>10}{'same':>6}")
+    for r in summary["render"]:
+        old = f"{r['langchain_render_us']:>14.1f}" if r["langchain_render_us"] is not None else f"{'-':>14}"
+        same = "-" if r["identical_output"] is None else ("yes" if r["identical_output"] else "NO")
+        print(f"{r['agent']:<16}{r['template_chars']:>7}{old}{r['compiled_render_us']:>13.1f}"
+              f"{r['schema_dumps_us']:>10.1f}{same:>6}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# benchmarks/bench_startup.py
+"""
+Streamlit startup and rerun cost of main.py.
+
+Usage:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --runs 5 --reruns 20 --json results.json
+
+Each run starts a fresh interpreter and drives main.py with Streamlit's
+AppTest, so nothing is warm. Times are of the script execution itself
+(AppTest also recompiles the script per run, which the server caches).
+Reported per run, then as medians:
+- cold_render_s: first script run, including every import it triggers;
+- rerun_ms: median script time of later reruns with no interaction;
+- first_parse_s / second_parse_s: "Parse Job and Evaluate" clicks, the
+  first one building the models, agents and thread pool, the second one
+  reusing them;
+- heavy modules already imported after the first render.
+
+The fake LLM provider and search are used with zero latency, so the parse
+timings measure the app's own overhead rather than a model.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules the first render should not need
+HEAVY_MODULES = ["pandas", "altair", "bs4", "openai", "googlesearch", "langchain_core", "agents.job_extractor"]
+
+_RUN_CODE = """
+import json, statistics, sys, time
+t0 = time.perf_counter()
+from streamlit.runtime.scriptrunner import script_runner
+from streamlit.testing.v1 import AppTest
+
+# AppTest compiles the script again on every run, which the server does not;
+# time only the execution of main.py
+script_times = []
+_exec = script_runner.exec_func_with_error_handling
+def _timed_exec(*args, **kwargs):
+    t = time.perf_counter()
+    try:
+        return _exec(*args, **kwargs)
+    finally:
+        script_times.append(time.perf_counter() - t)
+script_runner.exec_func_with_error_handling = _timed_exec
+
+heavy = [m for m in {heavy!r} if m not in sys.modules]  # Already loaded by streamlit itself
+app = AppTest.from_file({main!r}, default_timeout=120)
+t1 = time.perf_counter()
+app.run()
+cold = script_times[-1]
+loaded = [m for m in heavy if m in sys.modules]
+del script_times[:]
+for _ in range({reruns}):
+    app.run()
+reruns = list(script_times)
+parses = []
+for i in range(2):
+    app.text_area[0].set_value("Backend Engineer at Acme Inc, Berlin. Python, FastAPI, PostgreSQL. " * (5 + i))
+    del script_times[:]
+    [b for b in app.button if "Parse Job" in b.label][0].click().run()
+    parses.append(sum(script_times))
+    if app.exception:
+        raise SystemExit(str(app.exception))
+print(json.dumps({{
+    "streamlit_import_s": t1 - t0,
+    "cold_render_s": cold,
+    "rerun_ms": statistics.median(reruns) * 1000,
+    "first_parse_s": parses[0],
+    "second_parse_s": parses[1],
+    "heavy_modules_loaded": loaded,
+}}))
+"""
+
+
+def run_once(reruns: int) -> dict:
+    tmp_dir = tempfile.mkdtemp(prefix="bench_startup_")
+    env = dict(
+        os.environ,
+        LLM_PROVIDER="fake", SEARCH_PROVIDER="fake",
+        FAKE_LLM_LATENCY_SECONDS="0", FAKE_LLM_JITTER_SECONDS="0",
+        LLM_CACHE_ENABLED="0", METRICS_PORT="0", TRACING_ENABLED="0",
+        CACHE_DB_PATH=os.path.join(tmp_dir, "cache.sqlite"),
+        RECORD_DB_PATH=os.path.join(tmp_dir, "records.sqlite"),
+    )
+    code = _RUN_CODE.format(heavy=HEAVY_MODULES, main=os.path.join(ROOT, "main.py"), reruns=reruns)
+    try:
+        result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Benchmark run failed:\n{result.stderr[-2000:]}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure main.py cold start, rerun and parse-click overhead.")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh-interpreter runs")
+    parser.add_argument("--reruns", type=int, default=10, help="Idle reruns per run")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    runs = [run_once(args.reruns) for _ in range(args.runs)]
+    keys = ["streamlit_import_s", "cold_render_s", "rerun_ms", "first_parse_s", "second_parse_s"]
+    summary = {
+        "runs": runs,
+        "median": {k: round(statistics.median(r[k] for r in runs), 4) for k in keys},
+        "heavy_modules_loaded": runs[-1]["heavy_modules_loaded"],
+    }
+
+    for k in keys:
+        print(f"{k:<20}{summary['median'][k]:>10.3f}")
+    print(f"heavy modules loaded by the first render: {', '.join(summary['heavy_modules_loaded']) or 'none'}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# config.py
+import os
+
+from dotenv import load_dotenv
+
+# Settings below are read at import time, so .env has to be loaded first
+load_dotenv()
+
+# --------------------- Record Store ---------------------
+RECORD_DB_PATH = os.getenv("RECORD_DB_PATH", "job_application_records.sqlite")
+# Legacy workbook, only read by the one-shot importer
+EXCEL_DB_PATH = os.getenv("EXCEL_DB_PATH", "job_application_records.xlsx")
+# A posting whose URL, company + job id or text fingerprint matches a saved record is not run or saved again
+DEDUPE_ENABLED = os.getenv("DEDUPE_ENABLED", "1") == "1"
+# Most differing bits (of 64) between text fingerprints of the same posting; lookups find up to 3
+DEDUPE_MAX_DISTANCE = int(os.getenv("DEDUPE_MAX_DISTANCE", "3"))
+
+# --------------------- Batch Runner ---------------------
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+BATCH_FLUSH_EVERY = int(os.getenv("BATCH_FLUSH_EVERY", "25"))
+# Streaming mode: job entries read ahead of the workers; the reader waits while this many are queued
+STREAM_QUEUE_SIZE = int(os.getenv("STREAM_QUEUE_SIZE", "8"))
+AGENT_TIMEOUT_SECONDS = int(os.getenv("AGENT_TIMEOUT_SECONDS", "180"))
+# Triage mode: jobs whose local pre-score is below this skip email generation and recruiter search
+TRIAGE_THRESHOLD = float(os.getenv("TRIAGE_THRESHOLD", "4.0"))
+# Threads the Streamlit app shares between all sessions for running agents
+AGENT_EXECUTOR_WORKERS = int(os.getenv("AGENT_EXECUTOR_WORKERS", "8"))
+
+# --------------------- Background Jobs ---------------------
+# Postings queued from the app and run by `python worker.py`; they survive page reloads and app restarts
+JOB_QUEUE_DB_PATH = os.getenv("JOB_QUEUE_DB_PATH", "job_queue.sqlite")
+WORKER_PROCESSES = int(os.getenv("WORKER_PROCESSES", "2"))
+WORKER_POLL_SECONDS = float(os.getenv("WORKER_POLL_SECONDS", "1.0"))
+# A running job whose worker has not reported for this long goes back to the queue, up to JOB_MAX_ATTEMPTS runs
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", str(2 * AGENT_TIMEOUT_SECONDS)))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "2"))
+# How often the Queue tab refreshes the job list
+JOB_LIST_REFRESH_SECONDS = float(os.getenv("JOB_LIST_REFRESH_SECONDS", "2"))
+
+# --------------------- LLM HTTP ---------------------
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "10"))
+LLM_READ_TIMEOUT = float(os.getenv("LLM_READ_TIMEOUT", "120"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "32"))
+LLM_MAX_KEEPALIVE = int(os.getenv("LLM_MAX_KEEPALIVE", "16"))
+
+# --------------------- LLM Provider ---------------------
+# "hosted" (Groq + Perplexity), "local" (OpenAI-compatible server) or "fake" (offline, deterministic)
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "hosted")
+LOCAL_LLM_BASE_URL = os.getenv("LOCAL_LLM_BASE_URL", "http://127.0.0.1:8080/v1")
+LOCAL_LLM_MODEL = os.getenv("LOCAL_LLM_MODEL", "local-model")
+LOCAL_LLM_BATCH_SIZE = int(os.getenv("LOCAL_LLM_BATCH_SIZE", "8"))
+LOCAL_LLM_BATCH_WINDOW_MS = float(os.getenv("LOCAL_LLM_BATCH_WINDOW_MS", "20"))
+FAKE_LLM_LATENCY_SECONDS = float(os.getenv("FAKE_LLM_LATENCY_SECONDS", "0.5"))
+FAKE_LLM_JITTER_SECONDS = float(os.getenv("FAKE_LLM_JITTER_SECONDS", "0.2"))
+
+# --------------------- Recruiter Search ---------------------
+# "google" or "fake" (fixture results or deterministic LinkedIn URLs, no network)
+SEARCH_PROVIDER = os.getenv("SEARCH_PROVIDER", "fake" if LLM_PROVIDER == "fake" else "google")
+# JSON file of query -> result URLs served by the fake provider
+SEARCH_FIXTURES_PATH = os.getenv("SEARCH_FIXTURES_PATH", "")
+SEARCH_NUM_RESULTS = int(os.getenv("SEARCH_NUM_RESULTS", "10"))
+# Search queries in flight at once across the whole process; kept low, Google throttles bursts
+SEARCH_CONCURRENCY = int(os.getenv("SEARCH_CONCURRENCY", "3"))
+RECRUITER_MAX_RESULTS = int(os.getenv("RECRUITER_MAX_RESULTS", "10"))
+
+# --------------------- LLM Rate Limits ---------------------
+# Per-provider budgets; 0 disables a bucket. Concurrency adapts between min and max.
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "5"))
+RATE_LIMITS = {
+    "groq": {
+        "rpm": float(os.getenv("GROQ_RPM", "30")),
+        "tpm": float(os.getenv("GROQ_TPM", "30000")),
+        "max_concurrency": int(os.getenv("GROQ_MAX_CONCURRENCY", "8")),
+        "initial_concurrency": int(os.getenv("GROQ_INITIAL_CONCURRENCY", "4")),
+    },
+    "perplexity": {
+        "rpm": float(os.getenv("PERPLEXITY_RPM", "50")),
+        "tpm": float(os.getenv("PERPLEXITY_TPM", "0")),
+        "max_concurrency": int(os.getenv("PERPLEXITY_MAX_CONCURRENCY", "8")),
+        "initial_concurrency": int(os.getenv("PERPLEXITY_INITIAL_CONCURRENCY", "4")),
+    },
+}
+
+# --------------------- Caches ---------------------
+CACHE_DB_PATH = os.getenv("CACHE_DB_PATH", ".cache/cache.sqlite")
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") == "1"
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+COMPANY_REPORT_TTL_SECONDS = float(os.getenv("COMPANY_REPORT_TTL_SECONDS", str(14 * 24 * 3600)))
+RECRUITER_URLS_TTL_SECONDS = float(os.getenv("RECRUITER_URLS_TTL_SECONDS", str(3 * 24 * 3600)))
+# Results of each search query, shared by every company that issues the same query
+SEARCH_CACHE_ENABLED = os.getenv("SEARCH_CACHE_ENABLED", "1") == "1"
+SEARCH_CACHE_TTL_SECONDS = float(os.getenv("SEARCH_CACHE_TTL_SECONDS", str(3 * 24 * 3600)))
+
+# --------------------- Job Page Fetcher ---------------------
+FETCH_CONNECT_TIMEOUT = float(os.getenv("FETCH_CONNECT_TIMEOUT", "10"))
+FETCH_READ_TIMEOUT = float(os.getenv("FETCH_READ_TIMEOUT", "30"))
+FETCH_CACHE_MAX_ENTRIES = int(os.getenv("FETCH_CACHE_MAX_ENTRIES", "2000"))
+
+# --------------------- Prompt Compaction ---------------------
+PROMPT_COMPACTION_ENABLED = os.getenv("PROMPT_COMPACTION_ENABLED", "1") == "1"
+# Estimated input tokens per agent (template variables only); llama3-70b-8192 has an 8192-token context
+PROMPT_TOKEN_BUDGETS = {
+    "job_info": int(os.getenv("JOB_INFO_TOKEN_BUDGET", "5000")),
+    "fit_eval": int(os.getenv("FIT_EVAL_TOKEN_BUDGET", "3500")),
+    "email_gen": int(os.getenv("EMAIL_GEN_TOKEN_BUDGET", "3500")),
+    "fit_email": int(os.getenv("FIT_EMAIL_TOKEN_BUDGET", "3500")),
+    "org_eval": int(os.getenv("ORG_EVAL_TOKEN_BUDGET", "500")),
+    "recruiter_data": int(os.getenv("RECRUITER_DATA_TOKEN_BUDGET", "500")),
+}
+
+# --------------------- Tracing & Metrics ---------------------
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "1") == "1"
+# One JSON line per span; rotated to <path>.1 once it grows past the size limit
+TRACE_FILE_PATH = os.getenv("TRACE_FILE_PATH", ".cache/traces.jsonl")
+TRACE_FILE_MAX_BYTES = int(os.getenv("TRACE_FILE_MAX_BYTES", str(50 * 1024 * 1024)))
+# Prometheus text file, rewritten after every run; each process writes its own copy, e.g. metrics.<pid>.prom,
+# and removes it when it exits
+METRICS_FILE_PATH = os.getenv("METRICS_FILE_PATH", ".cache/metrics.prom")
+# METRICS_PORT > 0 also serves /metrics; set METRICS_HOST to 0.0.0.0 to expose it beyond this machine
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+# USD per million (prompt, completion) tokens, for cost estimates; unlisted models cost 0
+LLM_PRICES_PER_MILLION_TOKENS = {
+    "llama3-70b-8192": (0.59, 0.79),
+    "sonar-pro": (3.0, 15.0),
+}
+
+# --------------------- Response Repair ---------------------
+# Responses with missing or invalid fields get follow-up requests for just those fields
+JSON_FOLLOWUP_ENABLED = os.getenv("JSON_FOLLOWUP_ENABLED", "1") == "1"
+JSON_FOLLOWUP_MAX_ROUNDS = int(os.getenv("JSON_FOLLOWUP_MAX_ROUNDS", "1"))
@@ -1,7 +1,26 @@
 # llm/base.py
+import asyncio
 from abc import ABC, abstractmethod
 
 class BaseLLM(ABC):
     @abstractmethod
     def call(self, prompt: str, response_schema: dict) -> str:
         pass
+
+    async def acall(self, prompt: str, response_schema: dict = None) -> str:
+        """
+        Async variant of call(). Backends without a native async client run
+        the blocking call in a worker thread.
+        """
+        return await asyncio.to_thread(self.call, prompt, response_schema)
+
+    def stream(self, prompt: str, response_schema: dict = None):
+        """
+        Yields the response text in chunks as it is generated. Backends
+        without token streaming yield the whole response once.
+        """
+        yield self.call(prompt, response_schema)
+
+    async def astream(self, prompt: str, response_schema: dict = None):
+        """Async variant of stream()."""
+        yield await self.acall(prompt, response_schema)
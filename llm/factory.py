@@ -0,0 +1,38 @@
+# llm/factory.py
+import os
+
+from config import LLM_PROVIDER
+
+
+def create_llms(provider: str = LLM_PROVIDER) -> tuple:
+    """
+    Builds the two models the agent chain uses.
+
+    Args:
+        provider (str): "hosted" (Groq for extraction, fit and email; Perplexity for
+            company research and recruiter search), "local" (one OpenAI-compatible local
+            server for both) or "fake" (deterministic offline responses).
+
+    Returns:
+        tuple: (main_llm, research_llm).
+
+    Raises:
+        ValueError: If the provider is unknown or its API keys are missing.
+    """
+    if provider == "fake":
+        from llm.local_llm import FakeLLM
+        return FakeLLM(), FakeLLM(seed=1)
+    if provider == "local":
+        from llm.local_llm import LocalLLM
+        llm = LocalLLM()
+        return llm, llm
+    if provider != "hosted":
+        raise ValueError(f"Unknown LLM_PROVIDER '{provider}'; use hosted, local or fake.")
+
+    from llm.groq import GroqLLM
+    from llm.perplexity import PerplexityLLM
+    perplexity_key = os.getenv("PERPLEXITY_API_KEY")
+    groq_key = os.getenv("GROQ_API_KEY")
+    if not perplexity_key or not groq_key:
+        raise ValueError("Missing PERPLEXITY_API_KEY or GROQ_API_KEY in the environment.")
+    return GroqLLM(api_key=groq_key), PerplexityLLM(api_key=perplexity_key)
@@ -1,34 +1,93 @@
-from openai import OpenAI
+from openai import AsyncOpenAI
 from llm.base import BaseLLM
-import re
+from llm.http_pool import get_async_client, iter_sync, make_timeout, run_sync
+from llm.rate_limiter import get_limiter
+from utils.json_repair import extract_json_text
+from utils.logger import record_usage
+from utils.prompt_compaction import estimate_tokens
+import logging
 import os
 
+GROQ_BASE_URL = "https://api.groq.com/openai/v1"
+
 class GroqLLM(BaseLLM):
-    def __init__(self, api_key: str = None, model: str = "llama3-70b-8192"):
+    def __init__(self, api_key: str = None, model: str = "llama3-70b-8192",
+                 connect_timeout: float = None, read_timeout: float = None):
         self.api_key = api_key or os.getenv("GROQ_API_KEY")
-        self.client = OpenAI(
-            base_url="https://api.groq.com/openai/v1",
-            api_key=self.api_key
-        )
         self.model = model
+        self.temperature = 0.1
+        self.max_tokens = 1000
+        self.timeout = make_timeout(connect_timeout, read_timeout)
+        self.limiter = get_limiter("groq")
+
+    def _reserve(self, prompt: str) -> int:
+        return estimate_tokens(prompt) + self.max_tokens
+
+    def _client(self) -> AsyncOpenAI:
+        # Thin wrapper over the loop's pooled httpx client; cheap to build per call
+        return AsyncOpenAI(
+            base_url=GROQ_BASE_URL,
+            api_key=self.api_key,
+            http_client=get_async_client(),
+            timeout=self.timeout,
+            max_retries=0,  # Retries and backoff are handled by the rate limiter
+        )
 
     def call(self, prompt: str, response_schema: dict = None) -> str:
+        return run_sync(self.acall(prompt, response_schema))
+
+    async def acall(self, prompt: str, response_schema: dict = None) -> str:
         if not self.api_key:
             raise ValueError("API key is required for GroqLLM")
-        print("running groq llm")
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.1,
-            max_tokens=1000
+        logging.debug(f"Groq request ({self.model})")
+        response = await self.limiter.call(
+            lambda: self._client().chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": "You are a helpful assistant."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=self.temperature,
+                max_tokens=self.max_tokens
+            ),
+            self._reserve(prompt),
+            usage_of=lambda r: r.usage.total_tokens,
         )
 
+        if response.usage:
+            record_usage("groq", self.model, response.usage.prompt_tokens, response.usage.completion_tokens)
         answer = response.choices[0].message.content
         return self._extract_json(answer)
 
+    def stream(self, prompt: str, response_schema: dict = None):
+        return iter_sync(self.astream(prompt, response_schema))
+
+    async def astream(self, prompt: str, response_schema: dict = None):
+        """Yields raw completion text (including any <json> tags) as tokens arrive."""
+        if not self.api_key:
+            raise ValueError("API key is required for GroqLLM")
+        async def open_stream():
+            stream = await self._client().chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": "You are a helpful assistant."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=self.temperature,
+                max_tokens=self.max_tokens,
+                stream=True
+            )
+            return (chunk.choices[0].delta.content async for chunk in stream
+                    if chunk.choices and chunk.choices[0].delta.content)
+
+        prompt_tokens = estimate_tokens(prompt)
+        chunks = []
+        async for text in self.limiter.stream(open_stream, prompt_tokens + self.max_tokens,
+                                              count_tokens=lambda output: prompt_tokens + estimate_tokens(output)):
+            chunks.append(text)
+            yield text
+        # Streamed responses carry no usage block
+        record_usage("groq", self.model, prompt_tokens, estimate_tokens("".join(chunks)), estimated=True)
+
     def _extract_json(self, text: str) -> str:
-        match = re.search(r"<json>(.*?)</json>", text, re.DOTALL)
-        return match.group(1).strip() if match else text
+        return extract_json_text(text)
@@ -0,0 +1,116 @@
+# llm/http_pool.py
+"""
+Shared keep-alive HTTP connection pools for the LLM backends.
+
+Async clients are bound to the event loop that uses them, so one pooled
+httpx.AsyncClient is kept per running loop and shared by every backend on it.
+Synchronous callers are served by a single background event loop thread, so
+the sync `call()` wrappers also reuse one pool instead of reconnecting.
+"""
+import asyncio
+import contextvars
+import threading
+import weakref
+
+import httpx
+
+from config import LLM_CONNECT_TIMEOUT, LLM_MAX_CONNECTIONS, LLM_MAX_KEEPALIVE, LLM_READ_TIMEOUT
+
+_clients = weakref.WeakKeyDictionary()  # event loop -> httpx.AsyncClient
+_clients_lock = threading.Lock()
+
+_background_loop = None
+_background_lock = threading.Lock()
+
+
+def make_timeout(connect_timeout: float = None, read_timeout: float = None) -> httpx.Timeout:
+    """Builds an httpx timeout, falling back to the configured defaults."""
+    read = read_timeout if read_timeout is not None else LLM_READ_TIMEOUT
+    connect = connect_timeout if connect_timeout is not None else LLM_CONNECT_TIMEOUT
+    return httpx.Timeout(read, connect=connect)
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Returns the pooled AsyncClient of the running event loop, creating it on first use.
+
+    Returns:
+        httpx.AsyncClient: A keep-alive client shared by all backends on this loop.
+    """
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        client = _clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                timeout=make_timeout(),
+                limits=httpx.Limits(
+                    max_connections=LLM_MAX_CONNECTIONS,
+                    max_keepalive_connections=LLM_MAX_KEEPALIVE,
+                ),
+            )
+            _clients[loop] = client
+    return client
+
+
+def _get_background_loop() -> asyncio.AbstractEventLoop:
+    global _background_loop
+    with _background_lock:
+        if _background_loop is None or _background_loop.is_closed():
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="llm-event-loop", daemon=True)
+            thread.start()
+            _background_loop = loop
+    return _background_loop
+
+
+def run_sync(coro, timeout: float = None):
+    """
+    Runs a coroutine on the shared background loop and blocks until it finishes.
+
+    The caller's contextvars are carried over, so per-run context set in the
+    calling thread stays visible inside the coroutine.
+
+    Args:
+        coro: The coroutine to run.
+        timeout (float): Optional seconds to wait for the result.
+
+    Returns:
+        The coroutine's result.
+    """
+    loop = _get_background_loop()
+    ctx = contextvars.copy_context()
+    done = threading.Event()
+    holder = {}
+
+    def _schedule():
+        task = loop.create_task(coro, context=ctx)
+        holder["task"] = task
+        task.add_done_callback(lambda _: done.set())
+
+    loop.call_soon_threadsafe(_schedule)
+    if not done.wait(timeout):
+        loop.call_soon_threadsafe(lambda: holder.get("task") and holder["task"].cancel())
+        raise TimeoutError(f"Coroutine did not finish within {timeout} seconds")
+    return holder["task"].result()
+
+
+def iter_sync(agen, timeout: float = None):
+    """
+    Iterates an async generator from synchronous code, one item at a time,
+    on the shared background loop.
+
+    Args:
+        agen: The async generator to drain.
+        timeout (float): Optional seconds to wait for each item.
+
+    Yields:
+        The generator's items.
+    """
+    try:
+        while True:
+            try:
+                yield run_sync(agen.__anext__(), timeout)
+            except StopAsyncIteration:
+                return
+    finally:
+        run_sync(agen.aclose())
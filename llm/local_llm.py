@@ -0,0 +1,267 @@
+# llm/local_llm.py
+"""
+Offline LLM backends.
+
+LocalLLM talks to any OpenAI-compatible server on the local machine
+(llama.cpp server, vLLM, Ollama's /v1 endpoint). Calls that arrive within a
+short window are sent together as one /v1/completions request with a list of
+prompts, which lets batching servers fill their decode slots. A call that
+happens to arrive alone goes the same way, so the model sees the same input
+whether or not it was batched.
+
+FakeLLM answers every prompt with JSON that matches the response schema,
+after a configurable latency with jitter. The output depends only on the
+prompt and the seed, so load tests and CI runs are repeatable with no network.
+"""
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+import weakref
+
+from config import (
+    FAKE_LLM_JITTER_SECONDS,
+    FAKE_LLM_LATENCY_SECONDS,
+    LOCAL_LLM_BASE_URL,
+    LOCAL_LLM_BATCH_SIZE,
+    LOCAL_LLM_BATCH_WINDOW_MS,
+    LOCAL_LLM_MODEL,
+)
+from llm.base import BaseLLM
+from llm.http_pool import get_async_client, make_timeout, run_sync
+from utils.json_repair import extract_json_text
+from utils.logger import record_usage
+from utils.prompt_compaction import estimate_tokens
+
+SYSTEM_PROMPT = "You are a helpful assistant."
+
+
+class LocalLLM(BaseLLM):
+    def __init__(self, base_url: str = LOCAL_LLM_BASE_URL, model: str = LOCAL_LLM_MODEL, api_key: str = "local",
+                 batch_size: int = LOCAL_LLM_BATCH_SIZE, batch_window_ms: float = LOCAL_LLM_BATCH_WINDOW_MS,
+                 connect_timeout: float = None, read_timeout: float = None):
+        """
+        Args:
+            base_url (str): Server root including /v1, e.g. "http://127.0.0.1:8080/v1".
+            model (str): Model name sent with each request.
+            api_key (str): Bearer token, for servers started with one.
+            batch_size (int): Most prompts per /v1/completions request; 1 sends each call
+                to /v1/chat/completions on its own, with the server's chat template.
+            batch_window_ms (float): How long the first call of a batch waits for others.
+        """
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.api_key = api_key
+        self.temperature = 0.1
+        self.max_tokens = 1000
+        self.batch_size = max(int(batch_size), 1)
+        self.batch_window = batch_window_ms / 1000
+        self.timeout = make_timeout(connect_timeout, read_timeout)
+        # How prompts reach the model; part of the LLM cache key, as it changes the model's input
+        self.prompt_format = "chat" if self.batch_size == 1 else "completion"
+        self._pending = weakref.WeakKeyDictionary()  # event loop -> [(prompt, future)]
+        self._timers = weakref.WeakKeyDictionary()  # event loop -> window timer of its pending batch
+
+    def _headers(self) -> dict:
+        return {"Content-Type": "application/json", "Authorization": f"Bearer {self.api_key}"}
+
+    def call(self, prompt: str, response_schema: dict = None) -> str:
+        return run_sync(self.acall(prompt, response_schema))
+
+    async def acall(self, prompt: str, response_schema: dict = None) -> str:
+        text, usage = await self._complete(prompt)
+        if usage:
+            record_usage("local", self.model, usage.get("prompt_tokens"), usage.get("completion_tokens"))
+        else:
+            # Batched completions report usage per batch, so per-prompt tokens are estimated
+            record_usage("local", self.model, estimate_tokens(prompt), estimate_tokens(text), estimated=True)
+        return extract_json_text(text)
+
+    async def _complete(self, prompt: str) -> tuple:
+        """Returns (completion text, usage dict reported for this prompt alone or None)."""
+        if self.batch_size == 1:
+            return await self._chat(prompt)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending.setdefault(loop, [])
+        pending.append((prompt, future))
+        if len(pending) >= self.batch_size:
+            self._flush(loop)
+        elif len(pending) == 1:
+            self._timers[loop] = loop.call_later(self.batch_window, self._flush, loop)
+        return await future
+
+    def _flush(self, loop):
+        # A batch sent because it filled up must not leave its timer to cut the next batch's window short
+        timer = self._timers.pop(loop, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(loop, [])
+        if batch:
+            loop.create_task(self._send_batch(batch))
+
+    async def _chat(self, prompt: str) -> tuple:
+        response = await get_async_client().post(
+            f"{self.base_url}/chat/completions",
+            headers=self._headers(),
+            json={
+                "model": self.model,
+                "messages": [
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                "temperature": self.temperature,
+                "max_tokens": self.max_tokens,
+            },
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        data = response.json()
+        return data["choices"][0]["message"]["content"], data.get("usage")
+
+    async def _send_batch(self, batch: list):
+        # A batch of one is sent the same way, so a prompt's input does not depend on what else arrived
+        try:
+            response = await get_async_client().post(
+                f"{self.base_url}/completions",
+                headers=self._headers(),
+                json={
+                    "model": self.model,
+                    "prompt": [f"{SYSTEM_PROMPT}\n\n{prompt}" for prompt, _ in batch],
+                    "temperature": self.temperature,
+                    "max_tokens": self.max_tokens,
+                },
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+            data = response.json()
+            choices = sorted(data["choices"], key=lambda c: c.get("index", 0))
+            if len(choices) != len(batch):
+                raise ValueError(f"Local server returned {len(choices)} completions for {len(batch)} prompts")
+            texts = [c["text"] for c in choices]
+            # The usage block covers the whole request; it is exact only for a batch of one
+            usage = data.get("usage") if len(batch) == 1 else None
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), text in zip(batch, texts):
+            if not future.done():
+                future.set_result((text, usage))
+
+
+# Vocabulary for generated list values, so skill matching sees realistic overlap
+_SKILLS = ["Python", "FastAPI", "React", "TypeScript", "AWS", "Docker", "Kubernetes", "PostgreSQL",
+           "MongoDB", "Node.js", "Go", "Java", "Spark", "Kafka", "LangChain", "RAG", "Terraform", "GraphQL"]
+_WORDS = ["scalable", "services", "team", "platform", "customers", "data", "reliable", "product", "design",
+          "delivery", "ownership", "impact", "experience", "systems", "quality", "engineering", "growth"]
+_COMPANIES = ["Acme Cloud", "Nimbus Labs", "Pixel & Co", "Globex", "Initech", "Umbrella Analytics"]
+_COUNTRIES = ["Germany", "India", "United States", "Netherlands", "United Kingdom"]
+# Words per string field by key, for the longer texts
+_TEXT_WORDS = {"body": 120, "summary": 50, "summery": 80, "Job_Description": 90, "Responsibilities": 40,
+               "Requirements": 40}
+
+
+class FakeLLM(BaseLLM):
+    def __init__(self, latency: float = FAKE_LLM_LATENCY_SECONDS, jitter: float = FAKE_LLM_JITTER_SECONDS,
+                 seed: int = 0, fail_rate: float = 0.0, chunk_size: int = 24):
+        """
+        Deterministic stand-in for a hosted model.
+
+        Args:
+            latency (float): Mean seconds per call.
+            jitter (float): Calls take latency ± up to this many seconds.
+            seed (int): Changes every generated value; same seed and prompt give the same output.
+            fail_rate (float): Share of prompts whose response is truncated, invalid JSON.
+            chunk_size (int): Characters per chunk when streaming.
+        """
+        self.model = "fake"
+        self.temperature = 0.0
+        self.max_tokens = 1000
+        self.latency = latency
+        self.jitter = jitter
+        self.seed = seed
+        self.fail_rate = fail_rate
+        self.chunk_size = chunk_size
+
+    def _random(self, prompt: str) -> random.Random:
+        digest = hashlib.sha256(f"{self.seed}:{prompt}".encode("utf-8")).digest()
+        return random.Random(int.from_bytes(digest[:8], "big"))
+
+    def _value(self, schema, key: str, rng: random.Random):
+        if isinstance(schema, dict):
+            return {k: self._value(v, k, rng) for k, v in schema.items()}
+        if isinstance(schema, list):
+            item = schema[0] if schema else "string"
+            if key in ("Skills", "Tech_Stack", "matched_skills", "missing_skills"):
+                return rng.sample(_SKILLS, rng.randint(2, 6))
+            return [self._value(item, key, rng) for _ in range(rng.randint(1, 3))]
+        spec = str(schema)
+        numbers = re.findall(r"\d+(?:\.\d+)?", spec)
+        if spec.startswith(("float", "int")):
+            low, high = (float(numbers[0]), float(numbers[1])) if len(numbers) >= 2 else (0.0, 10.0)
+            value = round(rng.uniform(low, high), 1)
+            return int(value) if spec.startswith("int") else value
+        if "|" in spec:
+            return rng.choice([option.strip() for option in spec.split("|")])
+        if key in ("company_name",):
+            return rng.choice(_COMPANIES)
+        if key in ("location_country", "company_location"):
+            return rng.choice(_COUNTRIES)
+        if key == "job_id":
+            return f"FAKE-{rng.randint(1000, 9999)}"
+        if key in ("job_url",):
+            return f"https://jobs.example.com/{rng.randint(1000, 9999)}"
+        if key == "search_query":
+            return f'site:linkedin.com/in/ (recruiter OR "talent acquisition") "{rng.choice(_COMPANIES)}"'
+        words = [rng.choice(_WORDS) for _ in range(_TEXT_WORDS.get(key, 4))]
+        return " ".join(words).capitalize()
+
+    def respond(self, prompt: str, response_schema: dict = None) -> tuple:
+        """
+        Builds the response for a prompt without waiting.
+
+        Returns:
+            tuple: (response text, delay in seconds this call should take).
+        """
+        rng = self._random(prompt)
+        text = json.dumps(self._value(response_schema or {"answer": "string"}, "", rng))
+        if rng.random() < self.fail_rate:
+            text = text[: len(text) // 2]
+        delay = max(self.latency + rng.uniform(-self.jitter, self.jitter), 0.0)
+        return text, delay
+
+    def _record_usage(self, prompt: str, text: str):
+        record_usage("fake", self.model, estimate_tokens(prompt), estimate_tokens(text), estimated=True)
+
+    def call(self, prompt: str, response_schema: dict = None) -> str:
+        text, delay = self.respond(prompt, response_schema)
+        time.sleep(delay)
+        self._record_usage(prompt, text)
+        return text
+
+    async def acall(self, prompt: str, response_schema: dict = None) -> str:
+        text, delay = self.respond(prompt, response_schema)
+        await asyncio.sleep(delay)
+        self._record_usage(prompt, text)
+        return text
+
+    def stream(self, prompt: str, response_schema: dict = None):
+        text, delay = self.respond(prompt, response_schema)
+        chunks = [text[i:i + self.chunk_size] for i in range(0, len(text), self.chunk_size)] or [""]
+        for chunk in chunks:
+            time.sleep(delay / len(chunks))
+            yield chunk
+        self._record_usage(prompt, text)
+
+    async def astream(self, prompt: str, response_schema: dict = None):
+        text, delay = self.respond(prompt, response_schema)
+        chunks = [text[i:i + self.chunk_size] for i in range(0, len(text), self.chunk_size)] or [""]
+        for chunk in chunks:
+            await asyncio.sleep(delay / len(chunks))
+            yield chunk
+        self._record_usage(prompt, text)
@@ -1,40 +1,61 @@
 # llm/perplexity.py
-import requests
-import re
 import logging
 from llm.base import BaseLLM
+from llm.http_pool import get_async_client, make_timeout, run_sync
+from llm.rate_limiter import get_limiter
+from utils.json_repair import extract_json_text
+from utils.logger import record_usage
+from utils.prompt_compaction import estimate_tokens
 
 class PerplexityLLM(BaseLLM):
-    def __init__(self, api_key: str, api_url: str = 'https://api.perplexity.ai/chat/completions'):
+    def __init__(self, api_key: str, api_url: str = 'https://api.perplexity.ai/chat/completions',
+                 connect_timeout: float = None, read_timeout: float = None):
         self.api_key = api_key
         self.api_url = api_url
+        self.model = "sonar-pro"
+        self.temperature = 0.7
+        self.max_tokens = 1000
+        self.timeout = make_timeout(connect_timeout, read_timeout)
+        self.limiter = get_limiter("perplexity")
 
-    def call(self, prompt: str, response_schema: dict) -> str:
+    def call(self, prompt: str, response_schema: dict = None) -> str:
+        return run_sync(self.acall(prompt, response_schema))
+
+    async def acall(self, prompt: str, response_schema: dict = None) -> str:
         headers = {
             "Content-Type": "application/json",
             "Authorization": f"Bearer {self.api_key}"
         }
         data = {
-            "model": "sonar-pro",
+            "model": self.model,
             "messages": [
                 {"role": "system", "content": "You are a helpful assistant."},
                 {"role": "user", "content": prompt}
             ],
-            "max_tokens": 1000,
-            "temperature": 0.7
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature
         }
 
         try:
             logging.info("Sending request to Perplexity API...")
-            response = requests.post(self.api_url, headers=headers, json=data)
-            response.raise_for_status()
-            # print(response.json().get("choices")[0].get("message").get("content"))
-            answer = response.json().get("choices", [{}])[0].get("message").get("content")
+            async def request():
+                response = await get_async_client().post(self.api_url, headers=headers, json=data, timeout=self.timeout)
+                response.raise_for_status()
+                return response
+
+            response = await self.limiter.call(
+                request,
+                estimate_tokens(prompt) + self.max_tokens,
+                usage_of=lambda r: r.json()["usage"]["total_tokens"],
+            )
+            body = response.json()
+            usage = body.get("usage") or {}
+            record_usage("perplexity", self.model, usage.get("prompt_tokens"), usage.get("completion_tokens"))
+            answer = body.get("choices", [{}])[0].get("message").get("content")
             return self._extract_json(answer)
         except Exception as e:
             logging.error(f"Perplexity call failed: {e}")
             raise
 
     def _extract_json(self, text: str) -> str:
-        match = re.search(r"<json>(.*?)</json>", text, re.DOTALL)
-        return match.group(1).strip() if match else text
+        return extract_json_text(text)
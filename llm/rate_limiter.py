@@ -0,0 +1,366 @@
+# llm/rate_limiter.py
+"""
+Provider-aware rate limiting for the LLM backends.
+
+Every provider gets one shared ProviderLimiter with
+- token buckets for requests/min and tokens/min (a request reserves its
+  estimated prompt tokens plus max_tokens, and is reconciled with the
+  reported usage when it finishes)
+- Retry-After handling: a 429 blocks the whole provider until the server's
+  deadline, then the request is retried
+- AIMD concurrency: the in-flight limit grows by about one per round of
+  successful requests and halves on a 429 (or shrinks by 10% when latency
+  climbs well above its running average)
+
+The limiter is not bound to an event loop, so callers on the background
+loop used by the sync wrappers and on their own loops share one budget.
+stats() / limiter_stats() return snapshots for logs and dashboards.
+"""
+import asyncio
+import email.utils
+import logging
+import threading
+import time
+
+from config import LLM_MAX_RETRIES, RATE_LIMITS
+from utils.logger import add_counts, record_retry
+
+# Multiplicative decrease is applied at most once per window, so a burst of
+# 429s from requests that were already in flight counts as one signal
+_DECREASE_WINDOW_SECONDS = 1.0
+_LATENCY_ALPHA = 0.1
+_LATENCY_FACTOR = 2.5
+
+
+def _retry_after_seconds(headers) -> float:
+    if headers is None:
+        return None
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        parsed = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None  # Malformed header: the caller falls back to its own backoff
+    return max(parsed.timestamp() - time.time(), 0.0) if parsed else None
+
+
+def rate_limit_info(error: Exception) -> tuple:
+    """
+    Reads the HTTP status and Retry-After delay from an httpx or OpenAI SDK error.
+
+    Returns:
+        tuple: (status code or None, retry-after seconds or None).
+    """
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None) or getattr(error, "status_code", None)
+    return status, _retry_after_seconds(getattr(response, "headers", None))
+
+
+class ProviderLimiter:
+    def __init__(self, name: str, rpm: float = 0, tpm: float = 0, max_concurrency: int = 8,
+                 initial_concurrency: int = 4, min_concurrency: int = 1, max_retries: int = LLM_MAX_RETRIES):
+        """
+        Args:
+            name (str): Provider name, used in logs and stats.
+            rpm (float): Requests per minute; 0 disables the request bucket.
+            tpm (float): Tokens per minute; 0 disables the token bucket.
+            max_concurrency (int): Upper bound of the adaptive in-flight limit.
+            initial_concurrency (int): Starting in-flight limit.
+            min_concurrency (int): Lower bound of the adaptive in-flight limit.
+            max_retries (int): Retries of a request that was rate limited.
+        """
+        self.name = name
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_retries = max_retries
+        self.limit = float(min(max(initial_concurrency, min_concurrency), max_concurrency))
+
+        self._lock = threading.Lock()
+        self._request_bucket = float(rpm)
+        self._token_bucket = float(tpm)
+        self._refilled_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._last_decrease = 0.0
+        self._waiters = []  # (loop, future) of tasks waiting for a free slot
+
+        self.in_flight = 0
+        self.queue_depth = 0
+        self.requests = 0
+        self.rate_limited = 0
+        self.retries = 0
+        self.failures = 0
+        self.tokens_used = 0
+        self.throttled_seconds = 0.0
+        self.latency_ewma = None
+
+    def _refill(self, now: float):
+        elapsed = now - self._refilled_at
+        self._refilled_at = now
+        if self.rpm:
+            self._request_bucket = min(self.rpm, self._request_bucket + elapsed * self.rpm / 60)
+        if self.tpm:
+            self._token_bucket = min(self.tpm, self._token_bucket + elapsed * self.tpm / 60)
+
+    def _wake_waiters(self):
+        waiters, self._waiters = self._waiters, []
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(lambda f=future: f.done() or f.set_result(None))
+
+    async def acquire(self, tokens: int):
+        """
+        Waits until the provider's buckets, Retry-After block and concurrency limit allow a request.
+
+        Args:
+            tokens (int): Tokens to reserve (estimated prompt tokens plus max_tokens).
+        """
+        if self.tpm:
+            tokens = min(tokens, self.tpm)  # A request larger than the bucket would never fit
+        started = time.monotonic()
+        with self._lock:
+            self.queue_depth += 1
+        try:
+            while True:
+                future = None
+                with self._lock:
+                    now = time.monotonic()
+                    self._refill(now)
+                    wait = 0.0
+                    if now < self._blocked_until:
+                        wait = self._blocked_until - now
+                    elif self.in_flight >= int(self.limit):
+                        loop = asyncio.get_running_loop()
+                        future = loop.create_future()
+                        self._waiters.append((loop, future))
+                    else:
+                        if self.rpm and self._request_bucket < 1:
+                            wait = (1 - self._request_bucket) * 60 / self.rpm
+                        if self.tpm and self._token_bucket < tokens:
+                            wait = max(wait, (tokens - self._token_bucket) * 60 / self.tpm)
+                        if wait == 0.0:
+                            if self.rpm:
+                                self._request_bucket -= 1
+                            if self.tpm:
+                                self._token_bucket -= tokens
+                            self.in_flight += 1
+                            self.throttled_seconds += now - started
+                            if now - started >= 0.001:
+                                add_counts(throttled_ms=round((now - started) * 1000, 1))
+                            return
+                if future is not None:
+                    try:
+                        await asyncio.wait_for(future, timeout=1.0)
+                    except asyncio.TimeoutError:
+                        pass
+                else:
+                    await asyncio.sleep(wait)
+        finally:
+            with self._lock:
+                self.queue_depth -= 1
+
+    def release(self, reserved_tokens: int, used_tokens: int = None, latency: float = None,
+                rate_limited: bool = False, retry_after: float = None, failed: bool = False,
+                cancelled: bool = False):
+        """
+        Returns a slot and feeds the outcome into the buckets and the AIMD controller.
+
+        Args:
+            reserved_tokens (int): Tokens reserved by acquire().
+            used_tokens (int): Tokens the provider reported; the difference is refunded.
+                None keeps the reservation.
+            latency (float): Seconds the request took, for successful requests.
+            rate_limited (bool): The provider answered 429.
+            retry_after (float): Seconds the provider asked to wait.
+            failed (bool): The request failed for another reason.
+            cancelled (bool): The request was cancelled (e.g. a scheduler timeout); only the
+                slot and the reserved tokens are returned, the stats and the AIMD controller
+                are left alone.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.in_flight -= 1
+            if self.tpm:
+                reserved = min(reserved_tokens, self.tpm)
+                # The bucket refilled while the request ran, so a refund must not lift it past a full minute
+                if rate_limited or failed or cancelled:
+                    self._token_bucket = min(self.tpm, self._token_bucket + reserved)  # Assume nothing was consumed
+                elif used_tokens is not None:
+                    self._token_bucket = min(self.tpm, self._token_bucket + reserved - used_tokens)
+            if cancelled:
+                # Says nothing about the provider: leave the stats and the AIMD controller alone
+                self._wake_waiters()
+                return
+            if rate_limited:
+                self.rate_limited += 1
+                delay = retry_after if retry_after is not None else min(2.0 ** min(self.rate_limited, 5), 30.0)
+                self._blocked_until = max(self._blocked_until, now + delay)
+                if now - self._last_decrease >= _DECREASE_WINDOW_SECONDS:
+                    self.limit = max(self.min_concurrency, self.limit / 2)
+                    self._last_decrease = now
+                logging.warning(f"{self.name} rate limited; waiting {delay:.1f}s, concurrency limit now {self.limit:.1f}")
+            elif failed:
+                self.failures += 1
+            else:
+                self.requests += 1
+                self.tokens_used += used_tokens if used_tokens is not None else reserved_tokens
+                if latency is not None:
+                    slow = self.latency_ewma is not None and latency > _LATENCY_FACTOR * self.latency_ewma
+                    self.latency_ewma = latency if self.latency_ewma is None else (
+                        (1 - _LATENCY_ALPHA) * self.latency_ewma + _LATENCY_ALPHA * latency
+                    )
+                    if slow and now - self._last_decrease >= _DECREASE_WINDOW_SECONDS:
+                        self.limit = max(self.min_concurrency, self.limit * 0.9)
+                        self._last_decrease = now
+                    elif not slow:
+                        self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+            self._wake_waiters()
+
+    async def call(self, make_request, tokens: int, usage_of=None):
+        """
+        Runs a request under the limiter, retrying it when the provider answers 429.
+
+        Args:
+            make_request (callable): Returns a new awaitable for each attempt.
+            tokens (int): Tokens to reserve per attempt.
+            usage_of (callable): Optional; maps the result to the total tokens it used.
+
+        Returns:
+            The request's result.
+        """
+        for attempt in range(self.max_retries + 1):
+            await self.acquire(tokens)
+            started = time.monotonic()
+            # Cancellation is a BaseException and skips the except below; the finally still returns the slot
+            outcome = {"cancelled": True}
+            try:
+                result = await make_request()
+            except Exception as e:
+                status, retry_after = rate_limit_info(e)
+                outcome = {"rate_limited": status == 429, "retry_after": retry_after, "failed": status != 429}
+                if status == 429 and attempt < self.max_retries:
+                    with self._lock:
+                        self.retries += 1
+                    record_retry(self.name)
+                    continue
+                raise
+            else:
+                used = None
+                if usage_of is not None:
+                    try:
+                        used = usage_of(result)
+                    except Exception:
+                        used = None
+                outcome = {"used_tokens": used, "latency": time.monotonic() - started}
+                return result
+            finally:
+                self.release(tokens, **outcome)
+
+    async def stream(self, open_stream, tokens: int, count_tokens=None):
+        """
+        Async generator version of call() for streamed responses; the slot is
+        held until the stream is exhausted or closed.
+
+        Args:
+            open_stream (callable): Returns an awaitable that resolves to an async iterator of text chunks.
+            tokens (int): Tokens to reserve.
+            count_tokens (callable): Optional; estimates the tokens of the full streamed text.
+
+        Yields:
+            str: The stream's chunks.
+        """
+        for attempt in range(self.max_retries + 1):
+            await self.acquire(tokens)
+            started = time.monotonic()
+            opened = False
+            outcome = {"cancelled": True}
+            try:
+                stream = await open_stream()
+                opened = True
+            except Exception as e:
+                status, retry_after = rate_limit_info(e)
+                outcome = {"rate_limited": status == 429, "retry_after": retry_after, "failed": status != 429}
+                if status == 429 and attempt < self.max_retries:
+                    with self._lock:
+                        self.retries += 1
+                    record_retry(self.name)
+                    continue
+                raise
+            finally:
+                if not opened:  # An open stream keeps its slot until it is consumed below
+                    self.release(tokens, **outcome)
+            break
+
+        chunks = []
+        outcome = {"cancelled": True}  # Also when the consumer closes the generator early
+        try:
+            async for chunk in stream:
+                chunks.append(chunk)
+                yield chunk
+            used = count_tokens("".join(chunks)) if count_tokens else None
+            outcome = {"used_tokens": used, "latency": time.monotonic() - started}
+        except Exception:
+            outcome = {"failed": True}
+            raise
+        finally:
+            self.release(tokens, **outcome)
+
+    def stats(self) -> dict:
+        """Returns a snapshot of the limiter state."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            return {
+                "provider": self.name,
+                "concurrency_limit": round(self.limit, 2),
+                "in_flight": self.in_flight,
+                "queue_depth": self.queue_depth,
+                "requests": self.requests,
+                "rate_limited": self.rate_limited,
+                "retries": self.retries,
+                "failures": self.failures,
+                "tokens_used": self.tokens_used,
+                "throttled_seconds": round(self.throttled_seconds, 3),
+                "blocked_for_seconds": round(max(self._blocked_until - now, 0.0), 3),
+                "request_budget": round(self._request_bucket, 1) if self.rpm else None,
+                "token_budget": round(self._token_bucket) if self.tpm else None,
+                "latency_ewma_seconds": round(self.latency_ewma, 3) if self.latency_ewma is not None else None,
+            }
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(provider: str) -> ProviderLimiter:
+    """
+    Returns the process-wide limiter of a provider, configured from config.RATE_LIMITS.
+
+    Args:
+        provider (str): e.g. "groq" or "perplexity".
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            limiter = ProviderLimiter(provider, **RATE_LIMITS.get(provider, {}))
+            _limiters[provider] = limiter
+    return limiter
+
+
+def limiter_stats() -> dict:
+    """Returns provider name -> stats() of every limiter created so far."""
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.name: limiter.stats() for limiter in limiters}
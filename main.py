@@ -1,30 +1,25 @@
 
-import os
 import logging
 from dotenv import load_dotenv
-from concurrent.futures import ThreadPoolExecutor, TimeoutError
-import datetime
-import pandas as pd
-import json
 
-import time
 import streamlit as st
 import streamlit.components.v1 as components # Import components for custom HTML/JS
-from utils.file_io import load_resume # Assuming this exists and works
-from llm.perplexity import PerplexityLLM # Assuming these LLMs are correctly implemented
-from llm.groq import GroqLLM # Assuming these LLMs are correctly implemented
-from agents.job_extractor import JobInfoExtractor
-from agents.fit_evaluator import FitEvaluatorAgent
-from agents.email_generator import EmailGeneratorAgent
-from agents.org_evaluater import OrgEvaluatorAgent
-from agents.get_recruiter_agent import GetRecruiterAgent
+from utils.resume_service import RESUME_VARIANTS_DIR, get_resume, get_resume_variants
+from utils.scheduler import COMPLETED, PROGRESS, SKIPPED, STARTED
+from config import TRIAGE_THRESHOLD
 from ui.ui_components import display_recruiter_details_streamlit_modified # Assuming this exists and works
 from ui.ui_components import display_application_records # Assuming this exists and works
 from ui.ui_components import save_application_record # Assuming this exists and works
+from ui.ui_components import display_run_diagnostics
+from ui.ui_components import display_duplicate_record
+from ui.ui_components import display_job_queue, submit_background_job
+from ui.ui_components import get_agent_executor, get_pipeline
+from utils.logger import configure_logging, start_metrics_server
 
 # --------------------- Config & Logging ---------------------
 load_dotenv()
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+configure_logging()
+start_metrics_server()  # No-op unless METRICS_PORT is set
 
 st.set_page_config(page_title="Job Auto Apply", layout="wide")
 
@@ -139,6 +134,15 @@ st.markdown("""
 
 # st.title("🚀 Job Auto Apply Assistant")
 
+# Scheduler task name -> session state key holding its result
+SESSION_KEYS = {
+    "prescore": "prescore_data",
+    "fit_eval": "fit_eval_data",
+    "email_gen": "email_gen_data",
+    "org_eval": "org_eval_data",
+    "recruiter_data": "recruiter_data",
+}
+
 # --------------------- State Initialization ---------------------
 if 'job_info_data' not in st.session_state:
     st.session_state.job_info_data = None
@@ -150,6 +154,18 @@ if 'org_eval_data' not in st.session_state:
     st.session_state.org_eval_data = None
 if 'recruiter_data' not in st.session_state:
     st.session_state.recruiter_data = None
+if 'prescore_data' not in st.session_state:
+    st.session_state.prescore_data = None
+if 'variant_results' not in st.session_state:
+    st.session_state.variant_results = {}
+if 'resume_ranking' not in st.session_state:
+    st.session_state.resume_ranking = None
+if 'resume_id' not in st.session_state:
+    st.session_state.resume_id = None
+if 'duplicate_record' not in st.session_state:
+    st.session_state.duplicate_record = None
+if 'last_run_trace' not in st.session_state:
+    st.session_state.last_run_trace = None
 if 'raw_job_description_text' not in st.session_state:
     st.session_state.raw_job_description_text = ""
 if 'agent_status' not in st.session_state:
@@ -162,8 +178,32 @@ if 'agent_status' not in st.session_state:
     }
 
 
+def load_job_result(job: dict):
+    """Puts the results of a finished background job into the session, as if it had run here."""
+    result = job["result"]
+    st.session_state.job_info_data = result.get("job_info")
+    st.session_state.fit_eval_data = result.get("fit_eval")
+    st.session_state.email_gen_data = result.get("email_gen")
+    st.session_state.org_eval_data = result.get("org_eval")
+    st.session_state.recruiter_data = result.get("recruiter_data")
+    st.session_state.prescore_data = result.get("prescore")
+    st.session_state.raw_job_description_text = result.get("job_text", "")
+    st.session_state.resume_id = result.get("resume_id")
+    st.session_state.variant_results = result.get("variants") or {}
+    st.session_state.resume_ranking = result.get("ranking")
+    if st.session_state.resume_ranking:
+        st.session_state.resume_variant_choice = result["resume_id"]
+    st.session_state.duplicate_record = None
+    if result.get("duplicate_of"):
+        st.session_state.job_info_data = None  # Nothing new to save
+        st.session_state.duplicate_record = (result.get("duplicate_record"), result.get("duplicate_reason", ""))
+    st.session_state.last_run_trace = result.get("trace")
+    st.session_state.agent_status = job.get("progress") or {}
+    st.toast(f"📂 Loaded job #{job['id']}; its results are on the Parse Job tab.")
+
+
 # --------------------- Navigation Bar ---------------------
-tab1, tab2 = st.tabs(["Parse Job", "Records"])
+tab1, tab2, tab3 = st.tabs(["Parse Job", "Queue", "Records"])
 
 with tab1:
     st.header("Parse Job Listing")
@@ -172,8 +212,42 @@ with tab1:
         height=250,
         key="job_text_input_area"
     )
+    triage_mode = st.checkbox(
+        f"Triage: skip email and recruiter search when the local skill pre-score is below {TRIAGE_THRESHOLD:g}",
+        key="triage_mode",
+    )
+    fused_mode = st.checkbox(
+        "Fused: evaluate fit and write the messages in a single LLM request",
+        key="fused_mode",
+    )
+    try:
+        resume_variants = get_resume_variants()
+    except (OSError, ValueError) as e:  # json.JSONDecodeError is a ValueError
+        logging.error(f"Could not load resume variants: {e}")
+        st.warning(f"⚠️ Resume variants in '{RESUME_VARIANTS_DIR}/' could not be loaded: {e}")
+        resume_variants = {}
+    compare_mode = len(resume_variants) > 1 and st.checkbox(
+        f"Compare resumes: evaluate {', '.join(resume_variants)} from {RESUME_VARIANTS_DIR}/ and rank them by fit",
+        key="compare_resumes",
+    )
 
-    if st.button("🔍 Parse Job and Evaluate", use_container_width=True):
+    run_col, queue_col = st.columns(2)
+    parse_clicked = run_col.button("🔍 Parse Job and Evaluate", use_container_width=True)
+    # Queued jobs run in worker.py processes: they keep going across reruns and reloads
+    queue_clicked = queue_col.button("📥 Run in Background", use_container_width=True, key="queue_job_button")
+
+    if queue_clicked:
+        if not job_text_input:
+            st.warning("Please paste the job listing text into the box.")
+        else:
+            job_id, workers = submit_background_job(
+                job_text_input, {"triage": triage_mode, "fused": fused_mode, "compare": bool(compare_mode)},
+            )
+            st.success(f"📥 Queued as job #{job_id}. Follow it and load its results on the Queue tab.")
+            if not workers:
+                st.warning("⚠️ No worker is running. Start one with `python worker.py` to process queued jobs.")
+
+    if parse_clicked:
         if not job_text_input:
             st.warning("Please paste the job listing text into the box.")
         else:
@@ -182,106 +256,115 @@ with tab1:
             st.session_state.email_gen_data = None
             st.session_state.org_eval_data = None
             st.session_state.recruiter_data = None
-
-            perplexity_key = os.getenv("PERPLEXITY_API_KEY")
-            groq_key = os.getenv("GROQ_API_KEY")
-
-            if not perplexity_key or not groq_key:
-                st.error("🚨 Missing API keys in .env file. Please check your configuration.")
+            st.session_state.prescore_data = None
+            st.session_state.duplicate_record = None
+            st.session_state.variant_results = {}
+            st.session_state.resume_ranking = None
+
+            try:
+                base_pipeline = get_pipeline()
+                llm_error = None
+            except ValueError as e:
+                llm_error = e
+
+            if llm_error:
+                st.error(f"🚨 {llm_error} Please check your .env configuration.")
             else:
+                try:
+                    resume = resume_variants if compare_mode else get_resume()
+                except (OSError, ValueError) as e:  # Missing file or invalid JSON
+                    logging.error(f"Could not load resume: {e}")
+                    resume = None
+                if not resume:
+                    st.error("🚫 No resume found! Please ensure 'data/resume.json' exists and contains your resume.")
+                    st.stop()
+                st.session_state.resume_id = None if compare_mode else resume.resume_id
+
                 # Initialize status display
                 status_placeholder = st.empty()
-                st.session_state.agent_status = {
-                    "JobInfoExtractor": "Starting...",
-                    "FitEvaluatorAgent": "Pending",
-                    "EmailGeneratorAgent": "Pending",
-                    "OrgEvaluatorAgent": "Pending",
-                    "GetRecruiterAgent": "Pending",
-                }
+                fit_preview = st.empty()
+                email_preview = st.empty()
                 status_placeholder.info("⚙️ Processing job listing: Starting agents...")
 
-
                 try:
-                    # Initialize LLMs and Agents
-                    perplexity_llm = PerplexityLLM(api_key=perplexity_key)
-                    groq_llm = GroqLLM(api_key=groq_key)
-
-                    job_agent = JobInfoExtractor(llm=groq_llm)
-                    fit_agent = FitEvaluatorAgent(llm=groq_llm)
-                    email_agent = EmailGeneratorAgent(llm=groq_llm)
-                    org_agent = OrgEvaluatorAgent(llm=perplexity_llm)
-                    get_recruiter_agent = GetRecruiterAgent(llm=perplexity_llm)
-
-                    # Thread execution for parallel processing
-                    with ThreadPoolExecutor(max_workers=4) as executor:
-                        # Job Extractor
-                        st.session_state.agent_status["JobInfoExtractor"] = "Running: Extracting data from job description..."
-                        status_placeholder.info(f"⚙️ Processing job listing: {st.session_state.agent_status['JobInfoExtractor']}")
-                        future_job = executor.submit(job_agent.run, job_text_input)
-
-                        try:
-                            job_text, job_info = future_job.result(timeout=180)
-                            st.session_state.job_info_data = job_info
-                            st.session_state.raw_job_description_text = job_text
-                            st.session_state.agent_status["JobInfoExtractor"] = "Completed"
-                            status_placeholder.info(f"⚙️ Processing job listing: {st.session_state.agent_status['JobInfoExtractor']}")
-
-
-                            resume = load_resume()
-                            if not resume:
-                                st.error("🚫 No resume found! Please ensure 'data/resume.txt' exists and contains your resume.")
-                                st.stop()
-
-                            # Prepare arguments for concurrent calls
-                            fit_args = (resume, job_info)
-                            email_args = (resume, job_info)
-                            org_args = (job_info.get("company_name", ""), job_info.get("location_country", ""))
-                            recruiter_args = (job_info.get("company_name", ""), job_info.get("location_country", ""))
-
-                            # Submit other agents with status updates
-                            st.session_state.agent_status["FitEvaluatorAgent"] = "Running: Evaluating resume fit..."
-                            status_placeholder.info(f"⚙️ Processing fit evaluation: {st.session_state.agent_status['FitEvaluatorAgent']}")
-                            future_fit = executor.submit(fit_agent.run, *fit_args)
-                            time.sleep(1)  # Small delay to ensure status updates are visible
-                            st.session_state.agent_status["EmailGeneratorAgent"] = "Running: Generating email and cover letter..."
-                            status_placeholder.info(f"⚙️ Processing email generation: {st.session_state.agent_status['EmailGeneratorAgent']}")
-                            future_email = executor.submit(email_agent.run, *email_args)
-                            time.sleep(1)  # Small delay to ensure status updates are visible
-                            st.session_state.agent_status["OrgEvaluatorAgent"] = "Running: Researching organization details..."
-                            status_placeholder.info(f"⚙️ Processing organization research: {st.session_state.agent_status['OrgEvaluatorAgent']}")
-                            future_org = executor.submit(org_agent.run, *org_args)
-                            time.sleep(1)  # Small delay to ensure status updates are visible
-                            st.session_state.agent_status["GetRecruiterAgent"] = "Running: Searching for recruiter information..."
-                            status_placeholder.info(f"⚙️ Processing recruiter search: {st.session_state.agent_status['GetRecruiterAgent']}")
-                            future_recruiter = executor.submit(get_recruiter_agent.run, *recruiter_args)
-
-                            # Collect results
-                            st.session_state.fit_eval_data = future_fit.result(timeout=180)
-                            st.session_state.agent_status["FitEvaluatorAgent"] = "Completed"
-                            status_placeholder.info(f"⚙️ Processing fit evaluation: {st.session_state.agent_status['FitEvaluatorAgent']}")
-                            time.sleep(1)  # Small delay to ensure status updates are visible
-                            st.session_state.email_gen_data = future_email.result(timeout=180)
-                            st.session_state.agent_status["EmailGeneratorAgent"] = "Completed"
-                            status_placeholder.info(f"⚙️ Processing email generation: {st.session_state.agent_status['EmailGeneratorAgent']}")
-                            time.sleep(1)  # Small delay to ensure status updates are visible
-                            st.session_state.org_eval_data = future_org.result(timeout=180)
-                            st.session_state.agent_status["OrgEvaluatorAgent"] = "Completed"
-                            status_placeholder.info(f"⚙️ Processing organization research: {st.session_state.agent_status['OrgEvaluatorAgent']}")
-                            time.sleep(1)  # Small delay to ensure status updates are visible
-                            st.session_state.recruiter_data = future_recruiter.result(timeout=180)
-                            st.session_state.agent_status["GetRecruiterAgent"] = "running"
-                            status_placeholder.info(f"⚙️ Processing recruiter search: {st.session_state.agent_status['GetRecruiterAgent']}")
-
-                            status_placeholder.success("✅ All agents completed successfully!")
-
-                        except TimeoutError as e:
-                            st.error(f"⏳ An agent timed out: {e}. Please try again or check the input.")
-                            logging.error(f"TimeoutError during agent execution: {e}")
-                            status_placeholder.error("❌ Processing failed due to timeout.")
-                        except Exception as e:
-                            st.error(f"❌ An error occurred during processing: {e}")
-                            logging.exception(f"Error during agent execution: {e}")
-                            status_placeholder.error("❌ Processing failed due to an error.")
+                    from utils.pipeline import MATCH_REASONS, DuplicateJob, rank_variants, split_task, task_agent
+                    pipeline = base_pipeline.with_options(
+                        triage_threshold=TRIAGE_THRESHOLD if triage_mode else None,
+                        fused=fused_mode,
+                    )
+                    resume_ids = list(resume) if compare_mode else None
+                    st.session_state.agent_status = {
+                        task_agent(task.name): "Pending" for task in pipeline.build_tasks(resume_ids=resume_ids)
+                    }
+
+                    # Agents start as soon as their inputs are ready; render each event as it happens
+                    failed_agents = []
+                    skipped_agents = []
+                    duplicate = None
+                    for event in pipeline.events(job_text_input, resume, executor=get_agent_executor(), stream=True):
+                        agent = task_agent(event.task)
+                        task, resume_id = split_task(event.task)
+                        variant = f"[{resume_id}] " if resume_id else ""
+                        if event.kind == PROGRESS:
+                            # Streamed fields: show the first useful content while the rest generates
+                            path, value = event.value
+                            if path == ("fit_score",):
+                                fit_preview.info(f"🎯 {variant}Fit Score: {value}/10.0 — writing the summary...")
+                            elif path == ("cold email", "subject"):
+                                email_preview.info(f"✉️ {variant}Cold email subject: {value} — writing the cover letter and messages...")
+                            continue
+                        if event.kind == STARTED:
+                            st.session_state.agent_status[agent] = "Running..."
+                        elif event.kind == COMPLETED:
+                            st.session_state.agent_status[agent] = f"Completed ({event.elapsed:.1f}s)"
+                            if task == "scrape":
+                                st.session_state.raw_job_description_text = event.value
+                            elif task == "job":
+                                job_text, job_info = event.value
+                                st.session_state.raw_job_description_text = job_text
+                                st.session_state.job_info_data = job_info
+                            elif resume_id is not None and task != "fit_email":
+                                st.session_state.variant_results.setdefault(resume_id, {})[task] = event.value
+                            elif task in SESSION_KEYS:  # fit_email is published again as fit_eval and email_gen
+                                st.session_state[SESSION_KEYS[task]] = event.value
+                            if task == "fit_eval":
+                                fit_preview.success(f"🎯 {variant}Fit Score: {event.value.get('fit_score', 'N/A')}/10.0 — {event.value.get('summary', '')}")
+                            elif task == "email_gen":
+                                email_preview.success(f"✉️ {variant}Cold email ready: {event.value.get('cold email', {}).get('subject', '')}")
+                        elif event.kind == SKIPPED and isinstance(event.error, DuplicateJob):
+                            st.session_state.agent_status[agent] = "Skipped (already saved)"
+                            duplicate = event.error
+                        elif event.kind == SKIPPED:
+                            st.session_state.agent_status[agent] = f"Skipped ({event.error})"
+                            skipped_agents.append(agent)
+                        else:
+                            st.session_state.agent_status[agent] = f"{event.kind.title()}: {event.error}"
+                            failed_agents.append(agent)
+                            if event.error is not None:
+                                logging.error(f"{agent} {event.kind}: {event.error}")
+
+                        status_lines = "\n".join(f"- **{name}**: {status}" for name, status in st.session_state.agent_status.items())
+                        status_placeholder.info(f"⚙️ Processing job listing:\n{status_lines}")
+
+                    fit_preview.empty()
+                    email_preview.empty()
+                    if pipeline.last_trace is not None:
+                        st.session_state.last_run_trace = pipeline.last_trace.to_dicts()
+                    if compare_mode and st.session_state.variant_results:
+                        st.session_state.resume_ranking = rank_variants(st.session_state.variant_results)
+                        # Preselect the best variant; the choice below can change it
+                        st.session_state.resume_variant_choice = st.session_state.resume_ranking[0]["resume_id"]
+                    if failed_agents:
+                        st.error(f"❌ Some agents did not complete: {', '.join(failed_agents)}. Please try again or check the input.")
+                        status_placeholder.error("❌ Processing finished with errors.")
+                    elif duplicate is not None:
+                        st.session_state.job_info_data = None  # Nothing new to save
+                        st.session_state.duplicate_record = (duplicate.record, MATCH_REASONS[duplicate.match["matched_on"]])
+                        status_placeholder.success(f"✅ Done. This posting is already saved as record #{duplicate.match['record_id']}.")
+                    elif skipped_agents:
+                        status_placeholder.success(f"✅ Done. Triage skipped {', '.join(skipped_agents)} for this weak match.")
+                    else:
+                        status_placeholder.success("✅ All agents completed successfully!")
 
                 except Exception as e:
                     st.error(f"🔥 Critical error during setup or initial processing: {e}")
@@ -289,11 +372,30 @@ with tab1:
                     status_placeholder.error("❌ Critical error during setup.")
 
 
+    if st.session_state.duplicate_record:
+        display_duplicate_record(*st.session_state.duplicate_record)
+
     # --- Display Results in Grid Layout ---
     if st.session_state.job_info_data:
         st.markdown("---")
         st.header("Analysis Results")
 
+        # Resume variants, best fit first; the chosen one feeds the sections below and the saved record
+        if st.session_state.resume_ranking:
+            with st.container(border=True):
+                st.subheader("📄 Resume Variants")
+                scores = {r["resume_id"]: r["fit_score"] for r in st.session_state.resume_ranking}
+                choice = st.radio(
+                    "Resume to use for the messages and the saved record",
+                    list(scores),
+                    format_func=lambda rid: f"{rid} — fit {scores[rid] if scores[rid] is not None else 'N/A'}/10.0",
+                    key="resume_variant_choice",
+                )
+            chosen = st.session_state.variant_results.get(choice, {})
+            st.session_state.fit_eval_data = chosen.get("fit_eval")
+            st.session_state.email_gen_data = chosen.get("email_gen")
+            st.session_state.resume_id = choice
+
         # Section 1: Raw Job Description
         with st.container(border=True):
             st.subheader("📝 Raw Job Description")
@@ -404,28 +506,51 @@ with tab1:
         # --- Save Button ---
         st.markdown("---")
         if st.button("💾 Save Application Record", use_container_width=True, key="save_record_button"):
-            if st.session_state.job_info_data and st.session_state.fit_eval_data and st.session_state.email_gen_data:
-                save_application_record(
+            # Email data may be missing when triage skipped it; the record is saved without it
+            if st.session_state.job_info_data and st.session_state.fit_eval_data:
+                record_id, created = save_application_record(
                     st.session_state.job_info_data,
                     st.session_state.fit_eval_data,
                     st.session_state.email_gen_data,
                     st.session_state.org_eval_data,
-                    st.session_state.recruiter_data
+                    st.session_state.recruiter_data,
+                    job_text=st.session_state.raw_job_description_text,
+                    resume_id=st.session_state.resume_id,
                 )
-                st.success("✅ Application record saved successfully!")
-                # Clear current session state after saving to allow new parsing
-                st.session_state.job_info_data = None
-                st.session_state.fit_eval_data = None
-                st.session_state.email_gen_data = None
-                st.session_state.org_eval_data = None
-                st.session_state.recruiter_data = None
-                st.session_state.raw_job_description_text = ""
-                st.rerun() # Rerun to clear the display
+                if record_id is None:
+                    # Keep the results on screen so the save can be retried
+                    st.error("❌ The record could not be saved. Please check the logs.")
+                else:
+                    if created:
+                        st.success("✅ Application record saved successfully!")
+                    else:
+                        st.info(f"♻️ This posting is already saved as record #{record_id}; it was not saved again.")
+                    # Clear current session state after saving to allow new parsing
+                    st.session_state.job_info_data = None
+                    st.session_state.fit_eval_data = None
+                    st.session_state.email_gen_data = None
+                    st.session_state.org_eval_data = None
+                    st.session_state.recruiter_data = None
+                    st.session_state.prescore_data = None
+                    st.session_state.variant_results = {}
+                    st.session_state.resume_ranking = None
+                    st.session_state.raw_job_description_text = ""
+                    st.rerun() # Rerun to clear the display
             else:
                 st.warning("⚠️ No complete data to save. Please parse a job first.")
 
+    # --- Run Diagnostics ---
+    if st.session_state.last_run_trace:
+        with st.expander("🩺 Run diagnostics", expanded=False):
+            display_run_diagnostics(st.session_state.last_run_trace)
+
 
 with tab2:
+    st.header("Background Jobs")
+    display_job_queue(load_job_result)
+
+
+with tab3:
     st.header("Job Application Records")
     display_application_records()
 
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from typing import List
+from utils.prompt_template import PromptTemplate, schema_text
 
 EMAIL_COVER_SCHEMA = {
     "cold email":{
@@ -19,8 +20,9 @@ EMAIL_COVER_SCHEMA = {
     }
 
 }
+EMAIL_COVER_SCHEMA_TEXT = schema_text(EMAIL_COVER_SCHEMA)
 
-EMAIL_COVER_TEMPLATE = '''
+EMAIL_COVER_TEMPLATE = PromptTemplate('''
 You are an expert job application assistant specializing in generating concise, clear, and compelling content for job applications. Your task is to produce a customized email, cover letter, LinkedIn networking message for the recruiter, and LinkedIn networking message for a potential referrer, all optimized for the given job description and user's resume.
 
 ---
@@ -70,4 +72,4 @@ You are an expert job application assistant specializing in generating concise,
 
 **Job Info:**
 {job_info}
-'''
+''', variables=('schema', 'resume', 'job_info'))
@@ -0,0 +1,45 @@
+# prompts/fit_email_prompt.py
+from prompts.email_cover_prompt import EMAIL_COVER_SCHEMA
+from prompts.fit_evaluator_prompt import FIT_EVALUATOR_SCHEMA
+from utils.prompt_template import PromptTemplate, schema_text
+
+# Fit fields first, so a streamed response shows the score before the long texts
+FIT_EMAIL_SCHEMA = {**FIT_EVALUATOR_SCHEMA, **EMAIL_COVER_SCHEMA}
+FIT_EMAIL_SCHEMA_TEXT = schema_text(FIT_EMAIL_SCHEMA)
+
+FIT_EMAIL_PROMPT_TEMPLATE = PromptTemplate('''
+You are an intelligent job application assistant. Using the candidate's resume and the job info below, do two things in one response: evaluate the candidate's fit for the job, then write the application messages.
+
+---
+
+### Part 1: Fit Evaluation
+Assess how well the resume aligns with the job, with a primary focus on **technical and functional fit**:
+- **Skills Match (70%)**: hard skills, tools, technologies, languages, frameworks and certifications; prioritize exact and closely related matches.
+- **Role & Experience Alignment (20%)**: relevance of past responsibilities, titles, projects and domains.
+- **Seniority Match (10%)**: years of experience and level compared with what the job demands.
+
+Give a **fit_score (0–10)** using these weights, list matched_skills and missing_skills, and write a short summary.
+**[IMPORTANT]** Apply deductions for critical missing requirements. If the job asks for **only** one technology (e.g. Vue) and the resume has an alternative instead (e.g. Angular), it is a critical missing requirement; if the job says "Vue or Angular", it is not. Watch for "or" in every requirement.
+
+### Part 2: Application Messages
+Write a cold email, a cover letter, a LinkedIn message to the recruiter and a LinkedIn message to a potential referrer:
+* Professional, confident, concise and specifically tailored: explicitly link the candidate's skills and experience to the job requirements.
+* **Cold email:** a specific subject with the job title, the candidate's key qualification and [jobid]; a brief introduction, the position with job id, 1-2 of the most relevant achievements and a clear call to action.
+* **Cover letter:** "Dear Hiring Team" unless the hiring manager is named; an opening that states the position and links to the company's mission; 1-2 paragraphs giving specific, quantified resume examples for 2-3 key requirements; a closing that thanks them; end with "Sincerely,".
+* **LinkedIn (recruiter):** introduce the candidate, name the role and one compelling reason they fit, and ask to connect; add the job id and link if provided.
+* **LinkedIn (referrer):** name the job title, company, job id and link, explain in 1-2 sentences why the background matches, and politely ask for a referral.
+* The email and LinkedIn messages end with "Best regards," followed by the candidate's name, email and contact number.
+
+---
+** [IMPORTANT]** all generated text should be plane text in single line without any formatting or markdown.
+**[IMPORTANT]Respond strictly inside <json> </json> tags in JSON format matching this schema:**
+{schema}
+
+---
+
+**Resume:**
+{resume}
+
+**Job Info:**
+{job_info}
+''', variables=('schema', 'resume', 'job_info'))
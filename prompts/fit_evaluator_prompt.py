@@ -1,14 +1,16 @@
 from pydantic import BaseModel
 from typing import List
+from utils.prompt_template import PromptTemplate, schema_text
 
 FIT_EVALUATOR_SCHEMA = {
-    "fit_score": "float (1.0 - 10.0)",
+    "fit_score": "float (0.0 - 10.0)",
     "matched_skills": ["string"],
     "missing_skills": ["string"],
     "summary": "string"
 }
+FIT_EVALUATOR_SCHEMA_TEXT = schema_text(FIT_EVALUATOR_SCHEMA)
 
-FIT_EVALUATOR_PROMPT_TEMPLATE = '''
+FIT_EVALUATOR_PROMPT_TEMPLATE = PromptTemplate('''
 You are an intelligent Job Fit Evaluation Assistant. Your task is to assess how well a candidate’s resume aligns with a given job description, with a primary focus on **technical and functional fit**.
 
 Perform a structured comparison with the following priorities:
@@ -54,7 +56,7 @@ Resume:
 
 Job Info:
 {job_info}
-'''
+''', variables=('schema', 'resume', 'job_info'))
 
 class FitReport(BaseModel):
     fit_score: float
@@ -0,0 +1,21 @@
+# prompts/followup_prompt.py
+from utils.prompt_template import PromptTemplate
+
+# Sent when a response parsed but some fields were missing or invalid (often
+# because the output was cut off at max_tokens); only those fields are asked for.
+# It carries the request's inputs and the answer so far, not the whole original prompt.
+FOLLOWUP_PROMPT_TEMPLATE = PromptTemplate('''
+You were answering a request based on the inputs below, and your answer was incomplete.
+
+### Inputs
+{context}
+
+### Your answer so far
+{answer}
+
+These fields were missing or invalid: {fields}.
+Answer again with ONLY these fields, consistent with your answer so far; do not repeat the fields that were already valid.
+** [IMPORTANT]** all generated text should be plane text in single line without any formatting or markdown.
+**[IMPORTANT]Respond strictly inside <json> </json> tags in JSON format matching this schema:**
+{schema}
+''', variables=('context', 'answer', 'fields', 'schema'))
@@ -1,11 +1,13 @@
 from pydantic import BaseModel
 from typing import List
+from utils.prompt_template import PromptTemplate, schema_text
 
 GET_RECRUITER_SCHEMA = {
    "search_query": "str",
 }
+GET_RECRUITER_SCHEMA_TEXT = schema_text(GET_RECRUITER_SCHEMA)
 
-GET_RECRUITER_PROMPT = '''
+GET_RECRUITER_PROMPT = PromptTemplate('''
 You are an expert google search agent.
 you are very experienced  in doing advance google  queary search 
 like use advance goolgle search techniques to find recruiters on LinkedIn or other professional networks.
@@ -21,4 +23,4 @@ note the location can be any where in the world. accordingly the linkdin url wil
 {schema}
 
 ---
-'''
+''', variables=('company_name', 'location', 'schema'))
@@ -1,5 +1,7 @@
 # prompts/job_info_prompt.py
 
+from utils.prompt_template import PromptTemplate, schema_text
+
 JOB_INFO_SCHEMA = {
     "Job_Title": "string",
     "company_name": "string",
@@ -26,8 +28,9 @@ JOB_INFO_SCHEMA = {
         "Perks": ["string"]
     }
 }
+JOB_INFO_SCHEMA_TEXT = schema_text(JOB_INFO_SCHEMA)
 
-JOB_INFO_PROMPT_TEMPLATE = '''
+JOB_INFO_PROMPT_TEMPLATE = PromptTemplate('''
 You are an advanced AI agent specialized in precisely extracting and structuring information from job listings.
 Your goal is to thoroughly parse the provided job posting text and output the details into a structured JSON format.
 special instructions:
@@ -45,7 +48,7 @@ Respond strictly inside <json></json> tags in JSON format matching this schema:
 {job_info_schema}
 Job Posting:
 {job_text}
-'''
+''', variables=('url', 'job_info_schema', 'job_text'))
 
 from pydantic import BaseModel
 from typing import List
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from typing import List
+from utils.prompt_template import PromptTemplate, schema_text
 
 ORG_EVALUATER_SCHEMA = {
     "company_research_report": {
@@ -11,8 +12,9 @@ ORG_EVALUATER_SCHEMA = {
        
     }
 }
+ORG_EVALUATER_SCHEMA_TEXT = schema_text(ORG_EVALUATER_SCHEMA)
 
-ORG_EVALUATER_PROMPT = '''
+ORG_EVALUATER_PROMPT = PromptTemplate('''
 You are an expert job application assistant specializing in conducting rapid,
 targeted research on companies to help users prepare for job applications.
 Your task is to produce a concise company research report for the specified company and location, 
@@ -58,4 +60,4 @@ Provide the average salary for software engineers at the company, if available.
 
 **LOCATION:**
 {location}
-'''
+''', variables=('schema', 'company_name', 'location'))
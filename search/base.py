@@ -0,0 +1,95 @@
+# search/base.py
+import contextvars
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+
+from config import SEARCH_CONCURRENCY
+
+_pool = None
+_pool_lock = threading.Lock()
+_pool_thread = threading.local()
+
+
+def _mark_pool_thread():
+    _pool_thread.active = True
+
+
+def get_search_pool() -> ThreadPoolExecutor:
+    """
+    Returns the process-wide search pool, creating it on first use.
+
+    Its SEARCH_CONCURRENCY threads only ever run single queries, never wait on
+    other pool tasks, so searches from every posting share one limit without
+    nested submissions deadlocking the pool.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=max(SEARCH_CONCURRENCY, 1), thread_name_prefix="search",
+                                       initializer=_mark_pool_thread)
+    return _pool
+
+
+class SearchProvider(ABC):
+    # Identifies the backend in cache keys and traces
+    name = "search"
+
+    @abstractmethod
+    def search(self, query: str) -> list:
+        """Returns result URLs for a query, best first; an empty list when nothing was found or the search failed."""
+
+    def __call__(self, query: str) -> list:
+        # Providers can be passed wherever a plain query -> URLs function is expected
+        return self.search(query)
+
+    def submit_many(self, queries: list) -> list:
+        """
+        Starts several queries on the shared search pool without waiting for them.
+
+        Args:
+            queries (list): Query strings.
+
+        Returns:
+            list: One Future per query, in query order, resolving to its result list.
+        """
+        pool = get_search_pool()
+        # Each query runs in a copy of the caller's context so its spans join the current trace
+        return [pool.submit(contextvars.copy_context().run, self.search, query) for query in queries]
+
+    def search_many(self, queries: list) -> list:
+        """
+        Runs several queries concurrently on the shared search pool.
+
+        Args:
+            queries (list): Query strings.
+
+        Returns:
+            list: One result list per query, in query order.
+        """
+        if len(queries) <= 1 or SEARCH_CONCURRENCY <= 1 or getattr(_pool_thread, "active", False):
+            # Called from a pool thread (e.g. a provider searching several queries itself):
+            # waiting on the same pool could block every thread, so run inline
+            return [self.search(query) for query in queries]
+        return [future.result() for future in self.submit_many(queries)]
+
+
+class FunctionSearch(SearchProvider):
+    name = "function"
+
+    def __init__(self, fn):
+        """
+        Wraps a plain query -> URLs function, e.g. a test double.
+
+        Args:
+            fn (callable): The search function.
+        """
+        self.fn = fn
+
+    def search(self, query: str) -> list:
+        return list(self.fn(query))
+
+
+def as_search_provider(search) -> SearchProvider:
+    """Returns search itself if it is a SearchProvider, otherwise wraps the function."""
+    return search if isinstance(search, SearchProvider) else FunctionSearch(search)
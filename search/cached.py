@@ -0,0 +1,46 @@
+# search/cached.py
+import hashlib
+import logging
+
+from config import SEARCH_CACHE_TTL_SECONDS
+from search.base import SearchProvider
+from utils.disk_cache import DiskCache
+from utils.logger import record_cache_hit, span
+
+search_results = DiskCache("search_results", ttl=SEARCH_CACHE_TTL_SECONDS)
+
+
+class CachedSearch(SearchProvider):
+    def __init__(self, provider: SearchProvider, cache: DiskCache = search_results):
+        """
+        Per-query result cache in front of another provider.
+
+        The same query is not sent to the search engine again until its
+        entry expires, even when it comes from a different posting.
+
+        Args:
+            provider (SearchProvider): The provider doing the actual searches.
+            cache (DiskCache): Cache to use; entries expire after SEARCH_CACHE_TTL_SECONDS by default.
+        """
+        self.provider = provider
+        self.name = provider.name
+        self.cache = cache
+
+    def _key(self, query: str) -> str:
+        normalized = " ".join(query.split()).lower()
+        return f"{self.provider.name}:{hashlib.sha1(normalized.encode('utf-8')).hexdigest()}"
+
+    def search(self, query: str) -> list:
+        key = self._key(query)
+        with span("search_query", provider=self.name) as query_span:
+            cached = self.cache.get(key)
+            if cached is not None:
+                logging.info(f"Search cache hit for {query[:80]!r}")
+                record_cache_hit("search_results")
+                query_span.set(results=len(cached))
+                return cached
+            results = self.provider.search(query)
+            query_span.set(results=len(results))
+        if results:  # An empty list usually means the search failed
+            self.cache.set(key, results)
+        return results
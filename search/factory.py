@@ -0,0 +1,31 @@
+# search/factory.py
+from config import SEARCH_CACHE_ENABLED, SEARCH_FIXTURES_PATH, SEARCH_PROVIDER
+
+
+def create_search_provider(provider: str = SEARCH_PROVIDER, cache: bool = SEARCH_CACHE_ENABLED):
+    """
+    Builds the search backend GetRecruiterAgent uses.
+
+    Args:
+        provider (str): "google" (googlesearch-python) or "fake" (FixtureSearch:
+            SEARCH_FIXTURES_PATH results, generated LinkedIn URLs otherwise).
+        cache (bool): Put the per-query result cache in front of Google.
+
+    Returns:
+        SearchProvider: The provider.
+
+    Raises:
+        ValueError: If the provider is unknown.
+    """
+    if provider == "fake":
+        from search.fixture import FixtureSearch
+        return FixtureSearch(SEARCH_FIXTURES_PATH or None)
+    if provider != "google":
+        raise ValueError(f"Unknown SEARCH_PROVIDER '{provider}'; use google or fake.")
+
+    from search.google import GoogleSearch
+    google = GoogleSearch()
+    if not cache:
+        return google
+    from search.cached import CachedSearch
+    return CachedSearch(google)
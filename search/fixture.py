@@ -0,0 +1,38 @@
+# search/fixture.py
+import hashlib
+import json
+import time
+
+from search.base import SearchProvider
+
+
+def fake_search_top(query):
+    """Deterministic LinkedIn-style result URLs for offline runs (SEARCH_PROVIDER=fake)."""
+    digest = hashlib.sha1(query.encode("utf-8")).hexdigest()
+    return [f"https://www.linkedin.com/in/recruiter-{digest[i:i + 6]}" for i in range(0, 30, 6)]
+
+
+class FixtureSearch(SearchProvider):
+    name = "fixture"
+
+    def __init__(self, path: str = None, latency: float = 0.0):
+        """
+        Offline stand-in for a search engine, for tests, benchmarks and fake runs.
+
+        Args:
+            path (str): Optional JSON file mapping queries to result URL lists. Queries
+                it does not list get fake_search_top() URLs.
+            latency (float): Seconds each search sleeps, to mimic a real engine.
+        """
+        self.results = {}
+        if path:
+            with open(path, "r", encoding="utf-8") as f:
+                self.results = json.load(f)
+        self.latency = latency
+
+    def search(self, query: str) -> list:
+        if self.latency:
+            time.sleep(self.latency)
+        if query in self.results:
+            return list(self.results[query])
+        return fake_search_top(query)
@@ -0,0 +1,37 @@
+# search/google.py
+import logging
+
+from config import SEARCH_NUM_RESULTS
+from search.base import SearchProvider
+
+
+class GoogleSearch(SearchProvider):
+    name = "google"
+
+    def __init__(self, num_results: int = SEARCH_NUM_RESULTS):
+        """
+        Google search through the googlesearch-python package.
+
+        Args:
+            num_results (int): Result URLs fetched per query.
+        """
+        self.num_results = num_results
+
+    def search(self, query: str) -> list:
+        """
+        Performs a Google search for the given query.
+
+        Args:
+            query (str): The search query string.
+
+        Returns:
+            list: Up to num_results result URLs. Returns an empty list if no results
+                  are found or an error occurs.
+        """
+        try:
+            # Imported here so the app starts without loading googlesearch-python
+            from googlesearch import search
+            return list(search(query, num_results=self.num_results))
+        except Exception as e:
+            logging.error(f"An error occurred during search: {e}")
+            return []
@@ -0,0 +1,65 @@
+# search/linkedin.py
+import re
+from urllib.parse import unquote, urlsplit
+
+# Profile paths: /in/<slug> and the older /pub/<slug>/<a>/<b>/<c>
+_PROFILE_PATH = re.compile(r"^/(in|pub)/([^/]+)(?:/([0-9a-z]+)/([0-9a-z]+)/([0-9a-z]+))?", re.IGNORECASE)
+
+
+def canonical_linkedin_url(url: str) -> str:
+    """
+    Canonical form of a LinkedIn profile URL.
+
+    Country subdomains (uk., de.), mobile hosts, query strings, fragments,
+    trailing path segments and letter case do not change the profile, so
+    "https://uk.linkedin.com/in/Jane-Doe/?trk=x" and
+    "http://www.linkedin.com/in/jane-doe" both map to
+    "https://www.linkedin.com/in/jane-doe".
+
+    Args:
+        url (str): A search result URL.
+
+    Returns:
+        str: The canonical profile URL, or "" if url is not a LinkedIn profile.
+    """
+    try:
+        parts = urlsplit((url or "").strip())
+    except ValueError:
+        return ""
+    host = (parts.hostname or "").lower()
+    if parts.scheme not in ("http", "https") or not (host == "linkedin.com" or host.endswith(".linkedin.com")):
+        return ""
+    match = _PROFILE_PATH.match(unquote(parts.path))
+    if match is None:
+        return ""
+    kind, slug = match.group(1).lower(), match.group(2).lower()
+    if kind == "pub" and match.group(5):
+        return f"https://www.linkedin.com/pub/{slug}/{match.group(3)}/{match.group(4)}/{match.group(5)}".lower()
+    return f"https://www.linkedin.com/{kind}/{slug}"
+
+
+def merge_profile_urls(result_lists: list, limit: int = None) -> list:
+    """
+    Merges the results of several queries into one list of distinct profiles.
+
+    Lists are interleaved (every query's first hit, then every second hit, ...)
+    so each query contributes its best results; URLs that are not LinkedIn
+    profiles are dropped.
+
+    Args:
+        result_lists (list): One list of result URLs per query.
+        limit (int): Maximum number of URLs to return; None keeps all.
+
+    Returns:
+        list: Canonical profile URLs in merged order, without duplicates.
+    """
+    merged = {}
+    depth = max((len(results) for results in result_lists), default=0)
+    for rank in range(depth):
+        for results in result_lists:
+            if rank < len(results):
+                url = canonical_linkedin_url(results[rank])
+                if url:
+                    merged.setdefault(url, None)
+    urls = list(merged)
+    return urls[:limit] if limit is not None else urls
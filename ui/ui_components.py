@@ -1,11 +1,19 @@
 import streamlit as st
 import streamlit.components.v1 as components
-import pandas as pd
 import json
-import datetime
 import os
 import logging
-EXCEL_DB_PATH = "job_application_records.xlsx"
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config import (
+    AGENT_EXECUTOR_WORKERS, DEDUPE_ENABLED, EXCEL_DB_PATH, JOB_LIST_REFRESH_SECONDS, JOB_QUEUE_DB_PATH, RECORD_DB_PATH,
+)
+from llm.factory import create_llms
+from utils.job_fingerprint import fingerprint_job
+from utils.job_queue import CANCELLED, DONE, FAILED, FINISHED_STATUSES, QUEUED, RUNNING, JobQueue
+from utils.logger import span, trace
+from utils.record_store import RecordStore, build_application_record
+
 def display_section(header: str, data: dict, level: int = 1):
     """
     Display a section with labeled fields and copy buttons.
@@ -158,53 +166,122 @@ def display_recruiter_details_streamlit_modified(heading, recruiter_data):
         st.markdown("---") # Separator for each recruiter
 
 
+# Long-lived objects are built once per process and shared by all sessions and reruns.
+# They live in this module rather than in main.py, which Streamlit executes again on every rerun.
 
-def display_application_records():
-    """Fetches and displays saved application records from a selected Excel sheet."""
+@st.cache_resource(show_spinner=False)
+def get_llms() -> tuple:
+    """Returns (main_llm, research_llm); a ValueError for missing API keys is not cached."""
+    return create_llms()
 
-    if not os.path.exists(EXCEL_DB_PATH):
-        st.info("No saved application records found yet.")
-        return
 
-    try:
-        # Load all sheet names from the Excel file
-        excel_file = pd.ExcelFile(EXCEL_DB_PATH, engine='openpyxl')
-        sheet_names = excel_file.sheet_names
+@st.cache_resource(show_spinner=False)
+def get_pipeline():
+    """Returns the shared JobPipeline; take a copy per run with JobPipeline.with_options()."""
+    from utils.pipeline import JobPipeline  # Loads the agents and their dependencies on the first Parse click
+    main_llm, research_llm = get_llms()
+    records = _get_record_store(RECORD_DB_PATH) if DEDUPE_ENABLED else None
+    return JobPipeline(groq_llm=main_llm, perplexity_llm=research_llm, records=records)
+
+
+@st.cache_resource(show_spinner=False)
+def get_agent_executor() -> ThreadPoolExecutor:
+    """Returns the thread pool that runs the agents of every session."""
+    return ThreadPoolExecutor(max_workers=AGENT_EXECUTOR_WORKERS, thread_name_prefix="agents")
+
+
+@st.cache_resource
+def _get_record_store(path: str) -> RecordStore:
+    return RecordStore(path)
+
+
+@st.cache_resource
+def _get_job_queue(path: str) -> JobQueue:
+    return JobQueue(path)
+
+
+@st.cache_data(show_spinner=False, max_entries=128)
+def _query_records(path: str, version: int, filters: dict, page: int, page_size: int) -> tuple:
+    # version is part of the cache key: any write to the store invalidates cached pages
+    return _get_record_store(path).query(**filters, page=page, page_size=page_size)
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _record_countries(path: str, version: int) -> list:
+    return _get_record_store(path).countries()
+
+
+def _record_filters_ui(countries: list) -> dict:
+    """Renders the filter widgets and returns the filters to push down to the store."""
+    with st.expander("🔎 Filters", expanded=True):
+        col1, col2, col3 = st.columns(3)
+        search = col1.text_input("Search", placeholder="title, skills, summary, messages...", key="records_search")
+        company = col2.text_input("Company", key="records_company")
+        country = col3.selectbox("Location (Country)", options=["All"] + countries, key="records_country")
 
-        if not sheet_names:
-            st.info("No sheets found in the Excel file.")
+        col4, col5, col6 = st.columns(3)
+        date_range = col4.date_input("Date Saved", value=(), key="records_dates")
+        fit_range = col5.slider("Fit Score", 0.0, 10.0, (0.0, 10.0), step=0.5, key="records_fit")
+        status = col6.selectbox("Status", options=["All", "Applied", "Not applied"], key="records_status")
+
+    filters = {}
+    if search.strip():
+        filters["search"] = search.strip()
+    if company.strip():
+        filters["company"] = company.strip()
+    if country != "All":
+        filters["country"] = country
+    if len(date_range) >= 1:
+        filters["date_from"] = date_range[0].isoformat()
+    if len(date_range) == 2:
+        filters["date_to"] = date_range[1].isoformat()
+    if fit_range != (0.0, 10.0):  # The full range also keeps records without a score
+        filters["fit_min"], filters["fit_max"] = fit_range
+    if status != "All":
+        filters["applied"] = status == "Applied"
+    return filters
+
+
+def display_application_records():
+    """Displays saved application records, filtered and paginated by the record store."""
+
+    store = _get_record_store(RECORD_DB_PATH)
+    try:
+        version = store.version()
+        if store.count() == 0:
+            st.info("No saved application records found yet.")
+            can_import = os.path.exists(EXCEL_DB_PATH) and not store.excel_imported()
+            if can_import and st.button("Import records from Excel", key="import_excel_records"):
+                count = store.import_excel(EXCEL_DB_PATH)
+                st.success(f"Imported {count} record(s) from '{EXCEL_DB_PATH}'.")
+                st.rerun()
             return
 
-        # Create a dropdown to select the sheet (country)
-        selected_sheet = st.selectbox(
-            "Select Location (Country):",
-            options=sheet_names,
-            index=0 # Default to the first sheet
-        )
+        filters = _record_filters_ui(_record_countries(RECORD_DB_PATH, version))
 
-        # Read the DataFrame from the selected sheet
-        df = pd.read_excel(EXCEL_DB_PATH, sheet_name=selected_sheet, engine='openpyxl')
+        # Start from the first page whenever the filters or the page size change
+        page_size = st.session_state.get("records_page_size", 20)
+        if st.session_state.get("records_last_filters") != (filters, page_size):
+            st.session_state.records_last_filters = (filters, page_size)
+            st.session_state.records_page = 1
+        page = st.session_state.get("records_page", 1)
+        records, total = _query_records(RECORD_DB_PATH, version, filters, page, page_size)
+        page_count = max((total + page_size - 1) // page_size, 1)
 
-        if df.empty:
-            st.info(f"No saved application records found in the '{selected_sheet}' sheet yet.")
+        if not records:
+            st.info("No application records match the current filters.")
             return
 
-        # Sort by date saved, newest first
-        # Convert 'Date Saved' to datetime objects for proper sorting if it's not already
-        df["Date Saved"] = pd.to_datetime(df["Date Saved"], errors='coerce') # 'coerce' turns invalid dates into NaT
-        df = df.sort_values(by="Date Saved", ascending=False).reset_index(drop=True)
-
-        st.subheader(f"Records for {selected_sheet}")
-
-        # Iterate and display records for the selected sheet
-        for index, row in df.iterrows():
-            job_title = row.get("Job_Title", "N/A")
-            company_name = row.get("company_name", "N/A")
-            # Format date only if it's a valid datetime object
-            date_saved = row.get("Date Saved", pd.NaT)
-            date_saved_str = date_saved.strftime("%Y-%m-%d") if pd.notna(date_saved) else "N/A"
-            location = row.get("location", "N/A")
-            job_id = row.get("job_id", "N/A")
+        first = (page - 1) * page_size + 1
+        st.subheader(f"Records {first}–{first + len(records) - 1} of {total}")
+
+        for row in records:
+            record_id = row["id"]
+            job_title = row.get("Job_Title") or "N/A"
+            company_name = row.get("company_name") or "N/A"
+            date_saved_str = row.get("Date Saved") or "N/A"
+            location = row.get("location") or "N/A"
+            job_id = row.get("job_id") or "N/A"
             is_applied = row.get("is_applied", False)
 
             header_text = (
@@ -217,40 +294,22 @@ def display_application_records():
             )
 
             with st.expander(header_text):
-                # Ensure the 'Mark as Applied' button interacts correctly with the specific sheet
                 if is_applied:
                     st.success("Application already marked as applied.")
                 else:
-                    # Use a unique key for the button based on index AND selected_sheet
-                    if st.button("Mark as Applied", key=f"apply_button_{selected_sheet}_{index}"):
-                        # Update the DataFrame in memory
-                        df.loc[index, 'is_applied'] = True
+                    if st.button("Mark as Applied", key=f"apply_button_{record_id}"):
                         try:
-                            # To update a specific sheet without affecting others, we need to
-                            # re-read all sheets, update the specific one, and then re-write the entire file.
-                            # This is crucial because `to_excel` in 'replace' mode only works on a single sheet
-                            # and doesn't preserve other sheets when not in append mode on the file.
-
-                            # Load the entire workbook again
-                            workbook_data = {sheet: pd.read_excel(EXCEL_DB_PATH, sheet_name=sheet, engine='openpyxl')
-                                             for sheet in excel_file.sheet_names}
-
-                            # Update the DataFrame for the current sheet
-                            workbook_data[selected_sheet] = df
-
-                            # Write all sheets back to the Excel file
-                            with pd.ExcelWriter(EXCEL_DB_PATH, engine='openpyxl') as writer:
-                                for sheet_name_to_write, sheet_df in workbook_data.items():
-                                    sheet_df.to_excel(writer, sheet_name=sheet_name_to_write, index=False)
-
-                            st.success("Application marked as applied. Please re-select the sheet to see the update.")
-                            st.experimental_rerun() # Rerun to reflect the change immediately
+                            store.mark_applied(record_id)
+                            st.success("Application marked as applied.")
+                            st.rerun() # Rerun to reflect the change immediately
                         except Exception as e:
                             st.error(f"❌ Error updating application record: {e}")
-                            logging.exception("Error updating Excel record:")
+                            logging.exception("Error updating application record:")
 
                 st.subheader("🎯 Job Fit Evaluation")
                 st.write(f"**Fit Score:** {row.get('fit_score', 'N/A')}/10.0")
+                if row.get("resume_id"):
+                    st.write(f"**Resume:** {row['resume_id']}")
                 st.write(f"**Matched Skills:** {row.get('fit_matched_skills', 'N/A')}")
                 st.write(f"**Missing Skills:** {row.get('fit_missing_skills', 'N/A')}")
                 st.write(f"**Summary:** {row.get('fit_summary', 'N/A')}")
@@ -263,32 +322,26 @@ def display_application_records():
                 if row.get("email_cold_subject"):
                     st.markdown("**Cold Email:**")
                     st.write(f"**Subject:** {row.get('email_cold_subject', 'N/A')}")
-                    st.text_area("Body (Cold Email)", value=row.get('email_cold_body', 'N/A'), height=150, disabled=True, key=f"cold_email_body_{selected_sheet}_{index}")
+                    st.text_area("Body (Cold Email)", value=row.get('email_cold_body', 'N/A'), height=150, disabled=True, key=f"cold_email_body_{record_id}")
 
                 if row.get("cover_letter_body"):
                     st.markdown("**Cover Letter:**")
-                    st.text_area("Body (Cover Letter)", value=row.get('cover_letter_body', 'N/A'), height=300, disabled=True, key=f"cover_letter_body_{selected_sheet}_{index}")
+                    st.text_area("Body (Cover Letter)", value=row.get('cover_letter_body', 'N/A'), height=300, disabled=True, key=f"cover_letter_body_{record_id}")
 
                 if row.get("linkedin_message_recruiter"):
                     st.markdown("**LinkedIn Message (Recruiter):**")
-                    st.text_area("Body (Recruiter)", value=row.get('linkedin_message_recruiter', 'N/A'), height=100, disabled=True, key=f"linkedin_recruiter_{selected_sheet}_{index}")
+                    st.text_area("Body (Recruiter)", value=row.get('linkedin_message_recruiter', 'N/A'), height=100, disabled=True, key=f"linkedin_recruiter_{record_id}")
 
                 if row.get("linkedin_message_referrer"):
                     st.markdown("**LinkedIn Message (Referrer):**")
-                    st.text_area("Body (Referrer)", value=row.get('linkedin_message_referrer', 'N/A'), height=100, disabled=True, key=f"linkedin_referrer_{selected_sheet}_{index}")
+                    st.text_area("Body (Referrer)", value=row.get('linkedin_message_referrer', 'N/A'), height=100, disabled=True, key=f"linkedin_referrer_{record_id}")
 
                 # Optionally display recruiter URLs and organization data
                 recruiter_urls = []
                 try:
-                    # Ensure it tries to load from a string, not a float if 'N/A' or similar is passed
-                    recruiter_data_raw = row.get("recruiter_linkedin_urls", "[]")
-                    if isinstance(recruiter_data_raw, str):
-                        recruiter_urls = json.loads(recruiter_data_raw)
-                    else: # Handle cases where it might be NaN or other non-string types
-                        recruiter_urls = []
+                    recruiter_urls = json.loads(row.get("recruiter_linkedin_urls") or "[]")
                 except json.JSONDecodeError:
-                    logging.warning(f"JSON Decode Error for recruiter_linkedin_urls at index {index}: {recruiter_data_raw}")
-                    pass # Handle cases where it might not be valid JSON
+                    logging.warning(f"JSON Decode Error for recruiter_linkedin_urls of record {record_id}")
 
                 if recruiter_urls:
                     st.markdown("---")
@@ -306,81 +359,207 @@ def display_application_records():
                     st.write(f"**Avg. SE Salary:** {row.get('org_avg_salary_se', 'N/A')}")
                     st.write(f"**Recent Layoffs:** {row.get('org_recent_layoffs', 'N/A')}")
 
-    except FileNotFoundError:
-        st.error(f"❌ Error: The Excel file '{EXCEL_DB_PATH}' was not found.")
-    except PermissionError:
-        st.error(f"❌ Permission denied. Please close the Excel file '{EXCEL_DB_PATH}' if it's open.")
+        # Pagination controls
+        col_prev, col_page, col_size, col_next = st.columns([1, 2, 2, 1])
+        if col_prev.button("◀ Previous", disabled=page <= 1, key="records_prev"):
+            st.session_state.records_page = page - 1
+            st.rerun()
+        col_page.markdown(f"Page **{page}** of **{page_count}**")
+        col_size.selectbox("Per page", options=[10, 20, 50, 100], index=1, key="records_page_size", label_visibility="collapsed")
+        if col_next.button("Next ▶", disabled=page >= page_count, key="records_next"):
+            st.session_state.records_page = page + 1
+            st.rerun()
+
     except Exception as e:
         st.error(f"❌ An unexpected error occurred while loading records: {e}")
-        logging.exception("Error reading Excel DB for display:")
-
-def save_application_record(job_info, fit_eval, email_gen, org_eval, recruiter_data):
-    """Saves all extracted and generated data to an Excel sheet."""
-    record = {
-        "Date Saved": datetime.date.today().isoformat(),
-        "Job_Title": job_info.get("Job_Title", ""),
-        "job_id": job_info.get("job_id", ""),
-        "company_name": job_info.get("company_name", ""),
-        "location": job_info.get("location", ""),
-        "location_country": job_info.get("location_country", ""),
-        "job_url": job_info.get("job_url", ""),
-        "fit_score": fit_eval.get("fit_score", None),
-        "fit_matched_skills": ", ".join(fit_eval.get("matched_skills", [])),
-        "fit_missing_skills": ", ".join(fit_eval.get("missing_skills", [])),
-        "fit_summary": fit_eval.get("summary", ""),
-        "email_cold_subject": email_gen.get("cold email", {}).get("subject", ""),
-        "email_cold_body": email_gen.get("cold email", {}).get("body", ""),
-        "cover_letter_body": email_gen.get("cover letter", {}).get("body", ""),
-        "linkedin_message_recruiter": email_gen.get("linkdin_networking_message_recruiter", {}).get("body", ""),
-        "linkedin_message_referrer": email_gen.get("linkdin_networking_message_referrer", {}).get("body", ""),
-        "org_company_name": org_eval.get("company_research_report", {}).get("company_name", ""),
-        "org_company_location": org_eval.get("company_research_report", {}).get("company_location", ""),
-        "org_company_size": org_eval.get("company_research_report", {}).get("company_size", ""),
-        "org_avg_salary_se": org_eval.get("company_research_report", {}).get("company_average_salary_software_engineer", ""),
-        "org_recent_layoffs": org_eval.get("company_research_report", {}).get("recent_layoffs", ""),
-        "recruiter_linkedin_urls": json.dumps(recruiter_data) if recruiter_data else "[]", # Store as JSON string
-        "is_applied": False,  # Default to False, can be updated later
-        # You can add more fields from JOB_INFO_SCHEMA, ORG_EVALUATER_SCHEMA if needed
-    }
-    print("Record to be saved:", record) # For debugging
-
-    new_record_df = pd.DataFrame([record])
-    print("DataFrame for new record:\n", new_record_df) # For debugging
-
-    # Determine the sheet name, using 'Other' as a fallback if country is not available
-    sheet_name = job_info.get("location_country", "Other")
-    if not sheet_name: # Handle cases where location_country might be an empty string
-        sheet_name = "Other"
+        logging.exception("Error reading record store for display:")
+
+def save_application_record(job_info, fit_eval, email_gen, org_eval, recruiter_data, job_text: str = "",
+                            resume_id: str = None) -> tuple:
+    """
+    Saves all extracted and generated data to the record store, unless the posting is already saved.
+
+    Args:
+        job_text (str): The posting text, fingerprinted to recognize reposts.
+        resume_id (str): The resume variant the fit evaluation and messages were written for.
+
+    Returns:
+        tuple: (record id, True if a new record was written); (None, False) if the save failed.
+    """
+    record = build_application_record(job_info, fit_eval, email_gen, org_eval, recruiter_data, resume_id)
+    fingerprint = fingerprint_job(job_text, job_info=job_info)
 
     try:
-        if os.path.exists(EXCEL_DB_PATH):
-            # Read existing sheets to maintain their content
-            with pd.ExcelWriter(EXCEL_DB_PATH, engine='openpyxl', mode='a', if_sheet_exists='replace') as writer:
-                # Iterate through existing sheets to preserve them
-                excel_file = pd.ExcelFile(EXCEL_DB_PATH, engine='openpyxl')
-                for existing_sheet in excel_file.sheet_names:
-                    if existing_sheet != sheet_name: # Don't re-write the target sheet yet
-                        existing_df = pd.read_excel(EXCEL_DB_PATH, sheet_name=existing_sheet, engine='openpyxl')
-                        existing_df.to_excel(writer, sheet_name=existing_sheet, index=False)
-
-                # Now handle the target sheet
-                if sheet_name in excel_file.sheet_names:
-                    existing_data_for_sheet = pd.read_excel(EXCEL_DB_PATH, sheet_name=sheet_name, engine='openpyxl')
-                    combined_df = pd.concat([existing_data_for_sheet, new_record_df], ignore_index=True)
-                    combined_df.to_excel(writer, sheet_name=sheet_name, index=False)
-                else:
-                    new_record_df.to_excel(writer, sheet_name=sheet_name, index=False)
-        else:
-            # If the file doesn't exist, create it with the new record
-            with pd.ExcelWriter(EXCEL_DB_PATH, engine='openpyxl') as writer:
-                new_record_df.to_excel(writer, sheet_name=sheet_name, index=False)
-        print(f"Record successfully saved to {EXCEL_DB_PATH} in sheet '{sheet_name}'.")
-
-    except FileNotFoundError:
-        print(f"Error: The Excel file '{EXCEL_DB_PATH}' was not found.")
-    except PermissionError:
-        print(f"Error: Permission denied. Please close the Excel file '{EXCEL_DB_PATH}' if it's open.")
+        with trace("save_record"), span("save", records=1) as save_span:
+            store = _get_record_store(RECORD_DB_PATH)
+            match = store.find_duplicate(fingerprint) if DEDUPE_ENABLED else None
+            if match is not None:
+                save_span.set(duplicates=1)
+                logging.info(f"Not saved: the posting is already saved as record {match['record_id']}.")
+                return match["record_id"], False
+            record_id = store.append(record, fingerprint)
+        logging.info(f"Record {record_id} saved to {RECORD_DB_PATH}.")
+        return record_id, True
     except Exception as e:
-        print(f"An unexpected error occurred: {e}")
+        logging.error(f"An unexpected error occurred: {e}")
+        return None, False
+
+
+def display_duplicate_record(record: dict, reason: str):
+    """
+    Shows the saved record of a posting that was recognized as a duplicate.
+
+    Args:
+        record (dict): The saved record (None if it was deleted meanwhile).
+        reason (str): Why the posting counts as a duplicate.
+    """
+    if not record:
+        st.warning(f"♻️ This posting matches a record that no longer exists ({reason}). Please try again.")
+        return
+    st.info(f"♻️ Already saved on {record.get('Date Saved')} as record #{record.get('id')} ({reason}). "
+            "The agents were not run again.")
+    with st.container(border=True):
+        st.subheader(f"💼 {record.get('Job_Title') or 'Untitled role'} — {record.get('company_name') or 'Unknown company'}")
+        if record.get("location"):
+            st.write(f"**Location:** {record['location']}")
+        if record.get("job_url"):
+            st.write(f"**Job URL:** {record['job_url']}")
+        if record.get("fit_score") is not None:
+            st.metric(label="Fit Score", value=f"{record['fit_score']}/10.0")
+        if record.get("fit_summary"):
+            st.write(f"**Summary:** {record['fit_summary']}")
+        st.write(f"**Applied:** {'Yes' if record.get('is_applied') else 'No'}")
+        st.caption("The full record, with the generated messages, is in the Records tab.")
+
+
+def submit_background_job(job_input: str, options: dict) -> tuple:
+    """
+    Queues a posting for the worker processes (worker.py).
+
+    Args:
+        job_input (str): A job URL or the job listing text.
+        options (dict): Run options: triage, fused and compare (all resume variants).
+
+    Returns:
+        tuple: (job id, number of workers currently running).
+    """
+    queue = _get_job_queue(JOB_QUEUE_DB_PATH)
+    return queue.submit(job_input, options), queue.active_workers()
+
+
+JOB_STATUS_ICONS = {QUEUED: "⏳", RUNNING: "⚙️", DONE: "✅", FAILED: "❌", CANCELLED: "🚫"}
+
+
+def _load_job(on_load, job_id: int):
+    job = _get_job_queue(JOB_QUEUE_DB_PATH).get(job_id)
+    if job is not None:
+        on_load(job)
+
+
+@st.fragment(run_every=JOB_LIST_REFRESH_SECONDS)
+def display_job_queue(on_load):
+    """
+    Lists background jobs with their live status; refreshes on its own while shown.
 
+    Args:
+        on_load (callable): Called with a finished job, including its result, when the user loads it.
+    """
+    queue = _get_job_queue(JOB_QUEUE_DB_PATH)
+    counts = queue.counts()
+    workers = queue.active_workers()
+    col1, col2, col3, col4, col5 = st.columns(5)
+    col1.metric("Queued", counts.get(QUEUED, 0))
+    col2.metric("Running", counts.get(RUNNING, 0))
+    col3.metric("Done", counts.get(DONE, 0))
+    col4.metric("Failed", counts.get(FAILED, 0))
+    col5.metric("Workers", workers)
+    if not workers and (counts.get(QUEUED) or counts.get(RUNNING)):
+        st.warning("⚠️ No worker is running. Start one with `python worker.py` to process queued jobs.")
+
+    jobs = queue.list_jobs()
+    if not jobs:
+        st.info("No background jobs yet. Use \"Run in Background\" on the Parse Job tab to queue a posting.")
+        return
+    for job in jobs:
+        with st.container(border=True):
+            col1, col2 = st.columns([5, 1])
+            col1.markdown(f"{JOB_STATUS_ICONS.get(job['status'], '')} **#{job['id']}** {job['label']}")
+            details = [job["status"].title(), f"submitted {time.strftime('%H:%M:%S', time.localtime(job['submitted_at']))}"]
+            if job["started_at"] is not None:
+                details.append(f"{(job['finished_at'] or time.time()) - job['started_at']:.1f}s")
+            if job["attempts"] > 1:
+                details.append(f"attempt {job['attempts']}")
+            col1.caption(" · ".join(details))
+            if job["status"] == RUNNING and job["progress"]:
+                col1.caption(" · ".join(f"{agent}: {status}" for agent, status in job["progress"].items()))
+            if job["status"] == FAILED and job["error"]:
+                col1.caption(f"Error: {job['error']}")
+
+            if job["status"] == DONE:
+                # The callback fills the session before the app reruns; the rerun shows it on the Parse Job tab
+                if col2.button("📂 Load", key=f"job_load_{job['id']}", on_click=_load_job, args=(on_load, job["id"])):
+                    st.rerun()
+            elif job["status"] == QUEUED:
+                if col2.button("Cancel", key=f"job_cancel_{job['id']}"):
+                    queue.cancel(job["id"])
+                    st.rerun(scope="fragment")
+            if job["status"] in FINISHED_STATUSES:
+                if col2.button("Remove", key=f"job_remove_{job['id']}"):
+                    queue.delete(job["id"])
+                    st.rerun(scope="fragment")
+
+
+def display_run_diagnostics(spans: list):
+    """
+    Shows where the time of a traced run went: a waterfall of its spans plus
+    token, cost, retry, cache and prompt compaction totals.
 
+    Args:
+        spans (list): Span dicts of one trace (Trace.to_dicts()), root first.
+    """
+    import altair as alt
+    import pandas as pd
+
+    if not spans:
+        st.info("No diagnostics recorded for this run.")
+        return
+    root = spans[0]
+    totals = root["attrs"]
+    col1, col2, col3, col4, col5, col6 = st.columns(6)
+    col1.metric("Wall time", f"{root['duration_ms'] / 1000:.2f}s")
+    col2.metric("Tokens", f"{totals.get('prompt_tokens', 0) + totals.get('completion_tokens', 0):,}")
+    col3.metric("Est. cost", f"${totals.get('cost_usd', 0):.4f}")
+    col4.metric("Retries", totals.get("retries", 0))
+    col5.metric("Cache hits", totals.get("cache_hits", 0))
+    col6.metric("Tokens saved", f"~{totals.get('tokens_saved', 0):,}")
+
+    depth = {root["span_id"]: 0}
+    rows = []
+    for s in spans[1:]:
+        depth[s["span_id"]] = depth.get(s["parent_id"], 0) + 1
+        offset = (s["start"] - root["start"]) * 1000
+        attrs = s["attrs"]
+        rows.append({
+            "order": len(rows),
+            "span": "  " * (depth[s["span_id"]] - 1) + s["name"],
+            "start_ms": round(offset, 1),
+            "end_ms": round(offset + s["duration_ms"], 1),
+            "duration_ms": round(s["duration_ms"], 1),
+            "status": s["status"] if not attrs.get("skipped") else "skipped",
+            "tokens": attrs.get("prompt_tokens", 0) + attrs.get("completion_tokens", 0),
+            "tokens_saved": attrs.get("tokens_saved", 0),
+            "cost_usd": round(attrs.get("cost_usd", 0.0), 6),
+            "retries": attrs.get("retries", 0),
+            "cache": attrs.get("cache", ""),
+        })
+    df = pd.DataFrame(rows)
+    chart = alt.Chart(df).mark_bar().encode(
+        x=alt.X("start_ms:Q", title="ms since start"),
+        x2="end_ms:Q",
+        y=alt.Y("span:N", sort=alt.SortField("order"), title=None),
+        color=alt.Color("status:N", scale=alt.Scale(domain=["ok", "skipped", "error"],
+                                                    range=["#4A90E2", "#9E9E9E", "#E2574A"])),
+        tooltip=["span", "duration_ms", "tokens", "tokens_saved", "cost_usd", "retries", "cache", "status"],
+    ).properties(height=max(120, 22 * len(df)))
+    st.altair_chart(chart, use_container_width=True)
+    st.dataframe(df.drop(columns=["order"]), hide_index=True, use_container_width=True)
@@ -0,0 +1,71 @@
+# utils/company_cache.py
+"""
+Company-level caches for OrgEvaluatorAgent and GetRecruiterAgent.
+
+Both agents depend only on (company_name, location_country), so results are
+stored under a normalized company key: "Google LLC", "Google" and "google"
+share one entry. Company reports and recruiter URL lists have separate
+freshness windows.
+"""
+import re
+import unicodedata
+
+from config import COMPANY_REPORT_TTL_SECONDS, RECRUITER_URLS_TTL_SECONDS
+from utils.disk_cache import DiskCache
+
+# Legal-form tokens dropped from the end of company names
+LEGAL_SUFFIXES = {
+    "llc", "inc", "incorporated", "ltd", "limited", "corp", "corporation", "co", "company",
+    "plc", "gmbh", "ag", "sa", "sas", "srl", "bv", "nv", "llp", "lp", "pte", "pty", "pvt",
+    "private", "oy", "ab", "as", "kk", "spa", "holdings", "group",
+}
+
+COUNTRY_ALIASES = {
+    "us": "united states", "usa": "united states", "united states of america": "united states",
+    "uk": "united kingdom", "great britain": "united kingdom", "england": "united kingdom",
+    "uae": "united arab emirates", "in": "india", "bharat": "india",
+}
+
+company_reports = DiskCache("company_reports", ttl=COMPANY_REPORT_TTL_SECONDS)
+recruiter_urls = DiskCache("recruiter_urls", ttl=RECRUITER_URLS_TTL_SECONDS)
+
+
+def _clean(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text or "").encode("ascii", "ignore").decode("ascii")
+    # Drop dots first so abbreviations such as "S.A." or "Inc." collapse to one token
+    text = text.lower().replace(".", "").replace("&", " and ")
+    return re.sub(r"[^a-z0-9]+", " ", text).strip()
+
+
+def normalize_company_name(company_name: str) -> str:
+    """
+    Lowercases, strips punctuation and trailing legal forms from a company name.
+
+    Args:
+        company_name (str): Company name as extracted from a posting.
+
+    Returns:
+        str: The normalized name, e.g. "Google LLC" -> "google".
+    """
+    tokens = _clean(company_name).split()
+    while len(tokens) > 1 and tokens[-1] in LEGAL_SUFFIXES:
+        tokens.pop()
+    return " ".join(tokens)
+
+
+def normalize_country(country: str) -> str:
+    country = _clean(country)
+    return COUNTRY_ALIASES.get(country, country)
+
+
+def company_key(company_name: str, country: str) -> str:
+    """
+    Cache key shared by every posting of one employer in one country.
+
+    Returns:
+        str: "<normalized company>|<normalized country>", or "" when the company is unknown.
+    """
+    name = normalize_company_name(company_name)
+    if not name:
+        return ""
+    return f"{name}|{normalize_country(country)}"
@@ -0,0 +1,159 @@
+# utils/disk_cache.py
+"""
+Small persistent key/value cache on SQLite.
+
+Entries live in one table partitioned by namespace, carry an optional expiry,
+and are evicted least-recently-used first once a namespace exceeds its entry
+or byte budget. WAL mode plus a busy timeout make the cache safe to share
+between processes (the Streamlit app, batch runs, workers).
+"""
+import json
+import sqlite3
+import time
+
+from config import CACHE_DB_PATH
+from utils.sqlite_db import ThreadLocalConnection
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    expires_at REAL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS idx_cache_lru ON cache_entries (namespace, accessed_at);
+CREATE TABLE IF NOT EXISTS cache_stats (
+    namespace TEXT PRIMARY KEY,
+    hits INTEGER NOT NULL DEFAULT 0,
+    misses INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+_MISSING = object()
+
+
+class DiskCache:
+    def __init__(self, namespace: str, ttl: float = None, max_entries: int = None,
+                 max_bytes: int = None, path: str = CACHE_DB_PATH):
+        """
+        Args:
+            namespace (str): Partition of the cache file used by this instance.
+            ttl (float): Default lifetime of an entry in seconds; None never expires.
+            max_entries (int): Evict LRU entries beyond this many; None is unbounded.
+            max_bytes (int): Evict LRU entries beyond this many stored bytes; None is unbounded.
+            path (str): Path of the SQLite file.
+        """
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.path = path
+        self._db = ThreadLocalConnection(path, _SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        return self._db.get()
+
+    def _count(self, column: str):
+        self._conn().execute(
+            f"INSERT INTO cache_stats (namespace, {column}) VALUES (?, 1) "
+            f"ON CONFLICT(namespace) DO UPDATE SET {column} = {column} + 1",
+            (self.namespace,),
+        )
+
+    def get(self, key: str, default=None):
+        """Returns the cached value for key, or default if it is missing or expired."""
+        conn = self._conn()
+        now = time.time()
+        row = conn.execute(
+            "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+            (self.namespace, key),
+        ).fetchone()
+        if row is None or (row[1] is not None and row[1] <= now):
+            if row is not None:
+                conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, key))
+            self._count("misses")
+            return default
+        conn.execute(
+            "UPDATE cache_entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+            (now, self.namespace, key),
+        )
+        self._count("hits")
+        return json.loads(row[0])
+
+    def set(self, key: str, value, ttl: float = _MISSING):
+        """
+        Stores a JSON-serializable value.
+
+        Args:
+            key (str): Cache key.
+            value: The value to store.
+            ttl (float): Lifetime in seconds for this entry; defaults to the cache's ttl.
+        """
+        ttl = self.ttl if ttl is _MISSING else ttl
+        payload = json.dumps(value)
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache_entries (namespace, key, value, size, created_at, accessed_at, expires_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (self.namespace, key, payload, len(payload), now, now, now + ttl if ttl is not None else None),
+        )
+        self._evict()
+
+    def delete(self, key: str):
+        self._conn().execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, key))
+
+    def clear(self):
+        conn = self._conn()
+        conn.execute("DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,))
+        conn.execute("DELETE FROM cache_stats WHERE namespace = ?", (self.namespace,))
+
+    def _evict(self):
+        if self.max_entries is None and self.max_bytes is None:
+            return
+        conn = self._conn()
+        count, total = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries WHERE namespace = ?",
+            (self.namespace,),
+        ).fetchone()
+        over_entries = count - self.max_entries if self.max_entries is not None else 0
+        over_bytes = total - self.max_bytes if self.max_bytes is not None else 0
+        if over_entries <= 0 and over_bytes <= 0:
+            return
+
+        # Walk entries from least to most recently used until both budgets are met
+        victims = []
+        for key, size in conn.execute(
+            "SELECT key, size FROM cache_entries WHERE namespace = ? ORDER BY accessed_at",
+            (self.namespace,),
+        ):
+            if over_entries <= 0 and over_bytes <= 0:
+                break
+            victims.append((self.namespace, key))
+            over_entries -= 1
+            over_bytes -= size
+        conn.executemany("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", victims)
+
+    def stats(self) -> dict:
+        """Returns hit/miss counters (shared across processes) and the current size."""
+        conn = self._conn()
+        hits, misses = conn.execute(
+            "SELECT hits, misses FROM cache_stats WHERE namespace = ?", (self.namespace,)
+        ).fetchone() or (0, 0)
+        entries, size = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries WHERE namespace = ?",
+            (self.namespace,),
+        ).fetchone()
+        lookups = hits + misses
+        return {
+            "namespace": self.namespace,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "entries": entries,
+            "bytes": size,
+        }
@@ -0,0 +1,195 @@
+# utils/fetcher.py
+"""
+Job page fetcher.
+
+- one shared keep-alive requests.Session with a connection pool and retries
+- an on-disk HTTP cache that revalidates with ETag / Last-Modified, so a known
+  posting costs a single 304
+- lxml as the BeautifulSoup backend when it is installed
+- main-content extraction: JSON-LD JobPosting data when the page has it,
+  otherwise the densest content block with navigation, footers, cookie
+  banners and scripts removed
+"""
+import importlib.util
+import json
+import logging
+import re
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import FETCH_CACHE_MAX_ENTRIES, FETCH_CONNECT_TIMEOUT, FETCH_READ_TIMEOUT
+from utils.disk_cache import DiskCache
+from utils.logger import record_cache_hit, set_attrs
+
+HTML_PARSER = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+
+USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/124.0 Safari/537.36"
+)
+
+# Elements that never hold the posting itself
+BOILERPLATE_TAGS = ["script", "style", "noscript", "template", "svg", "iframe", "nav", "footer",
+                    "header", "aside", "form", "button", "select", "dialog"]
+BOILERPLATE_ATTR_RE = re.compile(
+    r"cookie|consent|gdpr|banner|newsletter|subscribe|social|share|breadcrumb|navbar|menu|"
+    r"footer|sidebar|related|recommend|advert|promo|modal|popup|signin|login",
+    re.IGNORECASE,
+)
+CONTENT_ATTR_RE = re.compile(r"job|posting|description|vacancy|career|content|main|detail", re.IGNORECASE)
+
+page_cache = DiskCache("http_pages", max_entries=FETCH_CACHE_MAX_ENTRIES)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Returns the process-wide keep-alive session, creating it on first use."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            retry = Retry(total=2, backoff_factor=0.5, status_forcelist=(502, 503, 504), allowed_methods=("GET",))
+            adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retry)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update({"User-Agent": USER_AGENT, "Accept-Language": "en;q=0.9"})
+            _session = session
+    return _session
+
+
+def _json_ld_job_posting(soup) -> str:
+    # Most job boards embed the posting as schema.org JobPosting structured data
+    for script in soup.find_all("script", type="application/ld+json"):
+        try:
+            data = json.loads(script.string or "")
+        except (json.JSONDecodeError, TypeError):
+            continue
+        candidates = data if isinstance(data, list) else data.get("@graph", [data]) if isinstance(data, dict) else []
+        for item in candidates:
+            if not isinstance(item, dict) or "JobPosting" not in str(item.get("@type", "")):
+                continue
+            description = _soup(item.get("description", "")).get_text("\n", strip=True)
+            if not description:
+                continue
+            org = item.get("hiringOrganization") or {}
+            location = item.get("jobLocation") or {}
+            if isinstance(location, list):
+                location = location[0] if location else {}
+            address = location.get("address", {}) if isinstance(location, dict) else {}
+            header = [
+                item.get("title", ""),
+                org.get("name", "") if isinstance(org, dict) else str(org),
+                ", ".join(str(address.get(k, "")) for k in ("addressLocality", "addressRegion", "addressCountry")
+                          if isinstance(address, dict) and address.get(k)),
+                f"Employment type: {item['employmentType']}" if item.get("employmentType") else "",
+                f"Posted: {item['datePosted']}" if item.get("datePosted") else "",
+            ]
+            return "\n".join([line for line in header if line] + [description])
+    return ""
+
+
+def _clean_lines(text: str) -> str:
+    seen = set()
+    lines = []
+    for line in text.splitlines():
+        line = re.sub(r"\s+", " ", line).strip()
+        if not line or line in seen:
+            continue
+        seen.add(line)
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def _soup(html: str):
+    # bs4 is only imported when a page is actually parsed
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(html, HTML_PARSER)
+
+
+def extract_main_text(html: str) -> str:
+    """
+    Extracts the readable posting text from an HTML page, without boilerplate.
+
+    Args:
+        html (str): The page HTML.
+
+    Returns:
+        str: Newline-separated text of the main content, with duplicate lines removed.
+    """
+    soup = _soup(html)
+    structured = _json_ld_job_posting(soup)
+
+    for tag in soup(BOILERPLATE_TAGS):
+        tag.decompose()
+    for tag in soup.find_all(attrs={"class": BOILERPLATE_ATTR_RE}) + soup.find_all(id=BOILERPLATE_ATTR_RE):
+        if not tag.decomposed and tag.name not in ("body", "html", "main", "article"):
+            tag.decompose()
+
+    body = soup.body or soup
+    candidates = body.find_all(["main", "article"]) + body.find_all(attrs={"role": "main"})
+    candidates += body.find_all(["div", "section"], attrs={"class": CONTENT_ATTR_RE})
+    candidates += body.find_all(["div", "section"], id=CONTENT_ATTR_RE)
+    body_len = len(body.get_text(" ", strip=True))
+    best, best_len = body, body_len
+    for candidate in candidates:
+        length = len(candidate.get_text(" ", strip=True))
+        # Prefer the smallest block that still holds most of the remaining text
+        if 0.6 * body_len <= length < best_len:
+            best, best_len = candidate, length
+    text = _clean_lines(best.get_text("\n", strip=True))
+
+    if structured and len(structured) >= 0.5 * len(text):
+        return _clean_lines(structured)
+    return text
+
+
+def fetch_job_text(url: str, use_cache: bool = True) -> str:
+    """
+    Fetches a job page and returns its main text.
+
+    Cached pages are revalidated with If-None-Match / If-Modified-Since; on a
+    304 the stored text is returned without downloading or parsing the page.
+
+    Args:
+        url (str): The job posting URL.
+        use_cache (bool): Use and update the on-disk HTTP cache.
+
+    Returns:
+        str: The extracted posting text.
+    """
+    cached = page_cache.get(url) if use_cache else None
+    headers = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    resp = get_session().get(url, headers=headers, timeout=(FETCH_CONNECT_TIMEOUT, FETCH_READ_TIMEOUT))
+    if resp.status_code == 304 and cached:
+        logging.info(f"Job page not modified, using cached text: {url}")
+        record_cache_hit("http_pages")
+        return cached["text"]
+    resp.raise_for_status()
+    set_attrs(http_status=resp.status_code, html_bytes=len(resp.content))
+
+    text = extract_main_text(resp.text)
+    logging.info(f"Fetched {url}: {len(resp.text)} bytes of HTML -> {len(text)} chars of text")
+    if use_cache:
+        if resp.headers.get("ETag") or resp.headers.get("Last-Modified"):
+            page_cache.set(url, {
+                "etag": resp.headers.get("ETag"),
+                "last_modified": resp.headers.get("Last-Modified"),
+                "fetched_at": time.time(),
+                "text": text,
+            })
+        elif cached:
+            # The page can no longer be revalidated; its old validators must not serve stale text
+            page_cache.delete(url)
+    return text
@@ -0,0 +1,176 @@
+# utils/fit_prescorer.py
+"""
+Local, deterministic fit pre-scorer.
+
+Compares the resume's technical_skills with the job's Skills,
+Additional_Info.Tech_Stack and Requirements without calling an LLM. Skill
+names are canonicalized through a synonym table, then matched with
+character n-gram TF-IDF vectors: one matrix product gives the cosine
+similarity of every job skill against every resume skill, so near-misses
+such as "react.js" / "react" or "aws lambda" / "lambda" still match.
+Scores (1-10) fall on the same 0-10 scale as FitEvaluatorAgent and take a few
+milliseconds, which makes them suitable for triage before the LLM agents run.
+"""
+import re
+import time
+
+import numpy as np
+
+from utils.resume_service import ResumeProfile, normalize_skill
+
+# canonical name -> aliases
+SKILL_SYNONYMS = {
+    "javascript": ["js", "ecmascript", "es6", "es6+"],
+    "typescript": ["ts"],
+    "python": ["python3", "py"],
+    "golang": ["go"],
+    "c#": ["csharp", "c sharp"],
+    "c++": ["cpp"],
+    "node.js": ["node", "nodejs", "node js"],
+    "react": ["react.js", "reactjs", "react js"],
+    "next.js": ["nextjs", "next"],
+    "nest.js": ["nestjs", "nest"],
+    "vue": ["vue.js", "vuejs"],
+    "angular": ["angularjs", "angular.js"],
+    "aws": ["amazon web services"],
+    "gcp": ["google cloud", "google cloud platform"],
+    "azure": ["microsoft azure"],
+    "kubernetes": ["k8s"],
+    "postgresql": ["postgres", "psql"],
+    "mssql": ["sql server", "microsoft sql server", "ms sql"],
+    "mongodb": ["mongo"],
+    "ci/cd": ["cicd", "ci", "cd", "continuous integration", "continuous delivery", "continuous deployment"],
+    "machine learning": ["ml"],
+    "deep learning": ["dl"],
+    "generative ai": ["genai", "gen ai"],
+    "llm": ["llms", "large language models", "large language model", "llm integration"],
+    "rag": ["retrieval augmented generation", "retrieval-augmented generation"],
+    "nlp": ["natural language processing"],
+    "embeddings": ["embedding", "vector embeddings"],
+    "vector databases": ["vector database", "vector db", "vector store"],
+    "hugging face": ["huggingface", "transformers"],
+    "rest": ["rest api", "rest apis", "restful", "restful apis"],
+    "html": ["html5"],
+    "css": ["css3"],
+    "linux": ["unix"],
+}
+_ALIASES = {alias: canonical for canonical, aliases in SKILL_SYNONYMS.items() for alias in aliases}
+
+NGRAM = 3
+MATCH_THRESHOLD = 0.75
+# Explicit skill lists weigh more than skills only mentioned in the requirements text
+FIELD_WEIGHTS = {"Skills": 1.0, "Tech_Stack": 1.0, "Requirements": 0.5}
+# Aliases that are also ordinary words; they only count in the explicit skill lists
+FREE_TEXT_STOPWORDS = {"go", "next", "nest", "node", "ci", "cd", "ts", "dl", "rest", "c", "r", "ai", "py"}
+
+
+def canonical_skill(skill: str) -> str:
+    """Maps a normalized skill name to its canonical synonym-table name."""
+    return _ALIASES.get(skill, skill)
+
+
+def _skill_terms(entries) -> list:
+    terms = []
+    for entry in entries if isinstance(entries, list) else [entries]:
+        if entry:
+            terms.extend(canonical_skill(s) for s in normalize_skill(str(entry)))
+    return terms
+
+
+def _requirement_terms(text: str, vocabulary: set) -> list:
+    # Free text: keep the 1-3 word phrases that name a known skill
+    words = re.findall(r"[a-z0-9+#.]+(?:/[a-z0-9+#.]+)?", text.lower())
+    words = [w.rstrip(".") for w in words]
+    found = []
+    for size in (3, 2, 1):
+        for i in range(len(words) - size + 1):
+            phrase = " ".join(words[i:i + size])
+            if phrase in FREE_TEXT_STOPWORDS:
+                continue
+            term = canonical_skill(phrase)
+            if term in vocabulary:
+                found.append(term)
+    return found
+
+
+def _ngram_matrix(terms: list, vocab: dict) -> np.ndarray:
+    matrix = np.zeros((len(terms), len(vocab)), dtype=np.float32)
+    for row, term in enumerate(terms):
+        padded = f" {term} "
+        for i in range(max(len(padded) - NGRAM + 1, 1)):
+            col = vocab.get(padded[i:i + NGRAM])
+            if col is not None:
+                matrix[row, col] += 1.0
+    return matrix
+
+
+def _ngrams(term: str):
+    padded = f" {term} "
+    return {padded[i:i + NGRAM] for i in range(max(len(padded) - NGRAM + 1, 1))}
+
+
+def prescore_fit(resume, job_info: dict) -> dict:
+    """
+    Scores how well the resume skills cover the job's skills.
+
+    Args:
+        resume (ResumeProfile): The compiled resume (its normalized skill set is used); a plain dict also works.
+        job_info (dict): Output of JobInfoExtractor.
+
+    Returns:
+        dict: fit_score (1.0-10.0), matched_skills, missing_skills and elapsed_ms. fit_score
+            is None when the job or the resume names no skills, so there is nothing to compare.
+    """
+    started = time.perf_counter()
+    if not isinstance(resume, ResumeProfile):
+        resume = ResumeProfile(resume)
+    resume_terms = sorted({canonical_skill(s) for s in resume.skills})
+
+    weights = {}
+    for field, entries in (
+        ("Skills", job_info.get("Skills") or []),
+        ("Tech_Stack", (job_info.get("Additional_Info") or {}).get("Tech_Stack") or []),
+    ):
+        for term in _skill_terms(entries):
+            weights[term] = weights.get(term, 0.0) + FIELD_WEIGHTS[field]
+    vocabulary = set(weights) | set(resume_terms) | set(SKILL_SYNONYMS)
+    for term in _requirement_terms(str(job_info.get("Requirements") or ""), vocabulary):
+        weights[term] = weights.get(term, 0.0) + FIELD_WEIGHTS["Requirements"]
+
+    job_terms = sorted(weights)
+    if not job_terms or not resume_terms:
+        return {"fit_score": None, "matched_skills": [], "missing_skills": job_terms,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 2)}
+
+    # TF-IDF over character n-grams, with every skill name as one document
+    vocab = {}
+    doc_freq = []
+    for term in job_terms + resume_terms:
+        for gram in _ngrams(term):
+            if gram not in vocab:
+                vocab[gram] = len(vocab)
+                doc_freq.append(0)
+            doc_freq[vocab[gram]] += 1
+    n_docs = len(job_terms) + len(resume_terms)
+    idf = np.log((1 + n_docs) / (1 + np.asarray(doc_freq, dtype=np.float32))) + 1.0
+
+    job_matrix = _ngram_matrix(job_terms, vocab) * idf
+    resume_matrix = _ngram_matrix(resume_terms, vocab) * idf
+    job_matrix /= np.linalg.norm(job_matrix, axis=1, keepdims=True) + 1e-9
+    resume_matrix /= np.linalg.norm(resume_matrix, axis=1, keepdims=True) + 1e-9
+    best = (job_matrix @ resume_matrix.T).max(axis=1)
+
+    term_weights = np.asarray([weights[t] for t in job_terms], dtype=np.float32)
+    matched_mask = best >= MATCH_THRESHOLD
+    coverage = float(term_weights[matched_mask].sum() / term_weights.sum())
+    matched = [t for t, m in zip(job_terms, matched_mask) if m]
+    missing = [t for t, m in zip(job_terms, matched_mask) if not m]
+    # Most important skills first
+    matched.sort(key=lambda t: -weights[t])
+    missing.sort(key=lambda t: -weights[t])
+    return {
+        "fit_score": round(1.0 + 9.0 * coverage, 1),
+        "matched_skills": matched,
+        "missing_skills": missing,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
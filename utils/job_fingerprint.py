@@ -0,0 +1,142 @@
+# utils/job_fingerprint.py
+"""
+Fingerprints for recognizing the same job posting again.
+
+A role is often reposted under a new URL or syndicated across job boards
+with a different header, footer and tracking parameters. A fingerprint has
+two parts:
+- exact keys: the canonical posting URL (host and path, without tracking
+  parameters) and the normalized company name plus job id;
+- a 64-bit SimHash of the posting text over three-word shingles. Reposts
+  with small edits differ in a few bits, unrelated postings in about 32.
+
+For lookups the SimHash is split into four 16-bit bands. Two fingerprints
+within DEDUPE_MAX_DISTANCE <= 3 bits agree on at least one whole band, so
+the record store finds candidates with an indexed equality lookup per band
+(locality-sensitive hashing) and only compares those bit by bit.
+"""
+import hashlib
+import re
+from collections import Counter
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from utils.company_cache import normalize_company_name
+
+SIMHASH_BITS = 64
+BANDS = 4
+BAND_BITS = SIMHASH_BITS // BANDS
+SHINGLE_WORDS = 3
+# Shorter texts (a pasted title, a failed scrape) say too little to match on
+MIN_WORDS = 40
+
+# Query parameters that identify the visitor or campaign rather than the posting
+_TRACKING_PARAM_RE = re.compile(
+    r"^(utm_\w+|ref|refid|referer|referrer|src|source|trk\w*|gclid|fbclid|mc_\w+|_ga|lipi|originalsubdomain)$",
+    re.IGNORECASE,
+)
+# job_id values the extractor uses for "not in the posting"
+_NO_JOB_ID = {"", "na", "n/a", "none", "null", "unknown", "not mentioned", "not specified", "not available"}
+
+
+class JobFingerprint:
+    def __init__(self, simhash: int = None, keys: tuple = ()):
+        """
+        Args:
+            simhash (int): SimHash of the posting text; None when the text is too short.
+            keys (tuple): Exact lookup keys, e.g. "url:boards.example.com/jobs/42".
+        """
+        self.simhash = simhash
+        self.keys = tuple(keys)
+
+    def lookup_keys(self) -> list:
+        """The exact keys plus one key per SimHash band."""
+        return list(self.keys) + band_keys(self.simhash)
+
+    def __repr__(self):
+        simhash = f"{self.simhash:016x}" if self.simhash is not None else None
+        return f"JobFingerprint(simhash={simhash}, keys={self.keys!r})"
+
+
+def canonical_url(url: str) -> str:
+    """
+    Reduces a job URL to the part that identifies the posting.
+
+    Args:
+        url (str): An http(s) URL.
+
+    Returns:
+        str: Lowercased host without "www." plus path and sorted non-tracking
+            query parameters, e.g. "boards.example.com/jobs/42?gh_jid=7"; "" for
+            anything that is not an http(s) URL.
+    """
+    parts = urlsplit((url or "").strip())
+    if parts.scheme.lower() not in ("http", "https") or not parts.netloc:
+        return ""
+    host = parts.netloc.lower()
+    host = host[4:] if host.startswith("www.") else host
+    query = sorted((k, v) for k, v in parse_qsl(parts.query) if not _TRACKING_PARAM_RE.match(k))
+    return host + parts.path.rstrip("/") + (f"?{urlencode(query)}" if query else "")
+
+
+def simhash(text: str) -> int:
+    """
+    64-bit SimHash of a text over word shingles, each weighted by how often it occurs.
+
+    Args:
+        text (str): The posting text.
+
+    Returns:
+        int: The unsigned fingerprint, or None when the text has fewer than MIN_WORDS words.
+    """
+    words = re.findall(r"\w+", (text or "").lower())
+    if len(words) < MIN_WORDS:
+        return None
+    import numpy as np  # Only needed once there is text to compare; keeps the record store import light
+
+    shingles = Counter(" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1))
+    digests = b"".join(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest() for s in shingles)
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8).reshape(-1, 8), axis=1)
+    # Each shingle votes +weight for its set bits and -weight for the others
+    votes = np.fromiter(shingles.values(), dtype=np.int64, count=len(shingles)) @ (bits.astype(np.int64) * 2 - 1)
+    return int.from_bytes(np.packbits(votes > 0).tobytes(), "big")
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def band_keys(value: int) -> list:
+    """Lookup keys of the SimHash bands, e.g. ["b0:1f3a", "b1:0042", ...]; [] for None."""
+    if value is None:
+        return []
+    mask = (1 << BAND_BITS) - 1
+    return [f"b{i}:{(value >> (i * BAND_BITS)) & mask:04x}" for i in range(BANDS)]
+
+
+def fingerprint_job(job_text: str = "", job_input: str = None, job_info: dict = None) -> JobFingerprint:
+    """
+    Fingerprints a posting from whatever is known about it so far.
+
+    Right after scraping only the text and the input URL are known; after
+    extraction (or for a saved record, whose keys match job_info's) the
+    posting's own job_url, job_id and company_name are added.
+
+    Args:
+        job_text (str): The scraped or pasted posting text.
+        job_input (str): The URL or text the run started from.
+        job_info (dict): JobInfoExtractor output or an application record.
+
+    Returns:
+        JobFingerprint: The fingerprint.
+    """
+    job_info = job_info or {}
+    keys = []
+    for url in (job_input, job_info.get("job_url")):
+        url = canonical_url(url) if isinstance(url, str) else ""
+        if url and f"url:{url}" not in keys:
+            keys.append(f"url:{url}")
+    job_id = re.sub(r"\s+", "", str(job_info.get("job_id") or "")).lower()
+    company = normalize_company_name(str(job_info.get("company_name") or ""))
+    if company and job_id not in _NO_JOB_ID:
+        keys.append(f"job:{company}|{job_id}")
+    return JobFingerprint(simhash(job_text), keys)
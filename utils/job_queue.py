@@ -0,0 +1,220 @@
+# utils/job_queue.py
+"""
+Persistent job queue on SQLite, shared by the Streamlit app and worker.py.
+
+The app submits postings and polls their state; worker processes claim the
+oldest queued job, report each agent's status while it runs and store the
+pipeline result as JSON. Jobs outlive page reloads and app restarts. A job
+whose worker stops reporting (crashed or killed) is handed to another
+worker once its lease runs out.
+"""
+import json
+import time
+
+from config import JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS, JOB_QUEUE_DB_PATH
+from utils.sqlite_db import ThreadLocalConnection
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATUSES = (DONE, FAILED, CANCELLED)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    status TEXT NOT NULL,
+    job_input TEXT NOT NULL,
+    options TEXT NOT NULL,
+    label TEXT NOT NULL,
+    progress TEXT,
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    submitted_at REAL NOT NULL,
+    started_at REAL,
+    heartbeat_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, id);
+CREATE TABLE IF NOT EXISTS workers (
+    worker_id TEXT PRIMARY KEY,
+    pid INTEGER,
+    seen_at REAL NOT NULL
+);
+"""
+
+# Columns returned by list_jobs(); results are only loaded by get()
+_LIST_COLUMNS = ("id", "status", "label", "progress", "error", "attempts", "worker", "submitted_at", "started_at",
+                 "finished_at")
+_JSON_COLUMNS = ("options", "progress", "result")
+
+
+def _label(job_input: str, limit: int = 80) -> str:
+    first_line = job_input.strip().splitlines()[0] if job_input.strip() else ""
+    return first_line if len(first_line) <= limit else first_line[:limit] + "..."
+
+
+class JobQueue:
+    def __init__(self, path: str = JOB_QUEUE_DB_PATH):
+        """
+        Args:
+            path (str): Path of the SQLite database file.
+        """
+        self.path = path
+        self._db = ThreadLocalConnection(path, _SCHEMA)
+
+    def _conn(self):
+        return self._db.get()
+
+    @staticmethod
+    def _jobs(cursor) -> list:
+        columns = [d[0] for d in cursor.description]
+        jobs = []
+        for row in cursor:
+            job = dict(zip(columns, row))
+            for key in _JSON_COLUMNS:
+                if job.get(key) is not None:
+                    job[key] = json.loads(job[key])
+            jobs.append(job)
+        return jobs
+
+    def submit(self, job_input: str, options: dict = None) -> int:
+        """
+        Queues a posting and returns the job id.
+
+        Args:
+            job_input (str): A job URL or the job listing text.
+            options (dict): Run options for the worker, e.g. {"triage": True, "fused": False, "compare": False}.
+        """
+        cursor = self._conn().execute(
+            "INSERT INTO jobs (status, job_input, options, label, submitted_at) VALUES (?, ?, ?, ?, ?)",
+            (QUEUED, job_input, json.dumps(options or {}), _label(job_input), time.time()),
+        )
+        return cursor.lastrowid
+
+    def claim(self, worker_id: str) -> dict:
+        """
+        Marks the oldest queued job as running for a worker.
+
+        Args:
+            worker_id (str): Identifies the claiming worker.
+
+        Returns:
+            dict: The job (id, job_input, options, attempts, ...), or None if the queue is empty.
+        """
+        conn = self._conn()
+        now = time.time()
+        # BEGIN IMMEDIATE takes the write lock up front, so two workers never claim the same job
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT id FROM jobs WHERE status = ? ORDER BY id LIMIT 1", (QUEUED,)).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, worker = ?, attempts = attempts + 1, started_at = ?, "
+                    "heartbeat_at = ?, progress = NULL, error = NULL WHERE id = ?",
+                    (RUNNING, worker_id, now, now, row[0]),
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return self.get(row[0]) if row is not None else None
+
+    def heartbeat(self, job_id: int, progress: dict = None):
+        """Renews the lease of a running job and stores its progress (agent -> status)."""
+        self._conn().execute(
+            "UPDATE jobs SET heartbeat_at = ?, progress = COALESCE(?, progress) WHERE id = ? AND status = ?",
+            (time.time(), json.dumps(progress) if progress is not None else None, job_id, RUNNING),
+        )
+
+    def complete(self, job_id: int, result: dict, label: str = None):
+        """Stores the result of a finished job; label, if given, replaces the input summary in job lists."""
+        self._conn().execute(
+            "UPDATE jobs SET status = ?, result = ?, label = COALESCE(?, label), finished_at = ? WHERE id = ?",
+            (DONE, json.dumps(result, default=str), label, time.time(), job_id),
+        )
+
+    def fail(self, job_id: int, error: str):
+        self._conn().execute(
+            "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+            (FAILED, error, time.time(), job_id),
+        )
+
+    def cancel(self, job_id: int) -> bool:
+        """Cancels a job that has not started yet; returns False if a worker already claimed it."""
+        cursor = self._conn().execute(
+            "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status = ?",
+            (CANCELLED, time.time(), job_id, QUEUED),
+        )
+        return cursor.rowcount > 0
+
+    def delete(self, job_id: int) -> bool:
+        """Removes a finished job from the queue; returns False for queued or running jobs."""
+        placeholders = ", ".join("?" * len(FINISHED_STATUSES))
+        cursor = self._conn().execute(
+            f"DELETE FROM jobs WHERE id = ? AND status IN ({placeholders})", (job_id, *FINISHED_STATUSES),
+        )
+        return cursor.rowcount > 0
+
+    def requeue_stale(self, lease_seconds: float = JOB_LEASE_SECONDS, max_attempts: int = JOB_MAX_ATTEMPTS) -> int:
+        """
+        Hands running jobs whose worker stopped reporting back to the queue.
+
+        Args:
+            lease_seconds (float): Seconds without a heartbeat after which a worker counts as gone.
+            max_attempts (int): Jobs that already ran this often are failed instead of requeued.
+
+        Returns:
+            int: Number of jobs requeued or failed.
+        """
+        conn = self._conn()
+        cutoff = time.time() - lease_seconds
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            requeued = conn.execute(
+                "UPDATE jobs SET status = ?, worker = NULL WHERE status = ? AND heartbeat_at < ? AND attempts < ?",
+                (QUEUED, RUNNING, cutoff, max_attempts),
+            ).rowcount
+            failed = conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE status = ? AND heartbeat_at < ?",
+                (FAILED, f"Worker stopped responding ({max_attempts} attempt(s))", time.time(), RUNNING, cutoff),
+            ).rowcount
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return requeued + failed
+
+    def get(self, job_id: int) -> dict:
+        """Returns a job with its options, progress and result, or None."""
+        jobs = self._jobs(self._conn().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)))
+        return jobs[0] if jobs else None
+
+    def list_jobs(self, limit: int = 50) -> list:
+        """Returns the most recent jobs, newest first, without their inputs and results."""
+        return self._jobs(self._conn().execute(
+            f"SELECT {', '.join(_LIST_COLUMNS)} FROM jobs ORDER BY id DESC LIMIT ?", (limit,),
+        ))
+
+    def counts(self) -> dict:
+        """Returns the number of jobs per status."""
+        return dict(self._conn().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+    def worker_seen(self, worker_id: str, pid: int):
+        """Records that a worker is alive; called from its polling loop."""
+        self._conn().execute(
+            "INSERT OR REPLACE INTO workers (worker_id, pid, seen_at) VALUES (?, ?, ?)",
+            (worker_id, pid, time.time()),
+        )
+
+    def worker_gone(self, worker_id: str):
+        self._conn().execute("DELETE FROM workers WHERE worker_id = ?", (worker_id,))
+
+    def active_workers(self, max_age: float = 30.0) -> int:
+        """Returns the number of workers seen within max_age seconds."""
+        return self._conn().execute(
+            "SELECT COUNT(*) FROM workers WHERE seen_at >= ?", (time.time() - max_age,),
+        ).fetchone()[0]
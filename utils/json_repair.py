@@ -0,0 +1,193 @@
+# utils/json_repair.py
+"""
+Tolerant JSON extraction for model output.
+
+Models wrap their answer in <json> tags, markdown fences or prose, and the
+JSON itself is sometimes slightly off: a missing closing tag, trailing
+commas, raw newlines inside strings, Python literals, or a document cut off
+at max_tokens. parse_json() takes the fast path (json.loads) when the text
+is valid and otherwise repairs it. A truncated document is cut back to its
+last complete value, so a half-written field is reported as missing
+(and can be requested again) instead of being kept half-written.
+"""
+import json
+import re
+
+_TAGGED_RE = re.compile(r"<json>(.*?)(?:</json>|$)", re.DOTALL | re.IGNORECASE)
+_FENCED_RE = re.compile(r"```(?:json)?\s*(.*?)(?:```|$)", re.DOTALL | re.IGNORECASE)
+_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_WHITESPACE = " \t\r\n"
+
+
+class JSONRepairError(ValueError):
+    """Raised when no JSON value can be recovered from the text."""
+
+
+def extract_json_text(text: str) -> str:
+    """
+    Returns the JSON part of a model response.
+
+    Looks for <json>...</json> (a missing closing tag is fine), then a
+    ```json fence, then the first "{" or "["; anything before it is dropped.
+
+    Args:
+        text (str): The raw completion.
+
+    Returns:
+        str: The text to parse, stripped.
+    """
+    text = text or ""
+    for pattern in (_TAGGED_RE, _FENCED_RE):
+        match = pattern.search(text)
+        if match and match.group(1).strip():
+            text = match.group(1)
+            break
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    return text[min(starts):].strip() if starts else text.strip()
+
+
+def repair_json(text: str) -> tuple:
+    """
+    Rewrites almost-JSON into JSON.
+
+    Fixes trailing commas, raw control characters in strings, Python literals
+    (True/False/None), text after the top-level value and truncation: an
+    unfinished document is cut back to its last complete value and closed.
+
+    Args:
+        text (str): Text starting at the top-level "{" or "[".
+
+    Returns:
+        tuple: (repaired JSON text, list of the fixes applied).
+    """
+    out = []
+    fixes = []
+    stack = []          # open containers: "{" or "["
+    expect_key = []     # per open object: True while the next string is a key
+    safe = None         # (len(out), open containers) after the last complete value
+    in_string = escape = False
+    string_is_key = False
+    i, n = 0, len(text)
+
+    def mark_value_done():
+        nonlocal safe
+        if stack and stack[-1] == "{":
+            expect_key[-1] = True
+        safe = (len(out), list(stack))
+
+    while i < n:
+        ch = text[i]
+        if in_string:
+            if escape:
+                escape = False
+                out.append(ch)
+            elif ch == "\\":
+                escape = True
+                out.append(ch)
+            elif ch == '"':
+                in_string = False
+                out.append(ch)
+                if not string_is_key:
+                    mark_value_done()
+            elif ch in "\n\r\t":
+                out.append({"\n": "\\n", "\r": "\\r", "\t": "\\t"}[ch])
+                if "control characters in strings" not in fixes:
+                    fixes.append("control characters in strings")
+            else:
+                out.append(ch)
+            i += 1
+            continue
+
+        if ch in _WHITESPACE:
+            out.append(ch)
+        elif ch == '"':
+            in_string = True
+            string_is_key = bool(stack) and stack[-1] == "{" and expect_key[-1]
+            out.append(ch)
+        elif ch in "{[":
+            stack.append(ch)
+            expect_key.append(ch == "{")
+            out.append(ch)
+            if len(stack) == 1:
+                safe = (len(out), list(stack))  # An empty container at worst
+        elif ch in "}]":
+            if not stack:
+                break
+            # Drop a trailing comma before the closing bracket
+            j = len(out) - 1
+            while j >= 0 and out[j] in _WHITESPACE:
+                j -= 1
+            if j >= 0 and out[j] == ",":
+                del out[j]
+                if "trailing commas" not in fixes:
+                    fixes.append("trailing commas")
+            stack.pop()
+            expect_key.pop()
+            out.append("}" if ch == "}" else "]")
+            if not stack:
+                i += 1
+                break
+            mark_value_done()
+        elif ch == ":":
+            if stack and stack[-1] == "{":
+                expect_key[-1] = False
+            out.append(ch)
+        elif ch == ",":
+            if stack and stack[-1] == "{":
+                expect_key[-1] = True
+            out.append(ch)
+        else:
+            match = re.match(r"-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?|true|false|null|True|False|None", text[i:])
+            if not match:
+                i += 1  # Stray character outside a string
+                continue
+            token = match.group(0)
+            if token in _LITERALS:
+                token = _LITERALS[token]
+                if "python literals" not in fixes:
+                    fixes.append("python literals")
+            out.append(token)
+            i += len(match.group(0))
+            if i < n or not stack:
+                mark_value_done()
+            continue
+        i += 1
+
+    if stack:
+        fixes.append("truncated document")
+        cut, stack = safe
+        out = out[:cut]
+        # The cut may leave a dangling comma after the last complete value
+        while out and (out[-1] in _WHITESPACE or out[-1] == ","):
+            out.pop()
+        out.extend("}" if c == "{" else "]" for c in reversed(stack))
+    elif i < n and text[i:].strip():
+        fixes.append("text after the document")
+    return "".join(out), fixes
+
+
+def parse_json(text: str) -> tuple:
+    """
+    Parses a model response, repairing it when needed.
+
+    Args:
+        text (str): The raw completion or its JSON part.
+
+    Returns:
+        tuple: (parsed value, list of the fixes applied; empty when the text was valid).
+
+    Raises:
+        JSONRepairError: If nothing parseable is left after repair.
+    """
+    candidate = extract_json_text(text)
+    try:
+        return json.loads(candidate), []
+    except json.JSONDecodeError:
+        pass
+    if not candidate.startswith(("{", "[")):
+        raise JSONRepairError(f"No JSON found in model output: {candidate[:80]!r}")
+    repaired, fixes = repair_json(candidate)
+    try:
+        return json.loads(repaired), fixes
+    except json.JSONDecodeError as e:
+        raise JSONRepairError(f"Could not repair model output ({e})") from e
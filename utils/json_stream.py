@@ -0,0 +1,125 @@
+# utils/json_stream.py
+"""
+Incremental JSON parser for streamed LLM output.
+
+Feed it text chunks as they arrive; it returns (path, value) pairs for every
+value that has just closed, e.g. (("fit_score",), 7.5) or
+(("cold email", "subject"), "..."), long before the whole document is done.
+Text before the first "{" or "[" (such as a <json> tag) and after the
+top-level value is ignored.
+"""
+import json
+
+_WHITESPACE = " \t\r\n"
+
+
+class _Frame:
+    __slots__ = ("kind", "start", "path", "key", "index", "expect")
+
+    def __init__(self, kind: str, start: int, path: tuple):
+        self.kind = kind  # "object" or "array"
+        self.start = start
+        self.path = path
+        self.key = None
+        self.index = 0
+        self.expect = "key" if kind == "object" else "value"
+
+    def child_path(self) -> tuple:
+        return self.path + ((self.key,) if self.kind == "object" else (self.index,))
+
+
+class IncrementalJsonParser:
+    def __init__(self):
+        self.text = ""
+        self.done = False
+        self.result = None
+        self._pos = 0
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._string_is_key = False
+        self._token_start = None  # start of the string or scalar being read
+
+    def feed(self, chunk: str) -> list:
+        """
+        Adds a chunk of text and returns the values it completed.
+
+        Args:
+            chunk (str): The next piece of streamed text.
+
+        Returns:
+            list: (path, value) tuples in the order the values closed; path is a
+                tuple of object keys and array indexes, () for the top-level value.
+        """
+        if self.done or not chunk:
+            return []
+        self.text += chunk
+        events = []
+        text = self.text
+        i = self._pos
+        while i < len(text) and not self.done:
+            c = text[i]
+            if not self._stack:
+                if c in "{[":
+                    self._stack.append(_Frame("object" if c == "{" else "array", i, ()))
+                i += 1
+                continue
+
+            frame = self._stack[-1]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    raw = text[self._token_start:i + 1]
+                    self._token_start = None
+                    if self._string_is_key:
+                        frame.key = json.loads(raw)
+                        frame.expect = "colon"
+                    else:
+                        events.append((frame.child_path(), json.loads(raw)))
+                        frame.expect = "comma"
+                i += 1
+                continue
+
+            if self._token_start is not None:
+                # Inside a number or literal: it ends at the next delimiter
+                if c not in _WHITESPACE and c not in ",]}":
+                    i += 1
+                    continue
+                events.append((frame.child_path(), json.loads(text[self._token_start:i])))
+                self._token_start = None
+                frame.expect = "comma"
+
+            if c in _WHITESPACE:
+                pass
+            elif c == '"':
+                self._in_string = True
+                self._string_is_key = frame.kind == "object" and frame.expect == "key"
+                self._token_start = i
+            elif c == ":":
+                frame.expect = "value"
+            elif c == ",":
+                if frame.kind == "object":
+                    frame.expect = "key"
+                else:
+                    frame.index += 1
+                    frame.expect = "value"
+            elif c in "{[":
+                self._stack.append(_Frame("object" if c == "{" else "array", i, frame.child_path()))
+            elif c in "}]":
+                self._stack.pop()
+                value = json.loads(text[frame.start:i + 1])
+                events.append((frame.path, value))
+                if self._stack:
+                    self._stack[-1].expect = "comma"
+                else:
+                    self.done = True
+                    self.result = value
+            else:
+                self._token_start = i
+            i += 1
+        self._pos = i
+        return events
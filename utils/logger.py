@@ -0,0 +1,538 @@
+# utils/logger.py
+"""
+Logging setup, per-run tracing and metrics.
+
+A trace covers one pipeline run (or one save). Inside it, span() records
+timed stages: agent tasks, scrape, prompt render, provider call, JSON parse
+and save. Spans nest through contextvars, so stages running on scheduler
+threads or on the background event loop attach to the right parent.
+Backends and caches add what they know to the current span: token usage
+and estimated cost (record_usage), rate-limit retries (record_retry),
+cache hits (record_cache_hit) and tokens saved by prompt compaction
+(record_compaction).
+
+Finished traces are appended to TRACE_FILE_PATH as JSONL, one span per
+line. Span durations, tokens, cost, retries and cache hits are also kept
+as Prometheus metrics, written to a per-process copy of METRICS_FILE_PATH
+after every trace and served on METRICS_HOST:METRICS_PORT when
+start_metrics_server() is called.
+"""
+import atexit
+import contextlib
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from config import (
+    LLM_PRICES_PER_MILLION_TOKENS,
+    METRICS_FILE_PATH,
+    METRICS_HOST,
+    METRICS_PORT,
+    TRACE_FILE_MAX_BYTES,
+    TRACE_FILE_PATH,
+    TRACING_ENABLED,
+)
+
+LOG_FORMAT = "%(asctime)s - %(levelname)s - [%(trace_id)s] %(message)s"
+METRIC_PREFIX = "jobassist"
+DURATION_BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+# Numeric span attributes summed into the trace's root span
+TOTAL_ATTRS = ("prompt_tokens", "completion_tokens", "cost_usd", "retries", "cache_hits", "tokens_saved")
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class _TraceIdFilter(logging.Filter):
+    def filter(self, record):
+        current = _current_span.get()
+        record.trace_id = current.trace.trace_id[:8] if current is not None and current.trace else "-"
+        return True
+
+
+def configure_logging(level: int = logging.INFO):
+    """Configures the root logger; every line carries the id of the trace it belongs to."""
+    logging.basicConfig(level=level, format=LOG_FORMAT)
+    for handler in logging.getLogger().handlers:
+        if not any(isinstance(f, _TraceIdFilter) for f in handler.filters):
+            handler.addFilter(_TraceIdFilter())
+
+
+class Span:
+    def __init__(self, name: str, trace=None, parent=None, attrs: dict = None):
+        self.name = name
+        self.trace = trace
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent is not None else None
+        self.attrs = dict(attrs or {})
+        self.status = "ok"
+        self.error = None
+        self.start = time.time()
+        self.duration = None
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def set(self, **attrs):
+        with self._lock:
+            self.attrs.update(attrs)
+
+    def add(self, **counts):
+        """Increments numeric attributes, e.g. add(retries=1)."""
+        with self._lock:
+            for key, value in counts.items():
+                self.attrs[key] = self.attrs.get(key, 0) + value
+
+    def elapsed_ms(self) -> float:
+        """Milliseconds since the span started."""
+        return (time.perf_counter() - self._started) * 1000
+
+    def finish(self, error: Exception = None):
+        self.duration = time.perf_counter() - self._started
+        if error is not None:
+            self.status = "error"
+            self.error = f"{type(error).__name__}: {error}"
+        _observe_span(self)
+        if self.trace is not None:
+            self.trace.add(self)
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace.trace_id if self.trace else None,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": round(self.start, 6),
+            "duration_ms": round((self.duration or 0.0) * 1000, 3),
+            "status": self.status,
+            "error": self.error,
+            "attrs": self.attrs,
+        }
+
+
+class Trace:
+    def __init__(self, name: str, attrs: dict = None):
+        """
+        The spans of one run.
+
+        Args:
+            name (str): Name of the root span, e.g. "pipeline" or "save".
+            attrs (dict): Attributes of the root span.
+        """
+        self.trace_id = uuid.uuid4().hex
+        self.root = Span(name, trace=self, attrs=attrs)
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def add(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+    def totals(self) -> dict:
+        totals = {}
+        for s in self.spans:
+            if s is self.root:
+                continue
+            for key in TOTAL_ATTRS:
+                if isinstance(s.attrs.get(key), (int, float)):
+                    totals[key] = totals.get(key, 0) + s.attrs[key]
+        if "cost_usd" in totals:
+            totals["cost_usd"] = round(totals["cost_usd"], 6)
+        return totals
+
+    def to_dicts(self) -> list:
+        """Spans in start order, root first."""
+        with self._lock:
+            spans = list(self.spans)
+        return [s.to_dict() for s in sorted(spans, key=lambda s: (s is not self.root, s.start))]
+
+
+def current_span() -> Span:
+    return _current_span.get()
+
+
+@contextlib.contextmanager
+def span(name: str, **attrs):
+    """
+    Times a stage as a child of the current span.
+
+    Outside a trace the span only feeds the metrics.
+
+    Args:
+        name (str): Stage name, e.g. "scrape", "prompt_render", "llm_call", "json_parse".
+        **attrs: Initial attributes.
+
+    Yields:
+        Span: The new span, for adding attributes.
+    """
+    parent = _current_span.get()
+    new = Span(name, trace=parent.trace if parent is not None else None, parent=parent, attrs=attrs)
+    token = _current_span.set(new)
+    try:
+        yield new
+    except BaseException as e:
+        new.finish(e)
+        raise
+    else:
+        new.finish()
+    finally:
+        _current_span.reset(token)
+
+
+def start_trace(name: str, **attrs) -> tuple:
+    """
+    Starts a trace without entering it; for code that cannot use the trace() block,
+    such as generators that hand work to other threads.
+
+    Returns:
+        tuple: (Trace, contextvars.Context in which the root span is current).
+    """
+    new = Trace(name, attrs)
+    context = contextvars.copy_context()
+    context.run(_current_span.set, new.root)
+    return new, context
+
+
+def end_trace(trace: Trace, error: Exception = None, status: str = None):
+    """
+    Finishes the root span, then writes the trace file and the metrics file.
+
+    Args:
+        trace (Trace): The trace to finish.
+        error (Exception): Marks the run as failed.
+        status (str): Overrides the root status, e.g. "cancelled".
+    """
+    trace.root.set(**trace.totals())
+    trace.root.finish(error)
+    if status:
+        trace.root.status = status
+    _observe_run(trace.root)
+    _write_trace(trace)
+    write_metrics()
+
+
+@contextlib.contextmanager
+def trace(name: str, **attrs):
+    """
+    Runs a block as a new trace; spans opened inside it become its children.
+
+    Yields:
+        Trace: The trace, for reading its spans afterwards.
+    """
+    new = Trace(name, attrs)
+    token = _current_span.set(new.root)
+    try:
+        yield new
+    except BaseException as e:
+        _current_span.reset(token)
+        end_trace(new, error=e)
+        raise
+    _current_span.reset(token)
+    end_trace(new)
+
+
+def set_attrs(**attrs):
+    """Adds attributes to the current span, if any."""
+    current = _current_span.get()
+    if current is not None:
+        current.set(**attrs)
+
+
+def add_counts(**counts):
+    """Increments numeric attributes of the current span, if any."""
+    current = _current_span.get()
+    if current is not None:
+        current.add(**counts)
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """USD cost of a request from config.LLM_PRICES_PER_MILLION_TOKENS; 0 for unpriced models."""
+    prompt_price, completion_price = LLM_PRICES_PER_MILLION_TOKENS.get(model, (0.0, 0.0))
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+
+def record_usage(provider: str, model: str, prompt_tokens: int, completion_tokens: int, estimated: bool = False):
+    """
+    Adds a request's token usage and estimated cost to the current span and the metrics.
+
+    Args:
+        provider (str): e.g. "groq", "perplexity", "local", "fake".
+        model (str): Model name, the key of the price table.
+        prompt_tokens (int): Input tokens, as reported by the provider.
+        completion_tokens (int): Output tokens, as reported by the provider.
+        estimated (bool): The counts are local estimates, not provider-reported.
+    """
+    prompt_tokens, completion_tokens = int(prompt_tokens or 0), int(completion_tokens or 0)
+    cost = estimate_cost(model, prompt_tokens, completion_tokens)
+    current = _current_span.get()
+    if current is not None:
+        current.set(provider=provider, model=model)
+        if estimated:
+            current.set(tokens_estimated=True)
+        current.add(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens, cost_usd=cost)
+    labels = {"provider": provider, "model": model}
+    _inc("llm_tokens_total", prompt_tokens, {**labels, "kind": "prompt"})
+    _inc("llm_tokens_total", completion_tokens, {**labels, "kind": "completion"})
+    _inc("llm_cost_usd_total", cost, labels)
+    _inc("llm_requests_total", 1, labels)
+
+
+def record_retry(provider: str):
+    """Counts a rate-limited request that will be retried."""
+    current = _current_span.get()
+    if current is not None:
+        current.add(retries=1)
+    _inc("llm_retries_total", 1, {"provider": provider})
+
+
+def record_cache_hit(cache: str):
+    """Counts a cache hit (llm_responses, company_reports, recruiter_urls, http_pages)."""
+    current = _current_span.get()
+    if current is not None:
+        current.add(cache_hits=1)
+        current.set(cache=cache)
+    _inc("cache_hits_total", 1, {"cache": cache})
+
+
+def record_compaction(agent: str, tokens_saved: int, trimmed: list = None):
+    """
+    Adds the estimated prompt tokens that input compaction saved to the current span and the metrics.
+
+    Args:
+        agent (str): The agent whose inputs were compacted, e.g. "fit_eval".
+        tokens_saved (int): Estimated tokens removed.
+        trimmed (list): Variables that were cut to fit the token budget.
+    """
+    current = _current_span.get()
+    if current is not None:
+        current.add(tokens_saved=tokens_saved)
+        if trimmed:
+            current.set(trimmed=",".join(trimmed))
+    _inc("prompt_tokens_saved_total", tokens_saved, {"agent": agent})
+
+
+# --------------------- Trace file ---------------------
+
+_trace_file_lock = threading.Lock()
+
+
+def _write_trace(trace: Trace):
+    if not TRACING_ENABLED or not TRACE_FILE_PATH:
+        return
+    lines = "".join(json.dumps(s, default=str) + "\n" for s in trace.to_dicts())
+    try:
+        with _trace_file_lock:
+            os.makedirs(os.path.dirname(TRACE_FILE_PATH) or ".", exist_ok=True)
+            if TRACE_FILE_MAX_BYTES and os.path.exists(TRACE_FILE_PATH) \
+                    and os.path.getsize(TRACE_FILE_PATH) > TRACE_FILE_MAX_BYTES:
+                os.replace(TRACE_FILE_PATH, TRACE_FILE_PATH + ".1")
+            with open(TRACE_FILE_PATH, "a", encoding="utf-8") as f:
+                f.write(lines)
+    except OSError as e:
+        logging.warning(f"Could not write trace file {TRACE_FILE_PATH}: {e}")
+
+
+# --------------------- Metrics ---------------------
+
+_metrics_lock = threading.Lock()
+_counters = {}    # (name, labels) -> value
+_histograms = {}  # (name, labels) -> [bucket counts..., +Inf count, sum]
+_HELP = {
+    "span_duration_seconds": ("histogram", "Duration of traced stages."),
+    "span_errors_total": ("counter", "Traced stages that raised."),
+    "runs_total": ("counter", "Finished traces by name and status."),
+    "llm_requests_total": ("counter", "LLM requests with recorded usage."),
+    "llm_tokens_total": ("counter", "LLM tokens by kind (prompt or completion)."),
+    "llm_cost_usd_total": ("counter", "Estimated LLM cost in USD."),
+    "llm_retries_total": ("counter", "LLM requests retried after a rate limit."),
+    "cache_hits_total": ("counter", "Cache hits by cache."),
+    "prompt_tokens_saved_total": ("counter", "Estimated prompt tokens removed by input compaction, by agent."),
+}
+
+
+def _labels_key(labels: dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _inc(name: str, value: float, labels: dict):
+    key = (name, _labels_key(labels))
+    with _metrics_lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def _observe(name: str, value: float, labels: dict):
+    key = (name, _labels_key(labels))
+    with _metrics_lock:
+        buckets = _histograms.setdefault(key, [0] * (len(DURATION_BUCKETS) + 2))
+        for i, bound in enumerate(DURATION_BUCKETS):
+            if value <= bound:
+                buckets[i] += 1
+        buckets[-2] += 1
+        buckets[-1] += value
+
+
+def _observe_span(s: Span):
+    if s.trace is not None and s is s.trace.root:
+        return  # Runs are counted by _observe_run
+    _observe("span_duration_seconds", s.duration, {"span": s.name})
+    if s.status == "error":
+        _inc("span_errors_total", 1, {"span": s.name})
+
+
+def _observe_run(root: Span):
+    _observe("span_duration_seconds", root.duration, {"span": root.name})
+    _inc("runs_total", 1, {"run": root.name, "status": root.status})
+
+
+def _format_labels(labels, extra: dict = None) -> str:
+    pairs = list(labels) + list((extra or {}).items())
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def metrics_text(const_labels: dict = None) -> str:
+    """
+    Renders all metrics in the Prometheus text exposition format.
+
+    Args:
+        const_labels (dict): Labels added to every series, e.g. the process id.
+
+    Returns:
+        str: The metrics text.
+    """
+    const = _labels_key(const_labels or {})
+    with _metrics_lock:
+        counters = dict(_counters)
+        histograms = {k: list(v) for k, v in _histograms.items()}
+    lines = []
+    for name, (kind, help_text) in _HELP.items():
+        full = f"{METRIC_PREFIX}_{name}"
+        series = counters if kind == "counter" else histograms
+        keys = sorted(k for k in series if k[0] == name)
+        if not keys:
+            continue
+        lines.append(f"# HELP {full} {help_text}")
+        lines.append(f"# TYPE {full} {kind}")
+        for key in keys:
+            labels = const + key[1]
+            if kind == "counter":
+                lines.append(f"{full}{_format_labels(labels)} {series[key]:g}")
+                continue
+            values = series[key]
+            for bound, count in zip(DURATION_BUCKETS, values):
+                lines.append(f"{full}_bucket{_format_labels(labels, {'le': f'{bound:g}'})} {count}")
+            lines.append(f"{full}_bucket{_format_labels(labels, {'le': '+Inf'})} {values[-2]}")
+            lines.append(f"{full}_sum{_format_labels(labels)} {values[-1]:.6f}")
+            lines.append(f"{full}_count{_format_labels(labels)} {values[-2]}")
+    return "\n".join(lines) + "\n"
+
+
+def process_metrics_path(path: str = METRICS_FILE_PATH, pid: int = None) -> str:
+    """This process's metrics file: the process id goes before the extension, e.g. metrics.1234.prom."""
+    root, ext = os.path.splitext(path)
+    return f"{root}.{pid or os.getpid()}{ext}"
+
+
+_metrics_file_lock = threading.Lock()
+_metrics_files = set()  # Files this process has written, removed at exit
+
+
+def write_metrics(path: str = METRICS_FILE_PATH):
+    """
+    Writes metrics_text() atomically to this process's own file, for node_exporter's textfile collector.
+
+    App, batch and worker processes each keep their own counters, so each writes
+    process_metrics_path(path) with a pid label instead of overwriting one shared
+    file. The file is removed when the process exits, so the collector does not
+    keep exporting the counters of dead processes.
+
+    Args:
+        path (str): Base path; empty disables the file.
+    """
+    if not TRACING_ENABLED or not path:
+        return
+    pid = os.getpid()
+    path = process_metrics_path(path, pid)
+    # Traces end on many threads at once; they share the temp file, so writes take turns
+    with _metrics_file_lock:
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(metrics_text({"pid": pid}))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logging.warning(f"Could not write metrics file {path}: {e}")
+            return
+        if not _metrics_files:
+            atexit.register(remove_metrics_files)
+        _metrics_files.add(path)
+
+
+def remove_metrics_files():
+    """
+    Removes the metrics files this process wrote.
+
+    Registered with atexit on the first write; multiprocessing children skip atexit
+    handlers, so worker processes call it themselves before they exit.
+    """
+    with _metrics_file_lock:
+        for path in list(_metrics_files):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logging.warning(f"Could not remove metrics file {path}: {e}")
+            _metrics_files.discard(path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = metrics_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Scrapes every few seconds would flood the log
+
+
+_metrics_server = None
+_metrics_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: int = METRICS_PORT, host: str = METRICS_HOST) -> bool:
+    """
+    Serves /metrics on a background thread; later calls are no-ops.
+
+    Args:
+        port (int): TCP port; 0 disables the endpoint.
+        host (str): Interface to bind; loopback by default, "0.0.0.0" exposes it on the network.
+
+    Returns:
+        bool: True if the endpoint is running.
+    """
+    global _metrics_server
+    if not port:
+        return False
+    with _metrics_server_lock:
+        if _metrics_server is None:
+            try:
+                _metrics_server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            except OSError as e:
+                logging.warning(f"Metrics endpoint not started on {host}:{port}: {e}")
+                return False
+            threading.Thread(target=_metrics_server.serve_forever, name="metrics", daemon=True).start()
+            logging.info(f"Serving Prometheus metrics on {host}:{port}/metrics")
+    return True
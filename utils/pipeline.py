@@ -0,0 +1,378 @@
+# utils/pipeline.py
+import copy
+import functools
+import logging
+
+from agents.job_extractor import JobInfoExtractor
+from agents.fit_evaluator import FitEvaluatorAgent
+from agents.email_generator import EmailGeneratorAgent
+from agents.fit_email_agent import FitEmailAgent
+from agents.org_evaluater import OrgEvaluatorAgent
+from agents.get_recruiter_agent import GetRecruiterAgent
+from config import AGENT_TIMEOUT_SECONDS
+from utils.fit_prescorer import prescore_fit
+from utils.job_fingerprint import fingerprint_job
+from utils.logger import end_trace, start_trace
+from utils.scheduler import COMPLETED, FINISHED_KINDS, SKIPPED, DagScheduler, SkipTask, Task
+
+# Scheduler task name -> agent shown in status displays
+TASK_AGENTS = {
+    "scrape": "JobPageScraper",
+    "dedupe": "DuplicateCheck",
+    "job": "JobInfoExtractor",
+    "prescore": "FitPreScorer",
+    "fit_email": "FitEmailAgent",
+    "fit_eval": "FitEvaluatorAgent",
+    "email_gen": "EmailGeneratorAgent",
+    "org_eval": "OrgEvaluatorAgent",
+    "recruiter_data": "GetRecruiterAgent",
+}
+
+# How a duplicate was recognized, for messages
+MATCH_REASONS = {"url": "same job URL", "job": "same company and job id", "text": "near-identical text"}
+
+
+class DuplicateJob(SkipTask):
+    def __init__(self, match: dict, record: dict):
+        """
+        Raised when the posting is already in the record store; the rest of the run is skipped.
+
+        Args:
+            match (dict): The RecordStore.find_duplicate() result.
+            record (dict): The saved record, or None if it was deleted meanwhile.
+        """
+        super().__init__(f"duplicate of saved record {match['record_id']} ({MATCH_REASONS[match['matched_on']]})")
+        self.match = match
+        self.record = record
+
+
+class JobPipeline:
+    def __init__(self, groq_llm, perplexity_llm, timeout: int = AGENT_TIMEOUT_SECONDS, triage_threshold: float = None,
+                 fused: bool = False, search=None, records=None):
+        """
+        Wires the agent chain used by the "Parse Job" button so it can run headless.
+
+        Args:
+            groq_llm (BaseLLM): Model used for job extraction, fit evaluation and email generation.
+            perplexity_llm (BaseLLM): Model used for organization research and recruiter search.
+            timeout (int): Seconds each agent may run.
+            triage_threshold (float): Enables triage mode: a local pre-score (1-10) runs right
+                after extraction, and jobs scoring below this skip email generation and
+                recruiter search. None runs every agent.
+            fused (bool): Evaluate the fit and write the messages in one FitEmailAgent request
+                instead of separate FitEvaluatorAgent and EmailGeneratorAgent requests.
+            search (callable): Search function for GetRecruiterAgent; None uses its default.
+            records (RecordStore): Store checked for a saved record of the same posting right after
+                scraping, and again for its URL and job id after extraction; a match skips the
+                remaining agents. None disables the check.
+        """
+        self.job_agent = JobInfoExtractor(llm=groq_llm)
+        self.fit_agent = FitEvaluatorAgent(llm=groq_llm)
+        self.email_agent = EmailGeneratorAgent(llm=groq_llm)
+        self.fit_email_agent = FitEmailAgent(llm=groq_llm)
+        self.org_agent = OrgEvaluatorAgent(llm=perplexity_llm)
+        self.recruiter_agent = GetRecruiterAgent(llm=perplexity_llm, search=search)
+        self.timeout = timeout
+        self.triage_threshold = triage_threshold
+        self.fused = fused
+        self.records = records
+        self.last_trace = None
+
+    def with_options(self, triage_threshold: float = None, fused: bool = False) -> "JobPipeline":
+        """
+        Returns a pipeline that shares this one's agents but runs with other options.
+
+        Long-lived callers build one pipeline per process and take a copy per
+        run, so models and agents are created once and runs do not share last_trace.
+
+        Args:
+            triage_threshold (float): As in the constructor.
+            fused (bool): As in the constructor.
+
+        Returns:
+            JobPipeline: The configured copy.
+        """
+        pipeline = copy.copy(self)
+        pipeline.triage_threshold = triage_threshold
+        pipeline.fused = fused
+        pipeline.last_trace = None
+        return pipeline
+
+    def _below_threshold(self, prescore: dict, resume_id: str = None) -> bool:
+        if resume_id is not None:
+            scores = [prescore["by_resume"][resume_id]["fit_score"]]
+        else:
+            scores = [p["fit_score"] for p in (prescore.get("by_resume") or {None: prescore}).values()]
+        # An unknown pre-score (no skills to compare) never skips the agents
+        return all(score is not None and score < self.triage_threshold for score in scores)
+
+    def _triage(self, prescore: dict, resume_id: str = None):
+        if self._below_threshold(prescore, resume_id):
+            score = (prescore["by_resume"][resume_id] if resume_id is not None else prescore)["fit_score"]
+            raise SkipTask(f"pre-score {score} is below the triage threshold {self.triage_threshold}")
+
+    def _check_duplicate(self, fingerprint):
+        match = self.records.find_duplicate(fingerprint)
+        if match is not None:
+            raise DuplicateJob(match, self.records.get(match["record_id"]))
+
+    def build_tasks(self, stream: bool = False, resume_ids: list = None) -> list:
+        """
+        Declares each agent with the inputs it waits for.
+
+        Initial inputs are "job_input" (URL or listing text) and "resume". The posting is
+        scraped first; with a record store, a "dedupe" task then looks it up before any model
+        is called and raises DuplicateJob for a saved posting, which skips every agent. In
+        triage mode EmailGeneratorAgent and GetRecruiterAgent also wait for the "prescore"
+        task and are skipped when it is below the threshold; an unknown pre-score runs them. In fused mode one "fit_email"
+        task makes the request and "fit_eval"/"email_gen" publish its two halves.
+
+        With resume_ids, the job-level tasks still run once, but the resume-dependent ones
+        (fit_eval, email_gen, fit_email) run once per variant, named "<task>:<resume_id>" and
+        reading the initial input "resume:<resume_id>". The single prescore task then scores
+        every variant; each variant's email is triaged on its own pre-score and the recruiter
+        search on the best one.
+
+        Args:
+            stream (bool): Stream FitEvaluatorAgent and EmailGeneratorAgent output; each
+                completed field arrives as a progress event with a (path, value) payload.
+            resume_ids (list): Resume variants to evaluate; None evaluates the single "resume".
+        """
+        def company(job):
+            job_info = job[1]
+            return job_info.get("company_name", ""), job_info.get("location_country", "")
+
+        triage = self.triage_threshold is not None
+        dedupe = self.records is not None
+        variants = list(resume_ids) if resume_ids else [None]
+
+        def scrape(job_input):
+            job_text = self.job_agent.scrape_job_page(job_input)
+            if not job_text:
+                raise ValueError("Job page could not be scraped.")
+            return job_text
+
+        def check_duplicate(job_input, job_text):
+            self._check_duplicate(fingerprint_job(job_text, job_input))
+
+        def extract(job_input, job_text, _dedupe=None):
+            job_info = self.job_agent.extract(job_text, job_input)
+            if dedupe:
+                # The posting's own URL, company and job id are only known now
+                self._check_duplicate(fingerprint_job(job_info=job_info))
+            return job_text, job_info
+
+        def prescore_variants(job, *resumes):
+            by_resume = {resume_id: prescore_fit(resume, job[1]) for resume_id, resume in zip(variants, resumes)}
+            # Unknown scores rank last; an unknown variant still keeps the recruiter search
+            best = max(by_resume, key=lambda resume_id: by_resume[resume_id]["fit_score"] or -1.0)
+            return {**by_resume[best], "resume_id": best, "by_resume": by_resume}
+
+        def email(resume_id, resume, job, prescore=None, report=None):
+            if triage:
+                self._triage(prescore, resume_id)
+            if report:
+                return self.email_agent.run_stream(resume, job[1], lambda *field: report(field))
+            return self.email_agent.run(resume, job[1])
+
+        def recruiters(job, prescore=None):
+            if triage:
+                self._triage(prescore)
+            return self.recruiter_agent.run(*company(job))
+
+        def fit_email(resume_id, resume, job, prescore=None, report=None):
+            on_field = (lambda *field: report(field)) if report else None
+            if triage:
+                if self._below_threshold(prescore, resume_id):
+                    # A weak match only needs the fit evaluation
+                    fit = self.fit_agent.run_stream(resume, job[1], on_field) if report else self.fit_agent.run(resume, job[1])
+                    return fit, None
+            if report:
+                return self.fit_email_agent.run_stream(resume, job[1], on_field)
+            return self.fit_email_agent.run(resume, job[1])
+
+        def email_half(fit_email_result):
+            if fit_email_result[1] is None:
+                raise SkipTask(f"pre-score is below the triage threshold {self.triage_threshold}")
+            return fit_email_result[1]
+
+        def fit_stream(resume, job, report):
+            return self.fit_agent.run_stream(resume, job[1], lambda *field: report(field))
+
+        gated = ("prescore",) if triage else ()
+        resume_tasks = []
+        for resume_id in variants:
+            name = functools.partial(variant_task, resume_id=resume_id)
+            inputs = (name("resume"), "job")
+            if self.fused:
+                resume_tasks += [
+                    Task(name("fit_email"), functools.partial(fit_email, resume_id), inputs + gated,
+                         timeout=self.timeout, progress=stream),
+                    Task(name("fit_eval"), lambda result: result[0], (name("fit_email"),)),
+                    Task(name("email_gen"), email_half, (name("fit_email"),)),
+                ]
+            elif stream:
+                resume_tasks += [
+                    Task(name("fit_eval"), fit_stream, inputs, timeout=self.timeout, progress=True),
+                    Task(name("email_gen"), functools.partial(email, resume_id), inputs + gated,
+                         timeout=self.timeout, progress=True),
+                ]
+            else:
+                resume_tasks += [
+                    Task(name("fit_eval"), lambda resume, job: self.fit_agent.run(resume, job[1]), inputs,
+                         timeout=self.timeout),
+                    Task(name("email_gen"), functools.partial(email, resume_id), inputs + gated, timeout=self.timeout),
+                ]
+
+        checked = ("dedupe",) if dedupe else ()
+        tasks = [Task("scrape", scrape, ("job_input",), timeout=self.timeout)]
+        if dedupe:
+            tasks.append(Task("dedupe", check_duplicate, ("job_input", "scrape")))
+        tasks.append(Task("job", extract, ("job_input", "scrape") + checked, timeout=self.timeout))
+        if triage and resume_ids:
+            resume_inputs = tuple(variant_task("resume", resume_id) for resume_id in variants)
+            tasks.append(Task("prescore", prescore_variants, ("job",) + resume_inputs))
+        elif triage:
+            tasks.append(Task("prescore", lambda resume, job: prescore_fit(resume, job[1]), ("resume", "job")))
+        tasks += resume_tasks
+        tasks += [
+            Task("org_eval", lambda job: self.org_agent.run(*company(job)), ("job",), timeout=self.timeout),
+            Task("recruiter_data", recruiters, ("job",) + gated, timeout=self.timeout),
+        ]
+        return tasks
+
+    def events(self, job_input: str, resume, executor=None, stream: bool = False):
+        """
+        Runs the agent chain and yields scheduler TaskEvents as agents start and finish.
+
+        Args:
+            job_input (str): A job URL or the job listing text.
+            resume (ResumeProfile | dict): The compiled resume, or resume_id -> ResumeProfile to
+                evaluate several variants in one run (see build_tasks).
+            executor (ThreadPoolExecutor): Optional shared pool for the agents.
+            stream (bool): Report fit and email fields as progress events while they generate.
+
+        Yields:
+            TaskEvent: One event per agent state change, in the order they happen.
+
+        The run is traced; the finished Trace is kept in self.last_trace.
+        """
+        initial = {"job_input": job_input}
+        if isinstance(resume, dict):
+            initial.update({variant_task("resume", resume_id): profile for resume_id, profile in resume.items()})
+            resume_ids = list(resume)
+        else:
+            initial["resume"] = resume
+            resume_ids = None
+        # Two agents per resume variant plus the company research run side by side
+        workers = 2 + 2 * (len(resume_ids) if resume_ids else 1)
+        scheduler = DagScheduler(self.build_tasks(stream, resume_ids), max_workers=workers, executor=executor)
+        run_trace, context = start_trace("pipeline", fused=self.fused, triage=self.triage_threshold is not None,
+                                         input_kind="url" if job_input.startswith("http") else "text",
+                                         resume_variants=len(resume_ids) if resume_ids else 1)
+        self.last_trace = run_trace
+        failed, finished = [], False
+        try:
+            for event in scheduler.run(initial, context=context):
+                if event.kind in FINISHED_KINDS and event.kind not in (COMPLETED, SKIPPED):
+                    failed.append(event.task)
+                elif event.kind == SKIPPED and isinstance(event.error, DuplicateJob):
+                    run_trace.root.set(duplicate_of=event.error.match["record_id"])
+                yield event
+            finished = True
+        finally:
+            if failed:
+                run_trace.root.set(failed_tasks=failed)
+            end_trace(run_trace, status=None if finished and not failed else ("error" if failed else "cancelled"))
+
+    def run(self, job_input: str, resume, on_event=None) -> dict:
+        """
+        Runs the agent chain to completion.
+
+        Args:
+            job_input (str): A job URL or the job listing text.
+            resume (ResumeProfile | dict): The compiled resume, or resume_id -> ResumeProfile.
+            on_event (callable): Optional; called with every scheduler TaskEvent, e.g. to report progress.
+
+        Returns:
+            dict: job_text, job_info, fit_eval, email_gen, org_eval, recruiter_data and resume_id.
+                In triage mode also prescore; email_gen and recruiter_data are None for jobs it
+                skipped. With several resumes, variants maps each resume_id to its fit_eval and
+                email_gen, ranking lists them by fit score (see rank_variants), and fit_eval,
+                email_gen and resume_id are those of the best variant.
+                For a posting that is already saved, duplicate_of holds the
+                RecordStore.find_duplicate() match and the agents' results are None.
+
+        Raises:
+            Exception: The error of the first agent that failed or timed out.
+        """
+        result = {}
+        variants = {resume_id: {} for resume_id in resume} if isinstance(resume, dict) else None
+        for event in self.events(job_input, resume):
+            if on_event is not None:
+                on_event(event)
+            task, resume_id = split_task(event.task)
+            target = variants[resume_id] if resume_id is not None else result
+            if event.kind == COMPLETED:
+                if task == "scrape":
+                    result["job_text"] = event.value
+                elif task == "job":
+                    result["job_text"], result["job_info"] = event.value
+                elif task not in ("dedupe", "fit_email"):  # fit_email is published again as fit_eval and email_gen
+                    target[task] = event.value
+            elif event.kind == SKIPPED:
+                if isinstance(event.error, DuplicateJob):
+                    if "duplicate_of" not in result:  # Every later task is skipped with the same error
+                        logging.info(f"Skipping {job_input[:80]!r}: {event.error}")
+                        result["duplicate_of"] = event.error.match
+                else:
+                    logging.info(f"{task_agent(event.task)} skipped: {event.error}")
+                if task not in ("dedupe", "job", "fit_email"):
+                    target[task] = None
+            elif event.kind in FINISHED_KINDS:
+                raise event.error or RuntimeError(f"{task_agent(event.task)} did not complete ({event.kind})")
+
+        if variants is None:
+            result["resume_id"] = getattr(resume, "resume_id", None)
+        else:
+            result["variants"] = variants
+            result["ranking"] = rank_variants(variants)
+            best = result["ranking"][0]["resume_id"] if result["ranking"] else None
+            result["resume_id"] = best
+            for key in ("fit_eval", "email_gen"):
+                result[key] = variants[best].get(key) if best is not None else None
+        job_info = result.get("job_info", {})
+        logging.info(f"Pipeline finished for {job_info.get('company_name') or 'unknown company'}: {job_info.get('Job_Title', '')}")
+        return result
+
+
+def variant_task(task: str, resume_id: str = None) -> str:
+    """Name of a task (or of the "resume" input) for one resume variant, e.g. "fit_eval:backend"."""
+    return task if resume_id is None else f"{task}:{resume_id}"
+
+
+def split_task(task: str) -> tuple:
+    """Splits a scheduler task name into (task, resume_id); resume_id is None for shared tasks."""
+    task, _, resume_id = task.partition(":")
+    return task, resume_id or None
+
+
+def task_agent(task: str) -> str:
+    """Agent shown for a scheduler task in status displays, e.g. "FitEvaluatorAgent [backend]"."""
+    task, resume_id = split_task(task)
+    return f"{TASK_AGENTS[task]} [{resume_id}]" if resume_id else TASK_AGENTS[task]
+
+
+def rank_variants(variants: dict) -> list:
+    """
+    Orders resume variants by their fit evaluation, best first.
+
+    Args:
+        variants (dict): resume_id -> {"fit_eval": ..., "email_gen": ...}.
+
+    Returns:
+        list: {"resume_id", "fit_score"} per variant; variants without a score come last.
+    """
+    scores = {resume_id: (results.get("fit_eval") or {}).get("fit_score") for resume_id, results in variants.items()}
+    ranked = sorted(scores, key=lambda resume_id: (scores[resume_id] is None, -(scores[resume_id] or 0)))
+    return [{"resume_id": resume_id, "fit_score": scores[resume_id]} for resume_id in ranked]
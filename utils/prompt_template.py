@@ -0,0 +1,104 @@
+# utils/prompt_template.py
+"""
+Precompiled prompt templates.
+
+Templates use the f-string syntax the prompts were written for ("{resume}",
+"{{" for a literal brace). A PromptTemplate parses its text once, when the
+prompt module is imported, and checks the variables it finds against the
+declared ones, so a renamed placeholder fails at import rather than on the
+first request. Rendering joins the stored literal parts with the values.
+
+Rendered prompts start with "Human: ", as they did when they were rendered
+through langchain's ChatPromptTemplate, so existing cache keys stay valid.
+"""
+import string
+import threading
+
+from utils.prompt_compaction import minify
+
+ROLE_PREFIX = "Human: "
+
+_formatter = string.Formatter()
+_compiled = {}
+_compiled_lock = threading.Lock()
+
+
+class PromptTemplate:
+    def __init__(self, template: str, variables: tuple = None):
+        """
+        Args:
+            template (str): The prompt text with {variable} placeholders.
+            variables (tuple): The variables the template must use; checked
+                against the placeholders when given.
+
+        Raises:
+            ValueError: If a placeholder uses attribute access, indexing, a
+                format spec or a conversion, or the variables do not match.
+        """
+        self.template = template
+        self._parts = []  # (literal text, variable name or None)
+        found = []
+        for literal, field, spec, conversion in _formatter.parse(template):
+            if field is not None:
+                if not field.isidentifier() or spec or conversion:
+                    raise ValueError(f"Unsupported placeholder {{{field}}} in prompt template")
+                if field not in found:
+                    found.append(field)
+            self._parts.append((literal, field))
+        self.variables = tuple(found)
+        if variables is not None and set(variables) != set(found):
+            raise ValueError(
+                f"Prompt template variables {sorted(found)} do not match the declared {sorted(variables)}"
+            )
+
+    def render(self, input_vars: dict) -> str:
+        """
+        Fills in the template.
+
+        Args:
+            input_vars (dict): Value per variable; values that are not strings
+                are converted with str(). Extra keys are ignored.
+
+        Returns:
+            str: The prompt, prefixed with ROLE_PREFIX.
+
+        Raises:
+            KeyError: If a variable has no value.
+        """
+        missing = [name for name in self.variables if name not in input_vars]
+        if missing:
+            raise KeyError(f"Prompt template is missing variables: {', '.join(missing)}")
+        pieces = [ROLE_PREFIX]
+        for literal, field in self._parts:
+            pieces.append(literal)
+            if field is not None:
+                value = input_vars[field]
+                pieces.append(value if isinstance(value, str) else str(value))
+        return "".join(pieces)
+
+    def __str__(self) -> str:
+        return self.template
+
+
+def compile_template(template) -> PromptTemplate:
+    """
+    Returns the compiled form of a template, compiling a plain string only once per process.
+
+    Args:
+        template (PromptTemplate | str): A compiled template or its text.
+
+    Returns:
+        PromptTemplate: The compiled template.
+    """
+    if isinstance(template, PromptTemplate):
+        return template
+    compiled = _compiled.get(template)
+    if compiled is None:
+        with _compiled_lock:
+            compiled = _compiled.setdefault(template, PromptTemplate(template))
+    return compiled
+
+
+def schema_text(schema) -> str:
+    """Serializes a response schema once, in the form compact_inputs() would produce for it."""
+    return minify(schema)
@@ -0,0 +1,616 @@
+# utils/record_store.py
+"""
+Application record store on SQLite.
+
+Records are appended to one indexed table, so a save is a single INSERT
+instead of a rewrite of the whole workbook. Excel is still supported at the
+edges: a one-shot importer for the old job_application_records.xlsx and an
+xlsx/CSV export for people who want spreadsheets.
+
+Every record is also indexed by a posting fingerprint (utils/job_fingerprint.py),
+so a repost of a saved job can be recognized before it is run again.
+
+Usage:
+    python -m utils.record_store import job_application_records.xlsx
+    python -m utils.record_store export records.csv
+"""
+import argparse
+import datetime
+import json
+import logging
+import re
+import sqlite3
+
+from config import DEDUPE_MAX_DISTANCE, EXCEL_DB_PATH, RECORD_DB_PATH
+from utils.job_fingerprint import fingerprint_job, hamming_distance
+from utils.logger import span
+from utils.sqlite_db import ThreadLocalConnection
+
+# Record keys (also the spreadsheet headers) -> table columns
+RECORD_COLUMNS = {
+    "Date Saved": "date_saved",
+    "Job_Title": "job_title",
+    "job_id": "job_id",
+    "company_name": "company_name",
+    "location": "location",
+    "location_country": "location_country",
+    "job_url": "job_url",
+    "fit_score": "fit_score",
+    "fit_matched_skills": "fit_matched_skills",
+    "fit_missing_skills": "fit_missing_skills",
+    "fit_summary": "fit_summary",
+    "email_cold_subject": "email_cold_subject",
+    "email_cold_body": "email_cold_body",
+    "cover_letter_body": "cover_letter_body",
+    "linkedin_message_recruiter": "linkedin_message_recruiter",
+    "linkedin_message_referrer": "linkedin_message_referrer",
+    "org_company_name": "org_company_name",
+    "org_company_location": "org_company_location",
+    "org_company_size": "org_company_size",
+    "org_avg_salary_se": "org_avg_salary_se",
+    "org_recent_layoffs": "org_recent_layoffs",
+    "recruiter_linkedin_urls": "recruiter_linkedin_urls",
+    "is_applied": "is_applied",
+    "resume_id": "resume_id",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS applications (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date_saved TEXT NOT NULL,
+    job_title TEXT,
+    job_id TEXT,
+    company_name TEXT,
+    location TEXT,
+    location_country TEXT,
+    job_url TEXT,
+    fit_score REAL,
+    fit_matched_skills TEXT,
+    fit_missing_skills TEXT,
+    fit_summary TEXT,
+    email_cold_subject TEXT,
+    email_cold_body TEXT,
+    cover_letter_body TEXT,
+    linkedin_message_recruiter TEXT,
+    linkedin_message_referrer TEXT,
+    org_company_name TEXT,
+    org_company_location TEXT,
+    org_company_size TEXT,
+    org_avg_salary_se TEXT,
+    org_recent_layoffs TEXT,
+    recruiter_linkedin_urls TEXT NOT NULL DEFAULT '[]',
+    is_applied INTEGER NOT NULL DEFAULT 0,
+    resume_id TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_applications_job_id ON applications (job_id);
+CREATE INDEX IF NOT EXISTS idx_applications_company ON applications (company_name);
+CREATE INDEX IF NOT EXISTS idx_applications_country ON applications (location_country);
+CREATE INDEX IF NOT EXISTS idx_applications_date ON applications (date_saved);
+CREATE INDEX IF NOT EXISTS idx_applications_applied ON applications (is_applied);
+CREATE INDEX IF NOT EXISTS idx_applications_fit ON applications (fit_score);
+CREATE TABLE IF NOT EXISTS store_meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO store_meta (key, value) VALUES ('version', 0);
+-- Every write bumps the version so readers can cache query results per version
+CREATE TRIGGER IF NOT EXISTS trg_applications_version_ins AFTER INSERT ON applications BEGIN
+    UPDATE store_meta SET value = value + 1 WHERE key = 'version';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_applications_version_upd AFTER UPDATE ON applications BEGIN
+    UPDATE store_meta SET value = value + 1 WHERE key = 'version';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_applications_version_del AFTER DELETE ON applications BEGIN
+    UPDATE store_meta SET value = value + 1 WHERE key = 'version';
+END;
+-- Posting fingerprints (see utils/job_fingerprint.py) for duplicate detection
+CREATE TABLE IF NOT EXISTS job_fingerprints (
+    record_id INTEGER PRIMARY KEY,
+    simhash INTEGER
+);
+CREATE TABLE IF NOT EXISTS job_fingerprint_keys (
+    key TEXT NOT NULL,
+    record_id INTEGER NOT NULL,
+    PRIMARY KEY (key, record_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_fingerprint_keys_record ON job_fingerprint_keys (record_id);
+CREATE TRIGGER IF NOT EXISTS trg_applications_fingerprint_del AFTER DELETE ON applications BEGIN
+    DELETE FROM job_fingerprints WHERE record_id = old.id;
+    DELETE FROM job_fingerprint_keys WHERE record_id = old.id;
+END;
+"""
+
+# Columns added after the first release -> their definition, for _migrate()
+_ADDED_COLUMNS = {
+    "resume_id": "TEXT",
+}
+
+# Columns covered by full-text search
+FTS_COLUMNS = (
+    "job_title", "company_name", "location", "fit_matched_skills", "fit_missing_skills", "fit_summary",
+    "email_cold_subject", "email_cold_body", "cover_letter_body", "org_company_name",
+)
+_FTS_SCHEMA = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS applications_fts USING fts5(
+    {", ".join(FTS_COLUMNS)}, content='applications', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS trg_applications_fts_ins AFTER INSERT ON applications BEGIN
+    INSERT INTO applications_fts (rowid, {", ".join(FTS_COLUMNS)})
+    VALUES (new.id, {", ".join("new." + c for c in FTS_COLUMNS)});
+END;
+CREATE TRIGGER IF NOT EXISTS trg_applications_fts_del AFTER DELETE ON applications BEGIN
+    INSERT INTO applications_fts (applications_fts, rowid, {", ".join(FTS_COLUMNS)})
+    VALUES ('delete', old.id, {", ".join("old." + c for c in FTS_COLUMNS)});
+END;
+CREATE TRIGGER IF NOT EXISTS trg_applications_fts_upd AFTER UPDATE OF {", ".join(FTS_COLUMNS)} ON applications BEGIN
+    INSERT INTO applications_fts (applications_fts, rowid, {", ".join(FTS_COLUMNS)})
+    VALUES ('delete', old.id, {", ".join("old." + c for c in FTS_COLUMNS)});
+    INSERT INTO applications_fts (rowid, {", ".join(FTS_COLUMNS)})
+    VALUES (new.id, {", ".join("new." + c for c in FTS_COLUMNS)});
+END;
+"""
+
+_INT64_MAX = (1 << 63) - 1
+_UINT64_MASK = (1 << 64) - 1
+
+_COLUMN_TO_KEY = {column: key for key, column in RECORD_COLUMNS.items()}
+_INSERT_SQL = (
+    f"INSERT INTO applications ({', '.join(RECORD_COLUMNS.values())}) "
+    f"VALUES ({', '.join('?' for _ in RECORD_COLUMNS)})"
+)
+
+
+def build_application_record(job_info, fit_eval, email_gen, org_eval, recruiter_data, resume_id: str = None) -> dict:
+    """
+    Flattens the outputs of the agent chain into a single application record row.
+
+    Args:
+        job_info (dict): Output of JobInfoExtractor.
+        fit_eval (dict): Output of FitEvaluatorAgent.
+        email_gen (dict): Output of EmailGeneratorAgent.
+        org_eval (dict): Output of OrgEvaluatorAgent (may be None).
+        recruiter_data (list): Recruiter profile URLs from GetRecruiterAgent (may be None).
+        resume_id (str): The resume variant the fit evaluation and messages were written for.
+
+    Returns:
+        dict: A record whose keys are the spreadsheet headers.
+    """
+    fit_eval = fit_eval or {}
+    email_gen = email_gen or {}
+    org_report = (org_eval or {}).get("company_research_report", {})
+    return {
+        "Date Saved": datetime.date.today().isoformat(),
+        "Job_Title": job_info.get("Job_Title", ""),
+        "job_id": job_info.get("job_id", ""),
+        "company_name": job_info.get("company_name", ""),
+        "location": job_info.get("location", ""),
+        "location_country": job_info.get("location_country", ""),
+        "job_url": job_info.get("job_url", ""),
+        "fit_score": fit_eval.get("fit_score", None),
+        "fit_matched_skills": ", ".join(fit_eval.get("matched_skills", [])),
+        "fit_missing_skills": ", ".join(fit_eval.get("missing_skills", [])),
+        "fit_summary": fit_eval.get("summary", ""),
+        "email_cold_subject": email_gen.get("cold email", {}).get("subject", ""),
+        "email_cold_body": email_gen.get("cold email", {}).get("body", ""),
+        "cover_letter_body": email_gen.get("cover letter", {}).get("body", ""),
+        "linkedin_message_recruiter": email_gen.get("linkdin_networking_message_recruiter", {}).get("body", ""),
+        "linkedin_message_referrer": email_gen.get("linkdin_networking_message_referrer", {}).get("body", ""),
+        "org_company_name": org_report.get("company_name", ""),
+        "org_company_location": org_report.get("company_location", ""),
+        "org_company_size": org_report.get("company_size", ""),
+        "org_avg_salary_se": org_report.get("company_average_salary_software_engineer", ""),
+        "org_recent_layoffs": org_report.get("recent_layoffs", ""),
+        "recruiter_linkedin_urls": json.dumps(recruiter_data) if recruiter_data else "[]",  # Store as JSON string
+        "is_applied": False,  # Default to False, can be updated later
+        "resume_id": resume_id,
+    }
+
+
+def _clean_value(value):
+    # Spreadsheet imports hand us NaN/NaT for empty cells and Timestamps for dates
+    if value is None or value != value:
+        return None
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.date().isoformat() if isinstance(value, datetime.datetime) else value.isoformat()
+    if hasattr(value, "item"):  # numpy scalars
+        return value.item()
+    return value
+
+
+def _to_signed(value: int) -> int:
+    # SQLite integers are signed 64-bit; fingerprints are stored in two's complement
+    return value - (1 << 64) if value is not None and value > _INT64_MAX else value
+
+
+def _record_to_row(record: dict) -> tuple:
+    row = []
+    for key in RECORD_COLUMNS:
+        value = _clean_value(record.get(key))
+        if key == "is_applied":
+            value = 1 if value in (True, 1, "True", "true", "TRUE", "1") else 0
+        elif key == "Date Saved" and not value:
+            value = datetime.date.today().isoformat()
+        elif key == "recruiter_linkedin_urls" and not value:
+            value = "[]"
+        elif key == "fit_score" and value is not None:
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                value = None
+        row.append(value)
+    return tuple(row)
+
+
+class RecordStore:
+    def __init__(self, path: str = RECORD_DB_PATH):
+        """
+        Args:
+            path (str): Path of the SQLite database file.
+        """
+        self.path = path
+        self.has_fts = True
+        self._db = ThreadLocalConnection(path, _SCHEMA, on_connect=self._set_up)
+
+    def _conn(self):
+        return self._db.get()
+
+    def _set_up(self, conn):
+        self._migrate(conn)
+        self._setup_fts(conn)
+        self._index_existing_records(conn)
+
+    @staticmethod
+    def _migrate(conn):
+        # Stores created before a column existed get it added; CREATE TABLE IF NOT EXISTS leaves them as they are
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(applications)")}
+        for column, ddl in _ADDED_COLUMNS.items():
+            if column not in columns:
+                try:
+                    conn.execute(f"ALTER TABLE applications ADD COLUMN {column} {ddl}")
+                except sqlite3.OperationalError as e:
+                    if "duplicate column" not in str(e):
+                        raise  # Otherwise another process added it first
+                    continue
+                logging.info(f"Added column {column} to the record store.")
+
+    def _setup_fts(self, conn):
+        try:
+            conn.executescript(_FTS_SCHEMA)
+        except sqlite3.OperationalError as e:
+            # SQLite built without FTS5: search falls back to LIKE
+            logging.warning(f"Full-text search unavailable, using LIKE search: {e}")
+            self.has_fts = False
+            return
+        # Index rows written before the FTS table existed (e.g. older stores)
+        if conn.execute("SELECT 1 FROM store_meta WHERE key = 'fts_built'").fetchone() is None:
+            conn.execute("INSERT INTO applications_fts (applications_fts) VALUES ('rebuild')")
+            conn.execute("INSERT OR IGNORE INTO store_meta (key, value) VALUES ('fts_built', 1)")
+
+    def _index_existing_records(self, conn):
+        # Rows saved before fingerprints existed get their URL and job id keys; their text was never stored
+        if conn.execute("SELECT 1 FROM store_meta WHERE key = 'fingerprints_built'").fetchone() is not None:
+            return
+        rows = conn.execute(
+            "SELECT id, job_url, job_id, company_name FROM applications "
+            "WHERE id NOT IN (SELECT record_id FROM job_fingerprints)"
+        ).fetchall()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for record_id, job_url, job_id, company_name in rows:
+                record = {"job_url": job_url, "job_id": job_id, "company_name": company_name}
+                self._add_fingerprint(conn, record_id, record)
+            conn.execute("INSERT OR IGNORE INTO store_meta (key, value) VALUES ('fingerprints_built', 1)")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def _add_fingerprint(conn, record_id: int, record: dict, fingerprint=None):
+        # The record's own URL and job id are always indexed; the run's fingerprint adds the input URL and text
+        keys = list(fingerprint_job(job_info=record).keys) + (fingerprint.lookup_keys() if fingerprint else [])
+        simhash = fingerprint.simhash if fingerprint else None
+        conn.execute(
+            "INSERT OR REPLACE INTO job_fingerprints (record_id, simhash) VALUES (?, ?)",
+            (record_id, _to_signed(simhash)),
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO job_fingerprint_keys (key, record_id) VALUES (?, ?)",
+            [(key, record_id) for key in dict.fromkeys(keys)],
+        )
+
+    def version(self) -> int:
+        """Monotonic counter bumped by every write, for caching reads."""
+        return self._conn().execute("SELECT value FROM store_meta WHERE key = 'version'").fetchone()[0]
+
+    @staticmethod
+    def _records(cursor) -> list:
+        keys = [_COLUMN_TO_KEY.get(d[0], d[0]) for d in cursor.description]
+        records = []
+        for row in cursor:
+            record = dict(zip(keys, row))
+            record["is_applied"] = bool(record.get("is_applied"))
+            records.append(record)
+        return records
+
+    def append(self, record: dict, fingerprint=None) -> int:
+        """
+        Appends one record and returns its id.
+
+        Args:
+            record (dict): The record.
+            fingerprint (JobFingerprint): Fingerprint of the run that produced it, indexed with the record.
+        """
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            record_id = conn.execute(_INSERT_SQL, _record_to_row(record)).lastrowid
+            self._add_fingerprint(conn, record_id, record, fingerprint)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return record_id
+
+    def append_many(self, records: list, fingerprints: list = None) -> int:
+        """
+        Appends many records in one transaction and returns how many were written.
+
+        Args:
+            records (list): The records.
+            fingerprints (list): Optional fingerprint per record. When given, a record whose
+                posting is already saved, or comes earlier in records, is not written.
+        """
+        conn = self._conn()
+        written = 0
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for i, record in enumerate(records):
+                fingerprint = fingerprints[i] if fingerprints else None
+                if fingerprint is not None and self.find_duplicate(fingerprint) is not None:
+                    continue
+                record_id = conn.execute(_INSERT_SQL, _record_to_row(record)).lastrowid
+                self._add_fingerprint(conn, record_id, record, fingerprint)
+                written += 1
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return written
+
+    def find_duplicate(self, fingerprint, max_distance: int = DEDUPE_MAX_DISTANCE) -> dict:
+        """
+        Finds a saved record of the same posting.
+
+        A shared canonical URL or company + job id is a match outright. Otherwise
+        records sharing a SimHash band with the fingerprint are compared bit by bit.
+
+        Args:
+            fingerprint (JobFingerprint): Fingerprint of the new posting.
+            max_distance (int): Most differing SimHash bits still counted as the same posting.
+
+        Returns:
+            dict: {"record_id", "matched_on" ("url", "job" or "text"), "distance"} for the
+                newest matching record (distance is None for key matches), or None.
+        """
+        keys = fingerprint.lookup_keys()
+        if not keys:
+            return None
+        rows = self._conn().execute(
+            "SELECT k.key, k.record_id, f.simhash FROM job_fingerprint_keys k "
+            "LEFT JOIN job_fingerprints f ON f.record_id = k.record_id "
+            f"WHERE k.key IN ({', '.join('?' for _ in keys)}) ORDER BY k.record_id DESC",
+            keys,
+        ).fetchall()
+        for key, record_id, _ in rows:
+            kind = key.split(":", 1)[0]
+            if kind in ("url", "job"):
+                return {"record_id": record_id, "matched_on": kind, "distance": None}
+        best = None
+        for _, record_id, stored in rows:
+            if stored is None or fingerprint.simhash is None:
+                continue
+            distance = hamming_distance(fingerprint.simhash, stored & _UINT64_MASK)
+            if distance <= max_distance and (best is None or distance < best["distance"]):
+                best = {"record_id": record_id, "matched_on": "text", "distance": distance}
+        return best
+
+    def get(self, record_id: int) -> dict:
+        records = self._records(self._conn().execute("SELECT * FROM applications WHERE id = ?", (record_id,)))
+        return records[0] if records else None
+
+    def mark_applied(self, record_id: int, applied: bool = True):
+        self._conn().execute("UPDATE applications SET is_applied = ? WHERE id = ?", (int(applied), record_id))
+
+    def count(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM applications").fetchone()[0]
+
+    def countries(self) -> list:
+        """Distinct countries with saved records, with blanks reported as 'Other'."""
+        rows = self._conn().execute(
+            "SELECT DISTINCT COALESCE(NULLIF(location_country, ''), 'Other') AS country "
+            "FROM applications ORDER BY country"
+        ).fetchall()
+        return [r[0] for r in rows]
+
+    def query(self, country: str = None, company: str = None, date_from: str = None, date_to: str = None,
+              fit_min: float = None, fit_max: float = None, applied: bool = None, search: str = None,
+              page: int = 1, page_size: int = 20) -> tuple:
+        """
+        Filters, sorts (newest first) and paginates records inside SQLite.
+
+        Args:
+            country (str): Exact location_country; "Other" matches records without one.
+            company (str): Case-insensitive substring of the company name.
+            date_from (str): Earliest Date Saved, ISO format, inclusive.
+            date_to (str): Latest Date Saved, ISO format, inclusive.
+            fit_min (float): Minimum fit score, inclusive.
+            fit_max (float): Maximum fit score, inclusive.
+            applied (bool): Only applied (True) or not yet applied (False) records.
+            search (str): Full-text search over titles, skills, summaries and messages.
+            page (int): 1-based page number.
+            page_size (int): Records per page.
+
+        Returns:
+            tuple: (records on the requested page, total number of matching records)
+        """
+        where, params = [], []
+        if country == "Other":
+            where.append("COALESCE(location_country, '') IN ('', 'Other')")
+        elif country:
+            where.append("location_country = ?")
+            params.append(country)
+        if company:
+            where.append("company_name LIKE ? ESCAPE '\\'")
+            params.append("%" + re.sub(r"([%_\\])", r"\\\1", company.strip()) + "%")
+        if date_from:
+            where.append("date_saved >= ?")
+            params.append(str(date_from))
+        if date_to:
+            where.append("date_saved <= ?")
+            params.append(str(date_to))
+        if fit_min is not None:
+            where.append("fit_score >= ?")
+            params.append(fit_min)
+        if fit_max is not None:
+            where.append("fit_score <= ?")
+            params.append(fit_max)
+        if applied is not None:
+            where.append("is_applied = ?")
+            params.append(int(applied))
+        tokens = re.findall(r"\w+", search or "")
+        if tokens and self.has_fts:
+            where.append("id IN (SELECT rowid FROM applications_fts WHERE applications_fts MATCH ?)")
+            params.append(" ".join(f'"{t}"*' for t in tokens))
+        elif tokens:
+            for token in tokens:
+                where.append("(" + " OR ".join(f"{c} LIKE ?" for c in FTS_COLUMNS) + ")")
+                params.extend([f"%{token}%"] * len(FTS_COLUMNS))
+
+        where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+        conn = self._conn()
+        total = conn.execute(f"SELECT COUNT(*) FROM applications {where_sql}", params).fetchone()[0]
+        offset = max(page - 1, 0) * page_size
+        records = self._records(conn.execute(
+            f"SELECT * FROM applications {where_sql} "
+            f"ORDER BY date_saved DESC, id DESC LIMIT ? OFFSET ?",
+            params + [page_size, offset],
+        ))
+        return records, total
+
+    def all_records(self) -> list:
+        return self._records(self._conn().execute("SELECT * FROM applications ORDER BY id"))
+
+    def excel_imported(self) -> bool:
+        """Whether the legacy workbook has already been imported into this store."""
+        return self._conn().execute("SELECT 1 FROM store_meta WHERE key = 'excel_imported'").fetchone() is not None
+
+    def import_excel(self, xlsx_path: str = EXCEL_DB_PATH, force: bool = False) -> int:
+        """
+        One-shot import of the legacy workbook (one sheet per country).
+
+        Each row is fingerprinted by its URL and company + job id, so rows of postings
+        that are already saved (or repeated in the workbook) are skipped. The import is
+        recorded in store_meta and later calls do nothing unless forced.
+
+        Args:
+            xlsx_path (str): Path of the workbook written by earlier versions.
+            force (bool): Import again even if the workbook was imported before.
+
+        Returns:
+            int: The number of records imported.
+        """
+        import pandas as pd
+
+        if not force and self.excel_imported():
+            logging.info(f"{xlsx_path} was already imported into {self.path}; skipping.")
+            return 0
+        sheets = pd.read_excel(xlsx_path, sheet_name=None, engine="openpyxl")
+        records = []
+        for sheet_name, df in sheets.items():
+            for record in df.to_dict(orient="records"):
+                record = {key: _clean_value(value) for key, value in record.items()}
+                if record.get("location_country") in (None, ""):
+                    record["location_country"] = "" if sheet_name == "Other" else sheet_name
+                records.append(record)
+        count = self.append_many(records, [fingerprint_job(job_info=record) for record in records])
+        self._conn().execute("INSERT OR IGNORE INTO store_meta (key, value) VALUES ('excel_imported', 1)")
+        if count < len(records):
+            logging.info(f"Imported {count} record(s) from {xlsx_path} into {self.path}; "
+                         f"{len(records) - count} already saved.")
+        else:
+            logging.info(f"Imported {count} record(s) from {xlsx_path} into {self.path}")
+        return count
+
+    def export(self, out_path: str) -> int:
+        """
+        Exports all records to .xlsx (one sheet per country, like the old workbook) or .csv.
+
+        Args:
+            out_path (str): Destination file; the extension selects the format.
+
+        Returns:
+            int: The number of records exported.
+        """
+        import pandas as pd
+
+        records = [{k: v for k, v in r.items() if k != "id"} for r in self.all_records()]
+        df = pd.DataFrame(records, columns=list(RECORD_COLUMNS))
+        if out_path.endswith(".csv"):
+            df.to_csv(out_path, index=False)
+        elif out_path.endswith(".xlsx"):
+            sheet_of = df["location_country"].fillna("").replace("", "Other")
+            with pd.ExcelWriter(out_path, engine="openpyxl") as writer:
+                for sheet_name, sheet_df in df.groupby(sheet_of, sort=True):
+                    sheet_df.to_excel(writer, sheet_name=str(sheet_name)[:31], index=False)
+        else:
+            raise ValueError(f"Unsupported export format: {out_path} (use .xlsx or .csv)")
+        return len(records)
+
+
+def save_application_records(records: list, path: str = RECORD_DB_PATH, fingerprints: list = None) -> int:
+    """
+    Appends records to the record store in a single transaction.
+
+    Args:
+        records (list): Records produced by build_application_record.
+        path (str): Path of the record store.
+        fingerprints (list): Optional fingerprint per record; records of postings
+            that are already saved are skipped.
+
+    Returns:
+        int: The number of records written.
+    """
+    if not records:
+        return 0
+    with span("save", records=len(records)) as save_span:
+        count = RecordStore(path).append_many(records, fingerprints)
+        save_span.set(duplicates=len(records) - count)
+    if count < len(records):
+        logging.info(f"Saved {count} record(s) to {path}; {len(records) - count} duplicate(s) of saved postings skipped.")
+    else:
+        logging.info(f"Saved {count} record(s) to {path}.")
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import or export application records.")
+    parser.add_argument("--db", default=RECORD_DB_PATH, help="Record store path")
+    sub = parser.add_subparsers(dest="command", required=True)
+    import_cmd = sub.add_parser("import", help="Import records from the legacy Excel workbook")
+    import_cmd.add_argument("path", nargs="?", default=EXCEL_DB_PATH)
+    import_cmd.add_argument("--force", action="store_true", help="Import again even if already imported")
+    export_cmd = sub.add_parser("export", help="Export records to .xlsx or .csv")
+    export_cmd.add_argument("path")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    store = RecordStore(args.db)
+    if args.command == "import":
+        print(f"Imported {store.import_excel(args.path, force=args.force)} record(s) into {args.db}")
+    else:
+        print(f"Exported {store.export(args.path)} record(s) to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# utils/resume_service.py
+"""
+Shared, precompiled resume.
+
+get_resume() parses data/resume.json once and keeps a ResumeProfile per
+path. Each call only stats the file; when its mtime or size changes the file
+is re-read, and it is re-compiled only if the content hash changed. Agents
+use the precomputed prompt text and skill set instead of serializing the
+resume dict for every job.
+
+Resume variants (say backend.json, ml.json and fullstack.json) live in
+data/resumes/; get_resume_variants() compiles each one the same way, keyed
+by its file name without the extension, the resume_id stored with records.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+
+from utils.prompt_compaction import minify, prune
+
+DEFAULT_RESUME_PATH = "data/resume.json"
+RESUME_VARIANTS_DIR = "data/resumes"
+
+_profiles = {}  # path -> (mtime_ns, size, ResumeProfile)
+_lock = threading.Lock()
+
+
+def normalize_skill(skill: str) -> list:
+    """
+    Splits and normalizes a resume skill entry.
+
+    "AWS (EC2, Lambda, S3)" becomes ["aws", "ec2", "lambda", "s3"] and
+    "JavaScript (ES6+)" becomes ["javascript", "es6+"].
+
+    Args:
+        skill (str): One entry of a technical_skills list.
+
+    Returns:
+        list: Lowercase skill names.
+    """
+    parts = re.split(r"[(),/]|\band\b", skill)
+    return [p for p in (re.sub(r"\s+", " ", p).strip(" .").lower() for p in parts) if p]
+
+
+class ResumeProfile:
+    def __init__(self, data: dict, path: str = None, content_hash: str = None):
+        """
+        Prompt-ready forms of a parsed resume, computed once.
+
+        Args:
+            data (dict): The parsed resume JSON.
+            path (str): The file it was loaded from.
+            content_hash (str): sha256 of the file content.
+
+        Attributes:
+            prompt_text (str): Minified resume JSON without empty fields.
+            skills (frozenset): Normalized skills from technical_skills.
+        """
+        self.data = data
+        self.path = path
+        self.content_hash = content_hash
+        self.prompt_text = minify(prune(data))
+        skills = set()
+        for entries in (data.get("technical_skills") or {}).values():
+            for entry in entries if isinstance(entries, list) else [entries]:
+                skills.update(normalize_skill(str(entry)))
+        self.skills = frozenset(skills)
+
+    @property
+    def name(self) -> str:
+        return self.data.get("name", "")
+
+    @property
+    def resume_id(self) -> str:
+        """File name without the extension, e.g. "backend" for data/resumes/backend.json."""
+        return os.path.splitext(os.path.basename(self.path))[0] if self.path else ""
+
+    def __bool__(self):
+        return bool(self.data)
+
+    def __repr__(self):
+        return f"ResumeProfile({self.path!r}, {len(self.skills)} skills, {self.content_hash and self.content_hash[:10]})"
+
+
+def get_resume(path: str = DEFAULT_RESUME_PATH) -> ResumeProfile:
+    """
+    Returns the compiled resume for a file, reloading it if the file changed.
+
+    Args:
+        path (str): Path of the resume JSON file.
+
+    Returns:
+        ResumeProfile: The shared profile for this file.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+    """
+    stat = os.stat(path)
+    with _lock:
+        entry = _profiles.get(path)
+        if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            return entry[2]
+
+        with open(path, "rb") as f:
+            content = f.read()
+        content_hash = hashlib.sha256(content).hexdigest()
+        if entry and entry[2].content_hash == content_hash:
+            profile = entry[2]  # Touched but unchanged
+        else:
+            profile = ResumeProfile(json.loads(content), path=path, content_hash=content_hash)
+            logging.info(f"Loaded resume {path} ({content_hash[:10]}, {len(profile.skills)} skills)")
+        _profiles[path] = (stat.st_mtime_ns, stat.st_size, profile)
+        return profile
+
+
+def get_resume_variants(directory: str = RESUME_VARIANTS_DIR) -> dict:
+    """
+    Returns the compiled resume of every variant in a directory.
+
+    Args:
+        directory (str): Directory holding one resume JSON file per variant.
+
+    Returns:
+        dict: resume_id -> ResumeProfile, sorted by resume_id; empty if the directory does not exist.
+    """
+    if not os.path.isdir(directory):
+        return {}
+    variants = {}
+    for file_name in sorted(os.listdir(directory)):
+        if file_name.endswith(".json"):
+            profile = get_resume(os.path.join(directory, file_name))
+            variants[profile.resume_id] = profile
+    return variants
+
+
+def resume_prompt_text(resume) -> str:
+    """Prompt text of a ResumeProfile, or of a plain resume dict."""
+    if isinstance(resume, ResumeProfile):
+        return resume.prompt_text
+    return resume if isinstance(resume, str) else minify(prune(resume))
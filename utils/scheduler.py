@@ -0,0 +1,235 @@
+# utils/scheduler.py
+"""
+Dependency-aware task scheduler for the agent chain.
+
+Each Task names the inputs it needs (initial values or other tasks' outputs).
+A task starts as soon as all of its inputs are available, runs on a thread
+pool with its own timeout, and completion events are reported in the order
+they happen, so the caller can show a finished fit evaluation while a slow
+research call is still running.
+"""
+import contextvars
+import logging
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.logger import span
+
+# Event kinds
+STARTED = "started"
+COMPLETED = "completed"
+FAILED = "failed"
+TIMEOUT = "timeout"
+CANCELLED = "cancelled"
+SKIPPED = "skipped"
+PROGRESS = "progress"
+
+FINISHED_KINDS = (COMPLETED, FAILED, TIMEOUT, CANCELLED, SKIPPED)
+
+
+class SkipTask(Exception):
+    """Raised by a task to mark itself skipped; its dependents are skipped too."""
+
+
+class Task:
+    def __init__(self, name: str, fn, inputs: tuple = (), timeout: float = None, progress: bool = False):
+        """
+        Args:
+            name (str): Unique task name; its output is published under this name.
+            fn (callable): Called with the values of `inputs`, positionally, in order.
+            inputs (tuple): Names of initial values or upstream tasks this task needs.
+            timeout (float): Seconds the task may run before it is reported as timed out.
+            progress (bool): Also pass fn a `report` keyword argument; each report(payload)
+                call is delivered as a "progress" event while the task runs.
+        """
+        self.name = name
+        self.fn = fn
+        self.inputs = tuple(inputs)
+        self.timeout = timeout
+        self.progress = progress
+
+
+class TaskEvent:
+    def __init__(self, kind: str, task: str, value=None, error: Exception = None, elapsed: float = 0.0):
+        self.kind = kind
+        self.task = task
+        self.value = value
+        self.error = error
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        return f"TaskEvent({self.kind!r}, {self.task!r}, elapsed={self.elapsed:.2f})"
+
+
+class DagScheduler:
+    def __init__(self, tasks: list, max_workers: int = 4, executor: ThreadPoolExecutor = None,
+                 queue_timeout: float = None):
+        """
+        Args:
+            tasks (list): Tasks to run. Inputs that are not task names must be
+                supplied as initial values to run().
+            max_workers (int): Size of the thread pool when no executor is given.
+            executor (ThreadPoolExecutor): Optional shared pool; it is not shut down by the scheduler.
+            queue_timeout (float): Optional seconds a task may wait for a free worker before it
+                is reported as timed out. A task's own timeout starts when it starts running.
+        """
+        self.tasks = {t.name: t for t in tasks}
+        if len(self.tasks) != len(tasks):
+            raise ValueError("Task names must be unique")
+        self.max_workers = max_workers
+        self.executor = executor
+        self.queue_timeout = queue_timeout
+        self.results = {}
+        self.errors = {}
+        self._cancelled = False
+        self._events = None
+
+    def cancel(self):
+        """Stops scheduling new tasks; results of running tasks are discarded."""
+        self._cancelled = True
+        events = self._events
+        if events is not None:
+            events.put(TaskEvent(CANCELLED, None))  # Wakes run() if it is waiting for an event
+
+    def run(self, initial: dict = None, context: contextvars.Context = None):
+        """
+        Runs the DAG and yields TaskEvents as they happen.
+
+        Args:
+            initial (dict): Values for inputs that are not produced by a task.
+            context (contextvars.Context): Context the tasks run in (each in its own
+                copy); defaults to the caller's.
+
+        Yields:
+            TaskEvent: started/progress/completed/failed/timeout/cancelled/skipped events.
+        """
+        values = dict(initial or {})
+        missing = {i for t in self.tasks.values() for i in t.inputs if i not in self.tasks and i not in values}
+        if missing:
+            raise ValueError(f"Missing initial values for: {', '.join(sorted(missing))}")
+
+        own_executor = self.executor is None
+        executor = self.executor or ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="dag")
+        events = queue.Queue()
+        self._events = events
+        pending = dict(self.tasks)
+        running = {}  # name -> (future, deadline, started)
+
+        def _worker(task, args):
+            started = time.perf_counter()
+            events.put(TaskEvent(STARTED, task.name))
+            try:
+                skip = None
+                with span(task.name, kind="task") as task_span:
+                    try:
+                        if task.progress:
+                            report = lambda payload: events.put(TaskEvent(PROGRESS, task.name, value=payload))
+                            value = task.fn(*args, report=report)
+                        else:
+                            value = task.fn(*args)
+                    except SkipTask as e:
+                        skip = e  # A skip is a decision, not a failed span
+                        task_span.set(skipped=str(e))
+                if skip is not None:
+                    raise skip
+                events.put(TaskEvent(COMPLETED, task.name, value=value, elapsed=time.perf_counter() - started))
+            except SkipTask as e:
+                events.put(TaskEvent(SKIPPED, task.name, error=e, elapsed=time.perf_counter() - started))
+            except Exception as e:
+                events.put(TaskEvent(FAILED, task.name, error=e, elapsed=time.perf_counter() - started))
+
+        def _finish_dependents(name, kind, reason):
+            # Everything downstream of a task that did not complete can never run
+            finished = []
+            for dep_name in [n for n, t in pending.items() if name in t.inputs]:
+                if dep_name in pending:
+                    del pending[dep_name]
+                    self.errors[dep_name] = reason
+                    finished.append(TaskEvent(kind, dep_name, error=reason))
+                    finished.extend(_finish_dependents(dep_name, kind, reason))
+            return finished
+
+        try:
+            while pending or running:
+                if self._cancelled:
+                    for name in list(pending) + list(running):
+                        if name in running:
+                            running[name][0].cancel()
+                        yield TaskEvent(CANCELLED, name)
+                    pending.clear()
+                    running.clear()
+                    break
+
+                for name, task in list(pending.items()):
+                    if all(i in values for i in task.inputs):
+                        del pending[name]
+                        ctx = context.copy() if context is not None else contextvars.copy_context()
+                        future = executor.submit(ctx.run, _worker, task, [values[i] for i in task.inputs])
+                        # Until the task starts, only the optional queue-wait limit applies
+                        deadline = time.monotonic() + self.queue_timeout if self.queue_timeout else None
+                        running[name] = (future, deadline, False)
+
+                if not running:
+                    # Nothing can make progress: remaining tasks wait on inputs that will never arrive
+                    for name in list(pending):
+                        yield TaskEvent(CANCELLED, name, error=RuntimeError("Unsatisfiable inputs"))
+                    pending.clear()
+                    break
+
+                deadlines = [d for _, d, _ in running.values() if d is not None]
+                wait = max(min(deadlines) - time.monotonic(), 0) if deadlines else None
+                try:
+                    event = events.get(timeout=wait)
+                except queue.Empty:
+                    event = None
+
+                if event is None or event.task not in running:
+                    # Deadline passed, a late result from a task already timed out, or a cancel() wakeup
+                    now = time.monotonic()
+                    for name, (future, deadline, started) in list(running.items()):
+                        if deadline is not None and deadline <= now:
+                            del running[name]
+                            future.cancel()
+                            if started:
+                                limit = self.tasks[name].timeout
+                                error = TimeoutError(f"{name} timed out after {limit}s")
+                            else:
+                                limit = self.queue_timeout
+                                error = TimeoutError(f"{name} waited {limit}s for a free worker")
+                            self.errors[name] = error
+                            logging.error(str(error))
+                            yield TaskEvent(TIMEOUT, name, error=error, elapsed=limit)
+                            yield from _finish_dependents(name, CANCELLED, error)
+                    continue
+
+                if event.kind == PROGRESS:
+                    yield event
+                    continue
+
+                if event.kind == STARTED:
+                    # The timeout covers run time, not time spent queued for a free worker
+                    timeout = self.tasks[event.task].timeout
+                    deadline = time.monotonic() + timeout if timeout else None
+                    running[event.task] = (running[event.task][0], deadline, True)
+                    yield event
+                    continue
+
+                del running[event.task]
+                if event.kind == COMPLETED:
+                    values[event.task] = event.value
+                    self.results[event.task] = event.value
+                    yield event
+                elif event.kind == SKIPPED:
+                    yield event
+                    yield from _finish_dependents(event.task, SKIPPED, event.error)
+                else:
+                    self.errors[event.task] = event.error
+                    logging.error(f"Task {event.task} failed: {event.error}")
+                    yield event
+                    yield from _finish_dependents(event.task, CANCELLED, event.error)
+        finally:
+            self._events = None
+            if own_executor:
+                # Do not wait for timed-out threads; their results are ignored
+                executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,197 @@
+# utils/schema_validator.py
+"""
+Validation of model output against the prompt schemas.
+
+The schemas in prompts/ describe each field with a small spec language:
+"string"/"str", "float (1.0 - 10.0)", "int", "A | B | C" for a choice,
+["string"] for a list and nested dicts. validate() checks a parsed response
+against such a schema, coerces values that are only superficially wrong
+("7.5/10" for a float, a comma-separated string for a list, "remote" for
+"Remote") and reports the paths it could not accept, so the caller can ask
+the model again for just those fields.
+"""
+import re
+
+_NUMBER_RE = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+class SchemaValidationError(ValueError):
+    def __init__(self, message: str, problems: dict, partial=None):
+        """
+        Raised when a response still has missing or invalid fields after repair.
+
+        Args:
+            message (str): Summary of the failure.
+            problems (dict): Path tuple -> reason, e.g. {("cover letter", "body"): "missing"}.
+            partial: The valid part of the response.
+        """
+        super().__init__(message)
+        self.problems = problems
+        self.partial = partial
+
+
+def _spec_kind(spec) -> str:
+    if isinstance(spec, dict):
+        return "object"
+    if isinstance(spec, list):
+        return "array"
+    spec = str(spec).strip()
+    if spec.startswith("float"):
+        return "float"
+    if spec.startswith("int"):
+        return "int"
+    if "|" in spec:
+        return "choice"
+    return "string"
+
+
+def _range(spec: str) -> tuple:
+    numbers = _NUMBER_RE.findall(spec)
+    return (float(numbers[0]), float(numbers[1])) if len(numbers) >= 2 else (None, None)
+
+
+def default_for(spec):
+    """Empty value of a schema field, used when a field stays missing."""
+    kind = _spec_kind(spec)
+    if kind == "object":
+        return {k: default_for(v) for k, v in spec.items()}
+    if kind == "array":
+        return []
+    if kind in ("float", "int"):
+        return None
+    return ""
+
+
+def _coerce_scalar(value, spec):
+    """Returns (value, None) or (None, reason)."""
+    kind = _spec_kind(spec)
+    if kind in ("float", "int"):
+        if value is None or isinstance(value, bool):
+            return None, "not a number"
+        if isinstance(value, str):
+            match = _NUMBER_RE.search(value)  # "7.5", "7.5/10", "Score: 8"
+            if not match:
+                return None, "not a number"
+            value = float(match.group(0))
+        if not isinstance(value, (int, float)):
+            return None, "not a number"
+        low, high = _range(spec)
+        if low is not None and not low <= value <= high:
+            return None, f"out of range {low:g}-{high:g}"
+        return (int(round(value)) if kind == "int" else float(value)), None
+    if kind == "choice":
+        options = [o.strip() for o in spec.split("|")]
+        text = str(value).strip().lower() if value is not None else ""
+        for option in options:
+            if option.lower() == text:
+                return option, None
+        if "Unknown" in options:
+            return "Unknown", None  # "Not mentioned" and the like; not worth a follow-up
+        return None, f"not one of {', '.join(options)}"
+    if isinstance(value, (dict, list)):
+        return None, "not a string"
+    return ("" if value is None else str(value)), None
+
+
+def validate(value, schema, path: tuple = ()) -> tuple:
+    """
+    Checks and coerces a parsed response against a schema.
+
+    Keys the schema does not know are dropped. Empty or null strings and
+    lists are accepted (many job fields are legitimately unknown); an absent
+    key, a null number or object, or a value of the wrong shape is a problem.
+
+    Args:
+        value: The parsed response (or a part of it).
+        schema: The schema (or the matching part of it).
+        path (tuple): Path of value inside the full response.
+
+    Returns:
+        tuple: (cleaned value with the valid fields, dict of path tuple -> reason).
+    """
+    kind = _spec_kind(schema)
+    problems = {}
+    if kind == "object":
+        if not isinstance(value, dict):
+            return {}, {path: "missing" if value is None else "not an object"}
+        cleaned = {}
+        for key, spec in schema.items():
+            child_path = path + (key,)
+            if key not in value:
+                problems[child_path] = "missing"
+                continue
+            child, child_problems = validate(value[key], spec, child_path)
+            problems.update(child_problems)
+            if child_path not in child_problems:
+                cleaned[key] = child
+        return cleaned, problems
+    if kind == "array":
+        item_spec = schema[0] if schema else "string"
+        if value is None:
+            value = []
+        elif isinstance(value, str) and _spec_kind(item_spec) == "string":
+            value = [part.strip() for part in value.split(",") if part.strip()]
+        if not isinstance(value, list):
+            return [], {path: "not a list"}
+        cleaned = []
+        for item in value:
+            child, child_problems = validate(item, item_spec, path + (len(cleaned),))
+            if not child_problems:  # Invalid list items are dropped, not re-requested
+                cleaned.append(child)
+        return cleaned, {}
+    coerced, reason = _coerce_scalar(value, schema)
+    if reason:
+        return None, {path: reason}
+    return coerced, {}
+
+
+def subschema(schema: dict, paths) -> dict:
+    """
+    The part of a schema that covers the given paths, e.g. for a follow-up request.
+
+    Args:
+        schema (dict): The full schema.
+        paths (iterable): Path tuples reported by validate().
+
+    Returns:
+        dict: A schema with the same nesting, holding only those fields.
+    """
+    result = {}
+    for path in sorted(paths, key=len):
+        spec, target = schema, result
+        for i, key in enumerate(path):
+            if not isinstance(spec, dict) or key not in spec or target.get(key) is spec[key]:
+                break  # Unknown path, or an enclosing field is already included whole
+            spec = spec[key]
+            if i == len(path) - 1 or not isinstance(spec, dict):
+                target[key] = spec
+                break
+            target = target.setdefault(key, {})
+    return result
+
+
+def merge(base: dict, patch: dict) -> dict:
+    """Deep-merges patch into a copy of base; patch wins on conflicts."""
+    merged = dict(base)
+    for key, value in patch.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def fill_defaults(value: dict, schema: dict) -> dict:
+    """Adds the empty default of every schema field that value lacks."""
+    filled = dict(value)
+    for key, spec in schema.items():
+        if key not in filled:
+            filled[key] = default_for(spec)
+        elif isinstance(spec, dict) and isinstance(filled[key], dict):
+            filled[key] = fill_defaults(filled[key], spec)
+    return filled
+
+
+def describe(problems: dict) -> str:
+    """Human-readable list of problems, e.g. "cover letter.body (missing)"."""
+    return ", ".join(f"{'.'.join(str(p) for p in path) or '<root>'} ({reason})" for path, reason in problems.items())
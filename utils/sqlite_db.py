@@ -0,0 +1,44 @@
+# utils/sqlite_db.py
+import os
+import sqlite3
+import threading
+
+
+class ThreadLocalConnection:
+    def __init__(self, path: str, schema: str = "", on_connect=None):
+        """
+        One SQLite connection per thread for a database file.
+
+        Connections use WAL mode and a busy timeout so several threads and
+        processes (the Streamlit app, batch runs, workers) can share the file.
+
+        Args:
+            path (str): Path of the SQLite file.
+            schema (str): DDL script run on the first connection.
+            on_connect (callable): Optional hook called with the first connection, after the schema.
+        """
+        self.path = path
+        self.schema = schema
+        self.on_connect = on_connect
+        self._local = threading.local()
+        # Streamlit runs every rerun on a new thread, so later connections skip the setup
+        self._set_up = False
+        self._setup_lock = threading.Lock()
+
+    def get(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            # isolation_level=None: autocommit, explicit BEGIN for multi-statement writes
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._setup_lock:
+                if not self._set_up:
+                    if self.schema:
+                        conn.executescript(self.schema)
+                    if self.on_connect:
+                        self.on_connect(conn)
+                    self._set_up = True
+            self._local.conn = conn
+        return conn
@@ -0,0 +1,177 @@
+# utils/stream_ingest.py
+"""
+Streaming job ingestion with backpressure.
+
+Job entries are read lazily from a JSONL or plain text stream (a file or
+stdin) by one reader thread and handed to a pool of workers through a
+bounded queue. When the workers fall behind, for example because a provider
+is rate limited, the queue fills up and the reader blocks instead of
+buffering the rest of the input. Every finished job is written as one JSON
+line right away, so memory use stays flat however long the input is.
+"""
+import json
+import logging
+import queue
+import threading
+import time
+
+from config import BATCH_CONCURRENCY, STREAM_QUEUE_SIZE
+
+# Fields of a JSONL object that hold the job URL or text, in order of preference
+INPUT_FIELDS = ("url", "job_url", "job_text", "text")
+
+_DONE = object()  # Queue sentinel: no more entries
+
+
+def parse_job_line(line: str, is_jsonl: bool = None) -> tuple:
+    """
+    Reads the job input from one line of an input file.
+
+    Args:
+        line (str): The line.
+        is_jsonl (bool): Whether the line is JSON; None decides per line (JSON if it
+            starts with "{" or a quote), for streams such as stdin.
+
+    Returns:
+        tuple: (job input, entry id or None), or None for blank and "#" comment lines.
+
+    Raises:
+        ValueError: If the line is invalid JSON or holds no job URL or text.
+    """
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    if is_jsonl is None:
+        is_jsonl = line.startswith(("{", '"'))
+    if not is_jsonl:
+        return line, None
+    entry = json.loads(line)
+    entry_id = None
+    if isinstance(entry, dict):
+        entry_id = entry.get("id")
+        entry = next((entry[k] for k in INPUT_FIELDS if entry.get(k)), None)
+    if not isinstance(entry, str) or not entry.strip():
+        raise ValueError("no job URL or text found")
+    return entry, entry_id
+
+
+def iter_job_entries(lines, is_jsonl: bool = None):
+    """
+    Yields job entries lazily; lines that cannot be read are logged and skipped.
+
+    Args:
+        lines (iterable): Lines of the input, e.g. an open file or sys.stdin.
+        is_jsonl (bool): As in parse_job_line().
+
+    Yields:
+        tuple: (line number, job input, entry id or None).
+    """
+    for line_no, line in enumerate(lines, start=1):
+        try:
+            parsed = parse_job_line(line, is_jsonl)
+        except ValueError as e:  # json.JSONDecodeError is a ValueError
+            logging.warning(f"Skipping line {line_no}: {e}")
+            continue
+        if parsed is not None:
+            yield (line_no,) + parsed
+
+
+def _summary(job_input: str, limit: int = 200) -> str:
+    return job_input if len(job_input) <= limit else job_input[:limit] + "..."
+
+
+def stream_jobs(entries, run_job, out, concurrency: int = BATCH_CONCURRENCY,
+                queue_size: int = STREAM_QUEUE_SIZE, on_result=None) -> dict:
+    """
+    Runs jobs from a lazy iterable through a bounded queue and writes each result as it completes.
+
+    Args:
+        entries (iterable): (line number, job input, entry id) tuples, e.g. from iter_job_entries().
+        run_job (callable): Runs one job input and returns the pipeline result; called on worker threads.
+        out (file): Text stream receiving one JSON line per job: line, id, input, status
+            ("done", "duplicate" or "failed"), elapsed_seconds and result (without job_text) or error.
+        concurrency (int): Number of worker threads, i.e. jobs in flight.
+        queue_size (int): Entries read ahead of the workers; the reader blocks while the queue is full.
+        on_result (callable): Optional; called with each "done" result, e.g. to save records.
+            If it raises, the job is reported as "failed" with that error.
+
+    Returns:
+        dict: Counts of read, completed, failed and duplicate jobs, throughput and the
+            time the reader spent blocked on a full queue.
+
+    Raises:
+        ValueError: If concurrency is below 1.
+    """
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be at least 1, got {concurrency}")
+    work = queue.Queue(maxsize=max(queue_size, 1))
+    out_lock = threading.Lock()
+    stats = {"read": 0, "completed": 0, "failed": 0, "duplicates": 0}
+    stats_lock = threading.Lock()
+    reader_blocked = 0.0
+    reader_error = []
+
+    def count(key):
+        with stats_lock:
+            stats[key] += 1
+
+    def worker():
+        while True:
+            item = work.get()
+            if item is _DONE:
+                return
+            line_no, job_input, entry_id = item
+            started = time.perf_counter()
+            line = {"line": line_no, "id": entry_id, "input": _summary(job_input)}
+            # Nothing may escape: a dead worker would leave a sentinel unread and the reader blocked on put()
+            try:
+                result = run_job(job_input)
+                status = "duplicate" if result.get("duplicate_of") else "done"
+                if status == "done" and on_result is not None:
+                    on_result(result)
+            except Exception as e:
+                logging.error(f"Line {line_no} failed: {e}")
+                line.update(status="failed", error=str(e))
+                count("failed")
+            else:
+                line.update(status=status, result={k: v for k, v in result.items() if k != "job_text"})
+                count("duplicates" if status == "duplicate" else "completed")
+            line["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+            try:
+                with out_lock:
+                    out.write(json.dumps(line, default=str) + "\n")
+                    out.flush()
+            except Exception as e:
+                logging.error(f"Could not write the result of line {line_no}: {e}")
+
+    def reader():
+        nonlocal reader_blocked
+        try:
+            for entry in entries:
+                stats["read"] += 1
+                waited = time.perf_counter()
+                work.put(entry)  # Blocks while the workers are behind
+                reader_blocked += time.perf_counter() - waited
+        except Exception as e:
+            logging.error(f"Reading job entries failed: {e}")
+            reader_error.append(e)
+        finally:
+            for _ in range(concurrency):
+                work.put(_DONE)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, name=f"ingest-{i}", daemon=True) for i in range(concurrency)]
+    threads.append(threading.Thread(target=reader, name="ingest-reader", daemon=True))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if reader_error:
+        raise reader_error[0]
+
+    elapsed = time.perf_counter() - started
+    stats["elapsed_seconds"] = round(elapsed, 2)
+    stats["jobs_per_minute"] = round(stats["completed"] / elapsed * 60, 2) if elapsed > 0 else 0.0
+    stats["reader_blocked_seconds"] = round(reader_blocked, 2)
+    stats["queue_size"] = work.maxsize
+    return stats
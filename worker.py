@@ -0,0 +1,188 @@
+# worker.py
+"""
+Worker pool for postings queued from the app.
+
+Usage:
+    python worker.py                         # WORKER_PROCESSES worker processes
+    python worker.py --workers 4 --provider fake
+
+Each process builds its models once, then claims the oldest queued job,
+runs the agent chain, reports every agent's status to the queue while it
+runs and stores the result for the app to load. Several postings run at
+once (one per process) and keep running while the browser is closed or the
+app reruns. Ctrl-C lets every process finish its current job first; jobs of
+a process that dies are picked up again once their lease expires.
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+
+from dotenv import load_dotenv
+
+from config import (
+    DEDUPE_ENABLED, JOB_QUEUE_DB_PATH, LLM_PROVIDER, RECORD_DB_PATH, TRIAGE_THRESHOLD, WORKER_POLL_SECONDS,
+    WORKER_PROCESSES,
+)
+from utils.job_queue import JobQueue
+from utils.logger import configure_logging, remove_metrics_files
+from utils.scheduler import COMPLETED, PROGRESS, SKIPPED, STARTED
+
+
+def _agent_status(event) -> str:
+    """Status text of an agent after a scheduler event, as shown in the app."""
+    if event.kind == STARTED:
+        return "Running..."
+    if event.kind == COMPLETED:
+        return f"Completed ({event.elapsed:.1f}s)"
+    if event.kind == SKIPPED:
+        return f"Skipped ({event.error})"
+    return f"{event.kind.title()}: {event.error}"
+
+
+def run_job(queue: JobQueue, pipeline, records, job: dict):
+    """
+    Runs one claimed job and stores its result or error in the queue.
+
+    Args:
+        queue (JobQueue): The queue the job was claimed from.
+        pipeline (JobPipeline): The process's pipeline; options are applied per job.
+        records (RecordStore): The record store used for duplicate checks, or None.
+        job (dict): The claimed job.
+    """
+    from utils.pipeline import MATCH_REASONS, task_agent
+    from utils.resume_service import get_resume, get_resume_variants
+
+    options = job["options"]
+    resume = get_resume_variants() if options.get("compare") else None
+    if not resume:
+        resume = get_resume()
+    run_pipeline = pipeline.with_options(
+        triage_threshold=TRIAGE_THRESHOLD if options.get("triage") else None,
+        fused=options.get("fused", False),
+    )
+    progress = {}
+
+    def report(event):
+        if event.kind == PROGRESS:
+            return
+        progress[task_agent(event.task)] = _agent_status(event)
+        queue.heartbeat(job["id"], progress)
+
+    logging.info(f"Running job {job['id']} (attempt {job['attempts']}): {job['label']}")
+    try:
+        result = run_pipeline.run(job["job_input"], resume, on_event=report)
+    except Exception as e:
+        logging.error(f"Job {job['id']} failed: {e}")
+        queue.fail(job["id"], str(e))
+        return
+    if run_pipeline.last_trace is not None:
+        result["trace"] = run_pipeline.last_trace.to_dicts()
+    label = None
+    if result.get("duplicate_of"):
+        result["duplicate_record"] = records.get(result["duplicate_of"]["record_id"]) if records else None
+        result["duplicate_reason"] = MATCH_REASONS[result["duplicate_of"]["matched_on"]]
+        label = f"Already saved as record #{result['duplicate_of']['record_id']}"
+    elif result.get("job_info"):
+        job_info = result["job_info"]
+        label = f"{job_info.get('Job_Title') or 'Untitled role'} — {job_info.get('company_name') or 'Unknown company'}"
+    queue.complete(job["id"], result, label)
+    logging.info(f"Job {job['id']} done.")
+
+
+def work(worker_id: str, provider: str, queue_path: str, db_path: str, dedupe: bool, poll_seconds: float, stop):
+    """
+    Loop of one worker process: claim a job, run it, repeat until stop is set.
+
+    Args:
+        worker_id (str): Name of this worker in the queue.
+        provider (str): LLM backend, as in create_llms().
+        queue_path (str): Path of the job queue database.
+        db_path (str): Path of the record store.
+        dedupe (bool): Skip postings that are already in the record store.
+        poll_seconds (float): Wait between polls of an empty queue.
+        stop (multiprocessing.Event): Set by the parent to shut down after the current job.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # The parent handles Ctrl-C and sets stop
+    load_dotenv()
+    configure_logging()
+
+    from llm.factory import create_llms
+    from search.factory import create_search_provider
+    from utils.pipeline import JobPipeline
+    from utils.record_store import RecordStore
+
+    main_llm, research_llm = create_llms(provider)
+    records = RecordStore(db_path) if dedupe else None
+    pipeline = JobPipeline(
+        groq_llm=main_llm,
+        perplexity_llm=research_llm,
+        search=create_search_provider("fake") if provider == "fake" else None,
+        records=records,
+    )
+    queue = JobQueue(queue_path)
+    logging.info(f"Worker {worker_id} ready (provider={provider}).")
+    try:
+        while not stop.is_set():
+            queue.worker_seen(worker_id, os.getpid())
+            queue.requeue_stale()
+            job = queue.claim(worker_id)
+            if job is None:
+                stop.wait(poll_seconds)
+                continue
+            run_job(queue, pipeline, records, job)
+    finally:
+        queue.worker_gone(worker_id)
+        remove_metrics_files()  # atexit handlers do not run in multiprocessing children
+        logging.info(f"Worker {worker_id} stopped.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run postings queued from the app in background processes.")
+    parser.add_argument("--workers", type=int, default=WORKER_PROCESSES, help="Worker processes (jobs in flight)")
+    parser.add_argument("--provider", default=LLM_PROVIDER, choices=("hosted", "local", "fake"),
+                        help="LLM backend: Groq + Perplexity, a local OpenAI-compatible server, or offline fakes")
+    parser.add_argument("--queue", default=JOB_QUEUE_DB_PATH, help="Job queue path")
+    parser.add_argument("--db", default=RECORD_DB_PATH, help="Record store path")
+    parser.add_argument("--poll", type=float, default=WORKER_POLL_SECONDS, help="Seconds between polls of an empty queue")
+    parser.add_argument("--no-dedupe", dest="dedupe", action="store_false", default=DEDUPE_ENABLED,
+                        help="Run postings even when the record store already has them")
+    args = parser.parse_args()
+
+    load_dotenv()
+    configure_logging()
+    # Fail here, not in every process, when API keys are missing
+    from llm.factory import create_llms
+    try:
+        create_llms(args.provider)
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+    # Spawned rather than forked: each process starts clean and builds its own HTTP clients
+    context = multiprocessing.get_context("spawn")
+    stop = context.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    processes = [
+        context.Process(
+            target=work,
+            args=(f"{os.getpid()}-{i}", args.provider, args.queue, args.db, args.dedupe, args.poll, stop),
+            name=f"worker-{i}",
+        )
+        for i in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+    logging.info(f"Started {args.workers} worker process(es) on {args.queue}; Ctrl-C to stop.")
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        logging.info("Stopping: workers finish their current job first.")
+        stop.set()
+        for process in processes:
+            process.join()
+
+
+if __name__ == "__main__":
+    main()